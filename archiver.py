@@ -2,6 +2,7 @@
 import collectionObj
 import debuggerTool
 import importTool
+import daemonClient
 import sys
 import os
 import shutil
@@ -59,14 +60,13 @@ def main():
     t1 = time()
 
     action, roll_selector, function = parse_cli_args(sys.argv)
-    rolls_to_import = [roll_selector]
-    if '-' in roll_selector:
-        rolls_to_import = str(roll_selector)
-    elif roll_selector == 'all':
-        rolls_to_import = 'all'
-    elif ',' in roll_selector:
-        rolls_to_import = roll_selector.split(',')
-    
+
+    # A running collection daemon already has both collections imported (see collectionDaemon.py)
+    if daemonClient.is_running():
+        daemonClient.request('archive', action=action, selector=roll_selector, function=function)
+        return
+
+    rolls_to_import = get_rolls_to_import(roll_selector)
 
     db.d('[A]', 'Archiver start')
     db.d('[A]', 'Configured paths', [
@@ -93,11 +93,19 @@ def main():
 
     collection_loc.import_rolls(rolls_to_import)
     collection_ext.import_rolls(rolls_to_import)
+    collection_loc.save_snapshot()
+    collection_ext.save_snapshot()
+
+    archive(action, roll_selector, function, collection_loc.rolls, collection_ext.rolls, t1)
 
+
+# Runs an offload/onload over imported local and external rolls
+def archive(action, roll_selector, function, rolls_loc, rolls_ext, t1=None):
+    t1 = t1 or time()
     print('\n' * 5)
 
-    size_loc = get_collection_size(collection_loc)
-    size_ext = get_collection_size(collection_ext)
+    size_loc = get_collection_size(rolls_loc)
+    size_ext = get_collection_size(rolls_ext)
 
     db.d('[A]', 'Total size summary', [
         f'local total size:    {format_bytes(size_loc)}',
@@ -105,17 +113,17 @@ def main():
     ])
 
     db.i('[A]', 'Collections imported', [
-        f'local rolls:    {len(collection_loc.rolls)} :: {format_bytes(size_loc)}',
-        f'external rolls: {len(collection_ext.rolls)} :: {format_bytes(size_ext)}',
+        f'local rolls:    {len(rolls_loc)} :: {format_bytes(size_loc)}',
+        f'external rolls: {len(rolls_ext)} :: {format_bytes(size_ext)}',
     ])
 
-    if len(collection_loc.rolls) != len(collection_ext.rolls):
+    if len(rolls_loc) != len(rolls_ext):
         db.w('[A]', 'Local/external roll counts differ', [
-            f'local:    {len(collection_loc.rolls)}',
-            f'external: {len(collection_ext.rolls)}',
+            f'local:    {len(rolls_loc)}',
+            f'external: {len(rolls_ext)}',
         ])
 
-    roll_pairs = build_roll_pairs(collection_loc, collection_ext)
+    roll_pairs = build_roll_pairs(rolls_loc, rolls_ext)
     selected_pairs = select_roll_pairs(roll_pairs, roll_selector)
 
     if len(selected_pairs) == 0:
@@ -138,8 +146,8 @@ def main():
             db.e('[A]', f'Unknown action: {action}')
             return
 
-    size_loc_end = get_collection_size(collection_loc)
-    size_ext_end = get_collection_size(collection_ext)
+    size_loc_end = get_collection_size(rolls_loc)
+    size_ext_end = get_collection_size(rolls_ext)
 
     delta_loc = size_loc_end - size_loc
     delta_ext = size_ext_end - size_ext
@@ -151,6 +159,18 @@ def main():
     ])
 
 
+# CLI roll selector --> collectionObj.import_rolls selector: '72' -> ['72'], '72-80' -> '72-80', '72,76' -> ['72', '76']
+def get_rolls_to_import(roll_selector):
+    rolls_to_import = [roll_selector]
+    if '-' in roll_selector:
+        rolls_to_import = str(roll_selector)
+    elif roll_selector == 'all':
+        rolls_to_import = 'all'
+    elif ',' in roll_selector:
+        rolls_to_import = roll_selector.split(',')
+    return rolls_to_import
+
+
 def parse_cli_args(argv):
     if len(argv) != 4:
         print_usage_and_exit()
@@ -218,14 +238,14 @@ def print_usage_and_exit():
     sys.exit(1)
 
 
-def build_roll_pairs(collection_loc, collection_ext):
+def build_roll_pairs(rolls_loc, rolls_ext):
     loc_map = {}
     ext_map = {}
 
-    for roll in collection_loc.rolls:
+    for roll in rolls_loc:
         loc_map[str(int(roll.index_str))] = roll
 
-    for roll in collection_ext.rolls:
+    for roll in rolls_ext:
         ext_map[str(int(roll.index_str))] = roll
 
     shared_indices = sorted(set(loc_map.keys()) & set(ext_map.keys()), key=lambda x: int(x))
@@ -284,9 +304,9 @@ def expand_roll_selector(selector):
     return wanted
 
 
-def get_collection_size(collection):
+def get_collection_size(rolls):
     total_size = 0
-    for roll in collection.rolls:
+    for roll in rolls:
         for dirpath, dirnames, filenames in os.walk(roll.directory):
             for filename in filenames:
                 filepath = os.path.join(dirpath, filename)
@@ -34,12 +34,10 @@
 import os
 import sys
 
-from tkinter import Tk
-from tkinter.filedialog import askdirectory
-
 import collectionObj
 import importTool
 import debuggerTool
+import daemonClient
 from newRoll import LIBRARY_PATH as DEFAULT_EXPORT_PATH
 
 DEBUG = 0
@@ -48,7 +46,10 @@ ERROR = 1
 db = debuggerTool.debuggerTool(DEBUG, WARNING, ERROR)
 
 
+# tkinter is imported by the pickers only, so importing this module (eg. from collectionDaemon.py) stays cheap
 def pick_roll_folder():
+    from tkinter import Tk
+    from tkinter.filedialog import askdirectory
     root = Tk()
     root.withdraw()
     root.attributes('-topmost', True)
@@ -58,6 +59,8 @@ def pick_roll_folder():
 
 
 def pick_lr_exports_folder():
+    from tkinter import Tk
+    from tkinter.filedialog import askdirectory
     root = Tk()
     root.withdraw()
     root.attributes('-topmost', True)
@@ -148,7 +151,13 @@ def sync_lr_exports(importer, folder):
 
 
 def clean_in_place(collection, importer, roll, folder, steps):
-    new_name = roll.newName
+    target_path = confirm_in_place(roll.newName, roll.dbIdx, folder)
+    if target_path is not None:
+        run_clean_in_place(collection, importer, roll, folder, target_path, steps)
+
+
+# Asks to clean in place (renaming to new_name if needed). Returns the folder path after the rename, or None if cancelled.
+def confirm_in_place(new_name, dbIdx, folder):
     current_name = os.path.basename(folder)
     target_path = os.path.join(os.path.dirname(folder), new_name)
 
@@ -157,13 +166,22 @@ def clean_in_place(collection, importer, roll, folder, steps):
         print(f'(same location -- only the folder name changes: {os.path.dirname(folder)})')
 
         if not prompt_yes_no('Proceed with rename + in-place clean?'):
-            db.w(roll.dbIdx, 'Cancelled by user.')
-            return
+            db.w(dbIdx, 'Cancelled by user.')
+            return None
 
         if os.path.exists(target_path):
-            db.e(roll.dbIdx, 'Rename target already exists, aborting to avoid overwriting it:', target_path)
-            return
+            db.e(dbIdx, 'Rename target already exists, aborting to avoid overwriting it:', target_path)
+            return None
+    else:
+        if not prompt_yes_no(f'Clean this roll in place at {folder}?'):
+            db.w(dbIdx, 'Cancelled by user.')
+            return None
+    return target_path
+
 
+# Renames folder to target_path (if different) and cleans the roll in place. Also run by collectionDaemon.py.
+def run_clean_in_place(collection, importer, roll, folder, target_path, steps):
+    if os.path.normpath(target_path) != os.path.normpath(folder):
         os.rename(folder, target_path)
         db.i(roll.dbIdx, 'Renamed folder', f'{folder} -> {target_path}')
 
@@ -175,29 +193,80 @@ def clean_in_place(collection, importer, roll, folder, steps):
         if roll is None:
             db.e('[C]', 'Failed to re-import roll after rename.', target_path)
             return
-    else:
-        if not prompt_yes_no(f'Clean this roll in place at {folder}?'):
-            db.w(roll.dbIdx, 'Cancelled by user.')
-            return
 
     importer.cleanRoll_in_place(roll, **steps)
 
 
 def clean_to_export_path(importer, roll, steps):
+    export_path = confirm_export_path(roll.index_str, roll.dbIdx)
+    if export_path is not None:
+        importer.cleanRoll(roll, library_path=export_path, **steps)
+
+
+# Asks whether to export a roll that can't be cleaned in place. Returns the export path, or None if cancelled.
+def confirm_export_path(index_str, dbIdx):
     print('\nThis folder does not match the expected 01_scans/02_exports layout.')
     print("It can't be safely cleaned in place.")
 
     if not prompt_yes_no('Export this roll to a separate library path instead?', default=False):
-        db.w(roll.dbIdx, 'Cancelled by user.')
-        return
+        db.w(dbIdx, 'Cancelled by user.')
+        return None
 
     export_path = prompt_export_path(DEFAULT_EXPORT_PATH)
 
-    if not prompt_yes_no(f'[{roll.index_str}] Clean this roll into {export_path}?'):
-        db.w(roll.dbIdx, 'Cancelled by user.')
+    if not prompt_yes_no(f'[{index_str}] Clean this roll into {export_path}?'):
+        db.w(dbIdx, 'Cancelled by user.')
+        return None
+    return export_path
+
+
+# Fields of a roll shown before cleaning (also what collectionDaemon.py's 'roll' command returns)
+def roll_summary(roll):
+    return {
+        'name': roll.name,
+        'newName': roll.newName,
+        'index_str': roll.index_str,
+        'dbIdx': roll.dbIdx,
+        'stk': roll.stk,
+        'cam': roll.cam,
+        'countExposures': roll.countExposures,
+        'countCopies': roll.countCopies,
+        'countRaw': roll.countRaw,
+        'isNewCollection': roll.isNewCollection,
+    }
+
+
+def print_roll_summary(summary):
+    db.i(summary['dbIdx'], 'Roll imported', [
+        f'name:       {summary["name"]}',
+        f'newName:    {summary["newName"]}',
+        f'stk:        {summary["stk"]}',
+        f'cam:        {summary["cam"]}',
+        f'exposures:  {summary["countExposures"]}',
+        f'copies:     {summary["countCopies"]}',
+        f'raw:        {summary["countRaw"]}',
+        f'structure:  {"valid (01_scans/02_exports layout)" if summary["isNewCollection"] else "NOT recognized -- legacy/unexpected layout"}',
+    ])
+
+
+# Same flow as main() with the import and clean run by a collection daemon that has the roll hot
+def clean_with_daemon(folder):
+    summary = daemonClient.request('roll', path=folder)
+    if summary is None:
+        db.e('[C]', 'Failed to import roll from selected folder.', folder)
         return
+    print_roll_summary(summary)
+
+    steps = prompt_clean_steps()
 
-    importer.cleanRoll(roll, library_path=export_path, **steps)
+    if summary['isNewCollection']:
+        target_path = confirm_in_place(summary['newName'], summary['dbIdx'], folder)
+        if target_path is not None:
+            daemonClient.request('clean_in_place', path=folder, target_path=target_path, steps=steps)
+    else:
+        export_path = confirm_export_path(summary['index_str'], summary['dbIdx'])
+        if export_path is not None:
+            daemonClient.request('clean', path=folder, library_path=export_path, steps=steps)
 
 
 def main():
@@ -209,32 +278,30 @@ def main():
     folder = os.path.normpath(folder)
     db.i('[C]', 'Selected roll folder:', folder)
 
-    # collectionObj only needs *a* directory to build its stocklist/cameralist
-    # lookups (those load from this project's own data/ folder, not from the
-    # library path) -- it is not used to scan the whole library for a
-    # single-roll clean.
-    collection = collectionObj.collectionObj(os.path.dirname(folder))
     importer = importTool.importTool()
 
     if os.path.isdir(os.path.join(folder, '02_exports')):
         if prompt_yes_no('Sync fresh JPG exports from a separate Lightroom-exports folder first?', default=False):
             sync_lr_exports(importer, folder)
 
+    # A running collection daemon keeps the reference tables and processed rolls hot (see collectionDaemon.py)
+    if daemonClient.is_running():
+        clean_with_daemon(folder)
+        return
+
+    # collectionObj only needs *a* directory to build its stocklist/cameralist
+    # lookups (those load from this project's own data/ folder, not from the
+    # library path) -- it is not used to scan the whole library for a
+    # single-roll clean.
+    collection = collectionObj.collectionObj(os.path.dirname(folder))
+
     roll = collection.import_roll_from_path(folder)
     if roll is None:
         db.e('[C]', 'Failed to import roll from selected folder.', folder)
         return
+    collection.save_snapshot()
 
-    db.i(roll.dbIdx, 'Roll imported', [
-        f'name:       {roll.name}',
-        f'newName:    {roll.newName}',
-        f'stk:        {roll.stk}',
-        f'cam:        {roll.cam}',
-        f'exposures:  {roll.countExposures}',
-        f'copies:     {roll.countCopies}',
-        f'raw:        {roll.countRaw}',
-        f'structure:  {"valid (01_scans/02_exports layout)" if roll.isNewCollection else "NOT recognized -- legacy/unexpected layout"}',
-    ])
+    print_roll_summary(roll_summary(roll))
 
     steps = prompt_clean_steps()
 
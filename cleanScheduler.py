@@ -0,0 +1,150 @@
+# cleanScheduler.py
+# Pipelined batch clean: import -> copy -> render, with bounded queues between the stages.
+
+import os
+import threading
+from queue import Queue
+from time import time
+from importTool import DEFAULT_LIBRARY_PATH
+from parallelImport import import_rolls_parallel, start_pool
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+DONE = object()     # end-of-stream marker passed down the queues
+
+
+class cleanScheduler:
+    def __init__(self, collection, importer, library_path=None, import_workers=1, copy_workers=1,
+                 render_workers=1, queue_size=2, clean_kwargs=None):
+        self.dbIdx = '[P]'
+        self.collection = collection
+        self.importer = importer
+        self.library_path = library_path or DEFAULT_LIBRARY_PATH
+        self.import_workers = max(1, int(import_workers))
+        self.copy_workers = max(1, int(copy_workers))
+        self.render_workers = max(1, int(render_workers))
+        self.queue_size = max(1, int(queue_size))
+        self.clean_kwargs = dict(clean_kwargs or {})   # extra cleanRoll flags, eg. {'clean_raw': False}
+        self.busy = {'import': 0.0, 'copy': 0.0, 'render': 0.0}
+        self.done = []          # rolls that went through every stage, in completion order
+        self.lock = threading.Lock()
+
+    # Imports and cleans the rolls of a selector (same forms as collection.import_rolls). Returns the cleaned rolls.
+    def run(self, rolls):
+        target_indices = self.collection.get_import_indices(rolls)
+        if target_indices == -1 or target_indices is None:
+            return []
+
+        to_copy = Queue(maxsize=self.queue_size)
+        to_render = Queue(maxsize=self.queue_size)
+        t0 = time()
+
+        # The import process pool is started here, on the main thread, before any stage thread runs
+        pool = None
+        if self.import_workers > 1 and len(target_indices) > 1:
+            pool = start_pool(self.collection, min(self.import_workers, len(target_indices)))
+
+        try:
+            threads = [threading.Thread(target=self._import_stage, args=(target_indices, to_copy, pool), name='import')]
+            threads += self._start_stage('copy', self._copy, to_copy, to_render, self.copy_workers)
+            threads += self._start_stage('render', self._render, to_render, None, self.render_workers)
+            threads[0].start()
+            for t in threads:
+                t.join()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        wall = time() - t0
+        db.i(self.dbIdx, f'Cleaned {len(self.done)} rolls in {wall:.2f}s', [
+            f'{stage}: {busy:.2f}s busy' for stage, busy in self.busy.items()
+        ])
+        return self.done
+
+    def _import_stage(self, target_indices, out, pool=None):
+        try:
+            if pool is not None:
+                paths = []
+                for index in target_indices:
+                    path = self.collection.paths_by_index.get(index)
+                    if path is None:
+                        continue
+                    t = time()
+                    roll = self.collection.snapshot.restore(self.collection, path)    # warm rolls skip the pool
+                    if roll is None:
+                        paths.append(path)
+                        continue
+                    self.collection._add_roll(roll)
+                    self._add_busy('import', time() - t)
+                    out.put(roll)
+                t = time()
+                for path, roll in import_rolls_parallel(self.collection, paths, self.import_workers, window=self.import_workers + self.queue_size, pool=pool):
+                    if roll is not None:
+                        self.collection.snapshot.record(roll)
+                        self.collection._add_roll(roll)
+                        self._add_busy('import', time() - t)
+                        out.put(roll)
+                    t = time()
+            else:
+                for index in target_indices:
+                    t = time()
+                    roll = self.collection.import_roll(index)
+                    self._add_busy('import', time() - t)
+                    if roll is not None:
+                        out.put(roll)
+        except Exception as e:
+            db.e(self.dbIdx, 'Import stage failed', f'{type(e).__name__}: {e}')
+        finally:
+            out.put(DONE)
+
+    # Starts n worker threads for a stage reading from inq; the last one to finish passes DONE on to outq
+    def _start_stage(self, name, fn, inq, outq, n):
+        remaining = [n]
+
+        def worker():
+            while True:
+                roll = inq.get()
+                if roll is DONE:
+                    inq.put(DONE)       # let sibling workers see it too
+                    break
+                t = time()
+                try:
+                    result = fn(roll)
+                except Exception as e:
+                    db.e(roll.dbIdx, f'{name} stage failed', f'{type(e).__name__}: {e}')
+                    result = None
+                self._add_busy(name, time() - t)
+                if result is not None and outq is not None:
+                    outq.put(result)
+            with self.lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and outq is not None:
+                outq.put(DONE)
+
+        threads = [threading.Thread(target=worker, name=f'{name}-{i}') for i in range(n)]
+        for t in threads:
+            t.start()
+        return threads
+
+    def _copy(self, roll):
+        self.importer.cleanRoll(roll, library_path=self.library_path, **{**self.clean_kwargs, 'clean_contact_sheet': False})
+        return roll
+
+    def _render(self, roll):
+        if self.clean_kwargs.get('clean_contact_sheet', True):
+            roll_base_path = self.importer.get_roll_base_path(roll, self.library_path)
+            if not os.path.isdir(roll_base_path):   # cleanRoll skipped this roll
+                return None
+            self.importer.render_contact_sheets(roll, roll_base_path, self.library_path)
+        with self.lock:
+            self.done.append(roll)
+        return roll
+
+    def _add_busy(self, stage, seconds):
+        with self.lock:
+            self.busy[stage] += seconds
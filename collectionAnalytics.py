@@ -0,0 +1,257 @@
+# collectionAnalytics.py
+# Time-series aggregates of a collection (photos, files and bytes per day, week and month).
+
+import os
+from debuggerTool import debuggerTool
+from rollFileIndex import RollFileIndex
+from stageMemo import files_fingerprint
+from exposureTable import ALIASES
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+ANALYTICS_VERSION = 1       # bump when aggregate_block changes what it stores
+DIMENSIONS = ('cam', 'stk', 'lns', 'filmformat', 'location')
+VALUES = ('photos', 'files', 'bytes')
+PERIODS = {'D': 'day', 'W': 'week', 'M': 'month'}
+UNKNOWN = 'Unknown'         # label of exposures without a value for the dimension
+
+
+class collectionAnalytics:
+    def __init__(self, collection):
+        self.dbIdx = '[N]'
+        self.collection = collection
+        self.library = os.path.normpath(collection.directory)
+        self.conn = collection.catalog.conn
+        self.stored = None      # roll index -> (directory, fingerprint) of the counted rolls, read on first use
+        self.synced = {}        # roll index -> rollObj whose exposures are in the stored rows
+        self.cache = {}         # query -> result, cleared whenever rows change
+        self.written = 0        # rolls (re)counted so far (for profiling the incremental update)
+
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS stats_rolls ('
+            'library TEXT, roll INTEGER, directory TEXT, fingerprint TEXT, version INTEGER, '
+            'PRIMARY KEY (library, roll))'
+        )
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS stats_daily ('
+            'library TEXT, roll INTEGER, dimension TEXT, key TEXT, day TEXT, week TEXT, month TEXT, '
+            'photos INTEGER, files INTEGER, bytes INTEGER)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS stats_daily_roll ON stats_daily (library, roll)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS stats_daily_dimension ON stats_daily (library, dimension, day)')
+        self.conn.commit()
+
+    # Counted rolls of this library, dropping the ones counted by an older ANALYTICS_VERSION
+    def load(self):
+        if self.stored is not None:
+            return self.stored
+        self.stored = {}
+        outdated = []
+        for roll_index, directory, fingerprint, version in self.conn.execute(
+                'SELECT roll, directory, fingerprint, version FROM stats_rolls WHERE library = ?', (self.library,)):
+            if version != ANALYTICS_VERSION:
+                outdated.append(roll_index)
+                continue
+            self.stored[roll_index] = (directory, fingerprint)
+        for roll_index in outdated:
+            self.forget(roll_index, commit=False)
+        self.conn.commit()
+        return self.stored
+
+    # Rows of one roll's exposure block: one per (dimension, key, day), as stored in stats_daily
+    def aggregate_block(self, roll_index, block):
+        import pandas as pd
+        dated = block[block['dateExposed'].notna()]
+        if dated.empty:
+            return []
+
+        day = dated['dateExposed'].dt.normalize()
+        counts = pd.DataFrame({
+            'day': day.dt.strftime('%Y-%m-%d'),
+            'week': (day - pd.to_timedelta(day.dt.weekday, unit='D')).dt.strftime('%Y-%m-%d'),
+            'month': day.dt.strftime('%Y-%m-01'),
+            'photos': (~dated['isCopy']).astype(int),
+            'files': 1,
+            'bytes': dated['fileSize'].fillna(0),
+        })
+
+        rows = []
+        for dimension in DIMENSIONS:
+            keys = dated[dimension].astype(object)
+            counts['key'] = keys.where(keys.notna(), UNKNOWN).astype(str)
+            grouped = counts.groupby(['key', 'day', 'week', 'month'], sort=False)[list(VALUES)].sum().reset_index()
+            for key, d, w, m, photos, files, size in grouped.itertuples(index=False):
+                rows.append((self.library, roll_index, dimension, key, d, w, m, int(photos), int(files), int(size)))
+        return rows
+
+    # Replaces the stored rows of a roll with the counts of its exposure block
+    def write(self, roll_index, directory, fingerprint, block):
+        rows = self.aggregate_block(roll_index, block)
+        self.conn.execute('DELETE FROM stats_daily WHERE library = ? AND roll = ?', (self.library, roll_index))
+        self.conn.executemany('INSERT INTO stats_daily VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO stats_rolls VALUES (?, ?, ?, ?, ?)',
+            (self.library, roll_index, directory, fingerprint, ANALYTICS_VERSION),
+        )
+        self.conn.commit()
+        self.load()[roll_index] = (directory, fingerprint)
+        self.cache.clear()
+        self.written += 1
+        db.d(self.dbIdx, f'Counted roll {roll_index} ({len(rows)} rows)', directory)
+
+    def forget(self, roll_index, commit=True):
+        self.conn.execute('DELETE FROM stats_daily WHERE library = ? AND roll = ?', (self.library, roll_index))
+        self.conn.execute('DELETE FROM stats_rolls WHERE library = ? AND roll = ?', (self.library, roll_index))
+        if commit:
+            self.conn.commit()
+        if self.stored is not None:
+            self.stored.pop(roll_index, None)
+        self.synced.pop(roll_index, None)
+        self.cache.clear()
+
+    # Counts a processed roll unless it's already counted from the same files. True if its rows were rewritten.
+    def count_roll(self, roll, block=None):
+        if self.synced.get(roll.index) is roll:
+            return False
+        directory = os.path.normpath(roll.directory)
+        fingerprint = files_fingerprint(roll.files) if roll.files is not None else None
+        # A rollObj that replaced one counted earlier in this session is counted again even if its files
+        # match (eg. re-imported with different exif overrides)
+        if self.load().get(roll.index) != (directory, fingerprint) or roll.index in self.synced:
+            if block is None:
+                block = self.collection.table.build_block(list(roll.images_all or []))
+            self.write(roll.index, directory, fingerprint, block)
+            counted = True
+        else:
+            counted = False
+        self.synced[roll.index] = roll
+        return counted
+
+    # Drops counted rolls that left the library or moved to another folder (once the directory tree is
+    # built), then counts the resident rolls that are new or changed since they were last counted
+    def sync(self):
+        stored = self.load()
+        registry = self.collection.registry
+        paths = self.collection.paths_by_index
+        if paths:
+            for roll_index, (directory, _) in list(stored.items()):
+                if roll_index in registry:
+                    continue
+                path = paths.get(roll_index)
+                if path is None or os.path.normpath(path) != directory:
+                    db.d(self.dbIdx, f'Roll {roll_index} left the library, dropping its counts', directory)
+                    self.forget(roll_index)
+
+        table = self.collection.table
+        for roll_index, roll in registry.rolls.items():
+            if self.synced.get(roll_index) is roll:
+                continue
+            entry = table.blocks.get(roll_index)
+            self.count_roll(roll, entry[1] if entry is not None and entry[0] is roll else None)
+
+    # Counts every roll of a selector that's missing or changed on disk, importing only those rolls
+    # (collectionObj.max_resident keeps the memory bounded). refresh=True recounts every selected roll.
+    def update(self, selector='all', refresh=False):
+        collection = self.collection
+        collection.build_directory_tree()
+        target_indices = collection.get_import_indices(selector)
+        if target_indices == -1 or target_indices is None:
+            return 0
+        self.sync()
+
+        stored = self.load()
+        counted = 0
+        for roll_index in target_indices:
+            path = collection.paths_by_index.get(roll_index)
+            if path is None:
+                continue
+            if refresh:
+                self.synced.pop(roll_index, None)
+                stored.pop(roll_index, None)
+            elif roll_index not in collection.registry and roll_index in stored:
+                directory, fingerprint = stored[roll_index]
+                if directory == os.path.normpath(path) and fingerprint == files_fingerprint(RollFileIndex(path)):
+                    continue
+            roll = collection.getRoll(roll_index)
+            if roll is not None and self.count_roll(roll):
+                counted += 1
+        db.i(self.dbIdx, f'Analytics up to date, {counted} rolls counted', f'{len(stored)} rolls in {self.library}')
+        return counted
+
+    # Forgets that a resident roll (or every roll) was counted, so the next sync counts it again
+    def invalidate(self, roll_index=None):
+        indices = list(self.collection.registry.rolls) if roll_index is None else [int(roll_index)]
+        for i in indices:
+            self.synced.pop(i, None)
+            self.load().pop(i, None)
+        self.collection.table.invalidate(roll_index)
+
+    def query(self, dimension, period, startDate, endDate):
+        sql = (f'SELECT {period}, key, SUM(photos), SUM(files), SUM(bytes) FROM stats_daily '
+               'WHERE library = ? AND dimension = ?')
+        args = [self.library, dimension]
+        if startDate:
+            sql += ' AND day >= ?'
+            args.append(startDate.replace('.', '-'))
+        if endDate:
+            sql += ' AND day <= ?'
+            args.append(endDate.replace('.', '-'))
+        sql += f' GROUP BY {period}, key ORDER BY {period}'
+        return self.conn.execute(sql, args).fetchall()
+
+    # Frame indexed by period start (datetime), one column per key of a dimension ('cam', 'stk', 'lns',
+    # 'filmformat', 'location' or their ALIASES such as 'camera'), holding photos, files or bytes per
+    # period of freq ('D', 'W' or 'M'), cumulative over [startDate, endDate] ('YYYY.MM.DD') by default.
+    # Shared between calls: copy it before modifying it.
+    def series(self, by, value='photos', freq='D', startDate=None, endDate=None, cumulative=True):
+        import pandas as pd
+        dimension = ALIASES.get(by, by)
+        if dimension not in DIMENSIONS:
+            raise ValueError(f'Unknown dimension: {by} (one of {", ".join(DIMENSIONS)})')
+        if value not in VALUES:
+            raise ValueError(f'Unknown value: {value} (one of {", ".join(VALUES)})')
+        if freq not in PERIODS:
+            raise ValueError(f'Unknown frequency: {freq} (one of {", ".join(PERIODS)})')
+
+        self.sync()
+        key = ('series', dimension, value, freq, startDate, endDate, cumulative)
+        if key in self.cache:
+            return self.cache[key]
+
+        rows = self.query(dimension, PERIODS[freq], startDate, endDate)
+        column = 2 + VALUES.index(value)
+        data = pd.DataFrame({
+            'Date': pd.to_datetime([row[0] for row in rows]),
+            by: [row[1] for row in rows],
+            value: [row[column] for row in rows],
+        })
+        frame = data.pivot(index='Date', columns=by, values=value).fillna(0)
+        if cumulative:
+            frame = frame.cumsum()
+        self.cache[key] = frame
+        return frame
+
+    # Frame indexed by period start with photos, files and bytes over the whole collection, per period of
+    # freq and cumulative over [startDate, endDate] by default. Shared between calls, like series().
+    def totals(self, freq='D', startDate=None, endDate=None, cumulative=True):
+        import pandas as pd
+        if freq not in PERIODS:
+            raise ValueError(f'Unknown frequency: {freq} (one of {", ".join(PERIODS)})')
+
+        self.sync()
+        key = ('totals', freq, startDate, endDate, cumulative)
+        if key in self.cache:
+            return self.cache[key]
+
+        # Every exposure has exactly one key per dimension, so summing over the cameras counts each once
+        rows = self.query('cam', PERIODS[freq], startDate, endDate)
+        data = pd.DataFrame(rows, columns=['Date', 'key'] + list(VALUES))
+        data['Date'] = pd.to_datetime(data['Date'])
+        frame = data.groupby('Date')[list(VALUES)].sum()
+        if cumulative:
+            frame = frame.cumsum()
+        self.cache[key] = frame
+        return frame
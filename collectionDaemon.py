@@ -0,0 +1,227 @@
+# collectionDaemon.py
+# Long-running local service that keeps collections hot between runs of the scripts.
+
+import io
+import os
+import socket
+import contextlib
+from time import time
+import collectionObj
+import importTool
+import renderTool
+import archiver
+import cleanRoll
+from daemonClient import SOCKET_PATH, send, receive, is_running
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+REQUEST_TIMEOUT = 5.0     # seconds a client gets to send its request line (and to read the reply)
+
+
+class collectionDaemon:
+    def __init__(self, socket_path=SOCKET_PATH):
+        self.dbIdx = '[D]'
+        self.socket_path = socket_path
+        self.collections = {}       # library path -> collectionObj
+        self.importer = importTool.importTool()
+        self.started = time()
+        self.requests = 0
+        self.running = False
+
+    # Hot collection of a library folder (created on first use)
+    def collection(self, library):
+        library = os.path.normpath(library)
+        collection = self.collections.get(library)
+        if collection is None:
+            collection = collectionObj.collectionObj(library)
+            self.collections[library] = collection
+        return collection
+
+    # Hot collection for a single roll folder (cleanRoll.py builds its collection on the roll's parent folder)
+    # and the roll itself, re-imported only if its files changed
+    def roll_from_path(self, path):
+        path = os.path.normpath(path)
+        collection = self.collection(os.path.dirname(path))
+        for roll in collection.rolls:
+            if os.path.normpath(roll.directory) == path:
+                if collection.is_fresh(roll):
+                    collection._touch_roll(roll)
+                    return collection, roll
+                collection.rolls.remove(roll)
+                collection.registry.remove(roll)
+                break
+        return collection, collection.import_roll_from_path(path)
+
+    def rolls(self, args):
+        collection = self.collection(args['library'])
+        rolls = collection.refresh_rolls(args.get('rolls', 'all'))
+        collection.save_snapshot()
+        return collection, rolls
+
+    # ---- commands ----
+    # JSON fields besides "cmd":
+    #   ping / status / shutdown
+    #   import          library, rolls                              -> roll names
+    #   clean           library + rolls, or path; library_path, steps -> roll names
+    #   clean_in_place  path, target_path, steps                    (cleanRoll.py)
+    #   roll            path                                        -> cleanRoll.roll_summary
+    #   render          library, rolls, output_folder, P1/P2/P3     -> roll names
+    #   archive         action ('offload'/'onload'), selector, function (archiver.py CLI args)
+    #   query           library, rolls (optional), min_rating, max_rating, cam/stk/lns/year/location -> exposures
+
+    def cmd_ping(self, args):
+        return 'pong'
+
+    def cmd_status(self, args):
+        return {
+            'uptime': round(time() - self.started, 1),
+            'requests': self.requests,
+            'collections': {path: len(c.rolls) for path, c in self.collections.items()},
+        }
+
+    def cmd_shutdown(self, args):
+        self.running = False
+        return 'stopping'
+
+    def cmd_import(self, args):
+        _, rolls = self.rolls(args)
+        return [roll.name for roll in rolls]
+
+    def cmd_clean(self, args):
+        if args.get('path'):
+            _, roll = self.roll_from_path(args['path'])
+            rolls = [roll] if roll is not None else []
+        else:
+            _, rolls = self.rolls(args)
+        for roll in rolls:
+            self.importer.cleanRoll(roll, library_path=args.get('library_path'), **args.get('steps', {}))
+        return [roll.name for roll in rolls]
+
+    def cmd_clean_in_place(self, args):
+        collection, roll = self.roll_from_path(args['path'])
+        if roll is None:
+            raise ValueError(f'Could not import roll: {args["path"]}')
+        cleanRoll.run_clean_in_place(collection, self.importer, roll, os.path.normpath(args['path']), args['target_path'], args.get('steps', {}))
+        collection.save_snapshot()
+        return args['target_path']
+
+    def cmd_roll(self, args):
+        collection, roll = self.roll_from_path(args['path'])
+        if roll is None:
+            raise ValueError(f'Could not import roll: {args["path"]}')
+        collection.save_snapshot()
+        return cleanRoll.roll_summary(roll)
+
+    def cmd_render(self, args):
+        _, rolls = self.rolls(args)
+        renderer = renderTool.Renderer()
+        for roll in rolls:
+            renderer.render(roll, P1=args.get('P1', 1), P2=args.get('P2', 1), P3=args.get('P3', 1),
+                            save=True, output_folder=args.get('output_folder'))
+        return [roll.name for roll in rolls]
+
+    def cmd_archive(self, args):
+        t1 = time()
+        rolls_to_import = archiver.get_rolls_to_import(args['selector'])
+        collection_loc = self.collection(archiver.PATH_LOCAL)
+        collection_ext = self.collection(archiver.PATH_EXTERNAL)
+        rolls_loc = collection_loc.refresh_rolls(rolls_to_import)
+        rolls_ext = collection_ext.refresh_rolls(rolls_to_import)
+        collection_loc.save_snapshot()
+        collection_ext.save_snapshot()
+        archiver.archive(args['action'], args['selector'], args['function'], rolls_loc, rolls_ext, t1)
+        return len(rolls_loc)
+
+    def cmd_query(self, args):
+        collection = self.collection(args['library'])
+        if args.get('rolls') is not None:
+            self.rolls(args)
+        criteria = {k: args[k] for k in ('cam', 'stk', 'lns', 'year', 'location') if args.get(k) is not None}
+        images = collection.registry.select(min_rating=args.get('min_rating'), max_rating=args.get('max_rating'), **criteria)
+        images = sorted(images, key=lambda img: (img.roll.index, img.index or 0, img.fileName))
+        return [{
+            'roll': img.roll.index,
+            'index': img.index,
+            'fileName': img.fileName,
+            'filePath': img.filePath,
+            'rawFilePath': img.rawFilePath,
+            'rating': img.rating,
+            'stk': img.stk,
+            'cam': img.cam,
+            'location': img.location,
+            'dateExposed': img.dateExposed,
+        } for img in images]
+
+    # ---- server ----
+
+    # Runs one request, capturing everything it prints
+    def handle(self, message):
+        cmd = message.get('cmd') if isinstance(message, dict) else None
+        handler = getattr(self, f'cmd_{cmd}', None) if cmd else None
+        if handler is None:
+            return {'ok': False, 'result': None, 'output': '', 'error': f'Unknown command: {cmd}'}
+
+        out = io.StringIO()
+        t0 = time()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+            try:
+                result = handler(message)
+                response = {'ok': True, 'result': result, 'error': None}
+            except Exception as e:
+                db.e(self.dbIdx, f'Command failed: {cmd}', f'{type(e).__name__}: {e}')
+                response = {'ok': False, 'result': None, 'error': f'{type(e).__name__}: {e}'}
+        response['output'] = out.getvalue()
+        self.requests += 1
+        if cmd != 'ping':
+            db.i(self.dbIdx, f'{cmd} done in {time() - t0:.2f}s')
+        return response
+
+    def serve(self):
+        if is_running(self.socket_path):
+            db.e(self.dbIdx, 'A collection daemon is already running', self.socket_path)
+            return
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)     # stale socket from a daemon that didn't shut down cleanly
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)   # commands read and write the library: owner only
+        server.listen(8)
+        self.running = True
+        db.i(self.dbIdx, 'Collection daemon listening', self.socket_path)
+
+        try:
+            while self.running:
+                conn, _ = server.accept()
+                with conn:
+                    conn.settimeout(REQUEST_TIMEOUT)    # a client that never finishes its line must not hang the daemon
+                    try:
+                        message = receive(conn)
+                    except (OSError, ValueError) as e:     # includes TimeoutError
+                        db.w(self.dbIdx, 'Bad request', e)
+                        continue
+                    if message is None:
+                        continue
+                    response = self.handle(message)
+                    try:
+                        send(conn, response)
+                    except OSError as e:
+                        db.w(self.dbIdx, 'Client went away before the reply', e)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            for collection in self.collections.values():
+                collection.save_snapshot()
+            db.i(self.dbIdx, 'Collection daemon stopped')
+
+
+# Runs until Ctrl+C or the 'shutdown' command
+if __name__ == '__main__':
+    collectionDaemon().serve()
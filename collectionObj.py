@@ -1,23 +1,29 @@
 import os
-import numpy as np
-import pandas as pd
 import sys
-import matplotlib.pyplot as plt
-from matplotlib.widgets import SpanSelector, Button
 from datetime import datetime
 import shutil
 import subprocess
 import json
 from time import time
 
-from PIL import Image
-from PIL.ExifTags import TAGS
 import re
 import glob
 
 # sys.path.append(os.path.abspath(r'C:\A_Documents\Documents\Coding\Lightroom_FileFinder'))
 from rollObj import rollObj
 from debuggerTool import debuggerTool
+from exifTool import exifTool
+from exifCache import exifCache
+from exifOverrides import exifOverrides
+from libraryCatalog import libraryCatalog
+from rollRegistry import rollRegistry
+from exposureTable import exposureTable
+from collectionAnalytics import collectionAnalytics
+from stageMemo import stageMemo, files_fingerprint
+from rollFileIndex import RollFileIndex
+from collectionSnapshot import collectionSnapshot
+from parallelImport import import_rolls_parallel
+import referenceTables
 
 DEBUG = 0
 WARNING = 1
@@ -32,6 +38,7 @@ class collectionObj:
         # Initialize FilmCollection with a base directory
         self.directory = directory
         self.paths_rolls = [] # List of tuples (index, folder_path) for each roll
+        self.paths_by_index = {} # roll index (int) -> folder_path, built with paths_rolls
         # self.subdirectories = self._find_subdirectories() # eg ['/Users/rja/Documents/Coding/film-photo-archive-manager/data/filmCollectionTest/2023']
 
         # Initialize filesizes
@@ -43,12 +50,33 @@ class collectionObj:
         # Initialize dicts
         self.stocklist = {}
         self.cameralist = {}
+        self.cameras_by_brand_model = {}
+        self.cameras_by_id = {}
         self.lenslist = {}
         self.lenslist_by_make_focal = {}
         self.build_stocklist()
         self.build_cameralist()
         self.build_lenslist()
-        self.rolls = []  # List to store RollMetadata instances for each roll
+        self.rolls = []  # List to store RollMetadata instances for each roll (least recently used first)
+        self.max_resident = None  # LRU cap on processed rolls kept in self.rolls (None = keep every imported roll)
+        self.registry = rollRegistry()  # resident rolls by index + inverted indexes on cam/stk/lns/year/location/rating
+        self.table = exposureTable(self.registry)  # columnar view of the registry's exposures (to_frame)
+
+        # Shared exiftool worker pool, reused by every roll's fetch_exif
+        self.exiftool = exifTool()
+        # Library-wide EXIF cache, keyed by path + (size, mtime_ns, inode)
+        self.exif_cache = exifCache()
+        # Per-roll/frame EXIF corrections, applied in memory on import (exif_overrides.json)
+        self.exif_overrides = exifOverrides()
+        # Cached year/roll folder listing (re-lists only folders whose mtime changed), see libraryCatalog.py
+        self.catalog = libraryCatalog()
+        # Per-day photo/file/byte counts of every roll counted so far, kept in the catalog (see collectionAnalytics.py)
+        self.analytics = collectionAnalytics(self)
+        # Recorded process_roll stage results, replayed when a roll is re-imported unchanged (see stageMemo.py)
+        self.stage_memo = stageMemo()
+        # Processed rolls from earlier runs, restored when their files are unchanged (see collectionSnapshot.py)
+        self.snapshot = collectionSnapshot(directory)
+        self.snapshot.load(self)
 
     def init(self):
         self._import_rolls() # Import all rolls
@@ -84,16 +112,86 @@ class collectionObj:
             # Create a RollMetadata instance for each subfolder and add it to rolls
             new_roll = rollObj(directory=subdirectory, collection=self)
             new_roll.process_roll()
-            self.rolls.append(new_roll)
+            self._add_roll(new_roll)
 
-    # Returns address of roll index
+    # Returns address of roll index, importing the roll on demand if it isn't resident
     def getRoll(self, target_index):
-        # Retrieve the roll with the specified index, if it exists
-        for roll in self.rolls:
-            # Compare each roll's index with target_index (match types if index is a string)
-            if roll.index == target_index:
-                return roll  # Return the roll if a match is found
-        return None  # Return None if no roll with the specified index is found
+        # Retrieve the roll with the specified index, if it's resident
+        roll = self.registry.get(target_index)
+        if roll is not None:
+            self._touch_roll(roll)
+            return roll
+        if not self.paths_rolls:
+            self.build_directory_tree()
+        return self.import_roll(int(target_index))  # None if no roll with the specified index is found
+
+    # Yields processed rolls for a selector (same forms as import_rolls: 'all', [12, 15], (12, 18), '13-18'),
+    # importing each one only when it's reached. With self.max_resident set, at most that many processed
+    # rolls stay in memory, so a pass over the full library runs in bounded memory.
+    def iter_rolls(self, selector='all'):
+        if not self.paths_rolls:
+            self.build_directory_tree()
+        target_indices = self.get_import_indices(selector)
+        if target_indices == -1 or target_indices is None:
+            return
+        for index in target_indices:
+            roll = self.getRoll(index)
+            if roll is not None:
+                yield roll
+
+    # Yields exposures (masters and their copies) of the selected rolls, optionally filtered by a predicate
+    # eg. collection.iter_exposures(lambda img: img.rating and img.rating >= 4, rolls='90-111')
+    def iter_exposures(self, filter=None, rolls='all'):
+        for roll in self.iter_rolls(rolls):
+            for img in roll.images_all:
+                if filter is None or filter(img):
+                    yield img
+
+    # Returns the processed rolls of a selector for a long-running session (see collectionDaemon.py): resident rolls
+    # whose folder and files are unchanged are reused, the rest are re-imported (from the snapshot if still fresh)
+    def refresh_rolls(self, selector):
+        self.build_directory_tree()
+        target_indices = self.get_import_indices(selector)
+        if target_indices == -1 or target_indices is None:
+            return []
+
+        rolls = []
+        for index in target_indices:
+            roll = self.registry.get(index)
+            if roll is not None:
+                if self.paths_by_index.get(index) == roll.directory and self.is_fresh(roll):
+                    self._touch_roll(roll)
+                    rolls.append(roll)
+                    continue
+                db.d(self.dbIdx, 'Resident roll changed on disk, re-importing', roll.name)
+                self.rolls.remove(roll)
+                self.registry.remove(roll)
+            roll = self.import_roll(index)
+            if roll is not None:
+                rolls.append(roll)
+        return rolls
+
+    # True if a processed roll's folder still holds the files it was processed from
+    def is_fresh(self, roll):
+        if roll.files is None or not os.path.isdir(roll.directory):
+            return False
+        return files_fingerprint(RollFileIndex(roll.directory)) == files_fingerprint(roll.files)
+
+    # Marks a resident roll as most recently used
+    def _touch_roll(self, roll):
+        if self.rolls and self.rolls[-1] is not roll and roll in self.rolls:
+            self.rolls.remove(roll)
+            self.rolls.append(roll)
+
+    # Adds a processed roll, evicting the least recently used ones beyond self.max_resident
+    def _add_roll(self, roll):
+        self.rolls.append(roll)
+        self.registry.add(roll)
+        if self.max_resident is not None:
+            while len(self.rolls) > max(1, self.max_resident):
+                evicted = self.rolls.pop(0)
+                self.registry.remove(evicted)
+                db.d(self.dbIdx, 'Evicted roll from memory', evicted.name)
 
     # Gives overview of attributes
     def help(self):
@@ -170,6 +268,7 @@ class collectionObj:
         for roll in self.rolls[:]:  # Iterate over a copy of self.rolls
             if roll.jpgDirs is None:
                 self.rolls.remove(roll)  # Remove from the original list
+                self.registry.remove(roll)
                 continue
 
             # Accumulate sizes and counts TODO: reimplement as of 16 aug 2025
@@ -203,51 +302,36 @@ class collectionObj:
             # Print size and count only for RAW
             print(f"RAW: {format_size(self.sizeRaw)} and {self.countRaw} files")
 
+    # Columnar table of every resident exposure (see exposureTable.py), refreshed for the rolls that changed
+    def to_frame(self):
+        return self.table.to_frame()
+
+    # Resident exposures of the whole collection by rating, eg. filter_by_rating(4, '>=')
+    def filter_by_rating(self, stars, logic, include_copies=False):
+        return self.table.filter_by_rating(stars, logic, include_copies)
+
+    # Two exposure attributes as lists, eg. get_vec_from_rolls('date', 'fileSize'), for exposures dated
+    # within [startDate, endDate] ('YYYY.MM.DD'). Reads the exposure table instead of the removed roll.image_data.
     def get_vec_from_rolls(self, x, y, startDate=None, endDate=None):
-        # Convert startDate and endDate to datetime objects, or set them to None if not provided
-        start_date = datetime.strptime(startDate, '%Y.%m.%d') if startDate else None
-        end_date = datetime.strptime(endDate, '%Y.%m.%d') if endDate else None
-        
-        x_vals = []
-        y_vals = []
-        
-        # Iterate through each roll
-        for roll in self.rolls:
-            data = roll.image_data
-            for photo in data.keys():
-                # Convert the photo date to a datetime object
-                photo_date = datetime.strptime(data[photo][x], '%Y.%m.%d')
-                
-                # Check if the photo date is within the start and end date range
-                if (start_date is None or photo_date >= start_date) and (end_date is None or photo_date <= end_date):
-                    x_vals.append(data[photo][x])
-                    y_vals.append(data[photo][y])
+        return self.table.vectors(x, y, startDate, endDate)
 
-        return x_vals, y_vals
+    # Counts the rolls of a selector that are missing from the analytics or changed on disk (see collectionAnalytics.py),
+    # so the Plot views cover them without keeping them imported
+    def update_analytics(self, selector='all', refresh=False):
+        return self.analytics.update(selector, refresh)
     
+    # matplotlib is imported inside the plot methods, so only a plotting session pays for it. The series come
+    # from collection.analytics (aggregates kept in the catalog), not from the exposures: x_input is always the
+    # date, y_input groups by 'camera', 'stock', 'lens', 'format' or 'location' (or the cam/stk/lns/filmformat
+    # column names), and freq is 'D', 'W' or 'M'. Run collection.update_analytics() to cover rolls that aren't imported.
     class Plot:
         def __init__(self, collection):
             self.collection = collection
 
-        def date_camera(self, x_input, y_input, startDate=None, endDate=None):
-            # Get date and camera data
-            x, y = self.collection.get_vec_from_rolls(x_input, y_input, startDate, endDate)
-
-            # Convert dates to datetime objects
-            dates = [datetime.strptime(date_str, '%Y.%m.%d') for date_str in x]
-
-            # Create a DataFrame with the data and count occurrences
-            data = pd.DataFrame({'Date': dates, 'Camera': y})
-            data['Count'] = 1
-
-            # Group by Date and Camera, then aggregate counts
-            aggregated_data = data.groupby(['Date', 'Camera']).sum().reset_index()
-
-            # Pivot the data to have cameras as columns and fill NaNs with 0s
-            pivot_data = aggregated_data.pivot(index='Date', columns='Camera', values='Count').fillna(0)
-
-            # Calculate cumulative sum for each camera
-            cumulative_data = pivot_data.cumsum()
+        def date_camera(self, x_input, y_input, startDate=None, endDate=None, freq='D'):
+            import matplotlib.pyplot as plt
+            # Cumulative photos per camera over time
+            cumulative_data = self.collection.analytics.series(y_input, 'photos', freq, startDate, endDate)
 
             # Plot cumulative photos taken on each camera over time
             plt.figure(figsize=(12, 6))
@@ -263,31 +347,14 @@ class collectionObj:
             plt.tight_layout()
             plt.show()
 
-        def date_file_size(self, x_input='date', y_input='fileSize', startDate=None, endDate=None):
-            # Get date and file size data
-            x, y = self.collection.get_vec_from_rolls(x_input, y_input, startDate, endDate)
-
-            # Convert dates to datetime objects
-            dates = [datetime.strptime(date_str, '%Y.%m.%d') for date_str in x]
-
-            # Create a DataFrame with the data
-            data = pd.DataFrame({'Date': dates, 'FileSize': y})
-
-            # Convert file sizes to numeric (if they're strings) and handle missing values
-            data['FileSize'] = pd.to_numeric(data['FileSize'], errors='coerce').fillna(0)
-
-            # Convert file sizes from MB to GB
-            data['FileSize'] = data['FileSize'] / 1024
-
-            # Group by Date and sum file sizes per day
-            daily_size = data.groupby('Date').sum().sort_index()
-
-            # Calculate cumulative file size over time
-            cumulative_size = daily_size.cumsum()
+        def date_file_size(self, x_input='date', y_input='fileSize', startDate=None, endDate=None, freq='D'):
+            import matplotlib.pyplot as plt
+            # Cumulative file size over time, from bytes to GB
+            cumulative_size = self.collection.analytics.totals(freq, startDate, endDate)['bytes'] / 1024**3
 
             # Plot cumulative file size over time
             plt.figure(figsize=(12, 6))
-            plt.plot(cumulative_size.index, cumulative_size['FileSize'], label='Cumulative File Size', color='b')
+            plt.plot(cumulative_size.index, cumulative_size, label='Cumulative File Size', color='b')
 
             # Formatting the plot
             plt.xlabel('Date')
@@ -300,21 +367,15 @@ class collectionObj:
             plt.show()
 
         def size_over_image_count(self, x_input='date', y_input='fileSize', startDate=None, endDate=None):
-            # Get date and file size data
-            x, y = self.collection.get_vec_from_rolls(x_input, y_input, startDate, endDate)
-
-            # Convert y (file sizes) to a pandas Series and handle missing values
-            file_sizes = pd.Series(y).apply(pd.to_numeric, errors='coerce').fillna(0)
-
-            # Convert file sizes from MB to GB
-            file_sizes = file_sizes / 1024
-
-            # Calculate cumulative file size over image count
-            cumulative_size = file_sizes.cumsum()
+            import matplotlib.pyplot as plt
+            # Cumulative file count and size (GB) at the end of each day, in date order
+            totals = self.collection.analytics.totals('D', startDate, endDate)
+            image_count = totals['files']
+            cumulative_size = totals['bytes'] / 1024**3
 
             # Plot cumulative file size over image count
             plt.figure(figsize=(12, 6))
-            plt.plot(range(1, len(cumulative_size) + 1), cumulative_size, label='Cumulative File Size', color='b')
+            plt.plot(image_count, cumulative_size, label='Cumulative File Size', color='b')
 
             # Formatting the plot
             plt.xlabel('Image Number')
@@ -325,25 +386,10 @@ class collectionObj:
             plt.tight_layout()
             plt.show()
 
-        def cumulative_photos_over_time2(self, x_input, y_input, startDate=None, endDate=None):
-            # Get date and y data
-            x, y = self.collection.get_vec_from_rolls(x_input, y_input, startDate, endDate)
-
-            # Convert dates to datetime objects
-            dates = [datetime.strptime(date_str, '%Y.%m.%d') for date_str in x]
-
-            # Create a DataFrame with the data and count occurrences
-            data = pd.DataFrame({'Date': dates, f'{y_input}': y})
-            data['Count'] = 1
-
-            # Group by Date and Camera, then aggregate counts
-            aggregated_data = data.groupby(['Date', f'{y_input}']).sum().reset_index()
-
-            # Pivot the data to have cameras as columns and fill NaNs with 0s
-            pivot_data = aggregated_data.pivot(index='Date', columns=f'{y_input}', values='Count').fillna(0)
-
-            # Calculate cumulative sum for each camera
-            cumulative_data = pivot_data.cumsum()
+        def cumulative_photos_over_time2(self, x_input, y_input, startDate=None, endDate=None, freq='D'):
+            import matplotlib.pyplot as plt
+            # Cumulative photos per y_input value over time
+            cumulative_data = self.collection.analytics.series(y_input, 'photos', freq, startDate, endDate)
 
             # Plot cumulative photos taken on each camera over time
             plt.figure(figsize=(12, 6))
@@ -360,56 +406,22 @@ class collectionObj:
             plt.show()
 
         def vs_image(self, x_input='date', y_input='fileSize', startDate=None, endDate=None):
-            # Get date and file size data
-            x, y = self.collection.get_vec_from_rolls(x_input, y_input, startDate, endDate)
-
-            # Convert y (file sizes) to a pandas Series and handle missing values
-            file_sizes = pd.Series(y).apply(pd.to_numeric, errors='coerce').fillna(0)
-
-            # Convert file sizes from MB to GB
-            file_sizes = file_sizes / 1024
-
-            # Calculate cumulative file size over image count
-            cumulative_size = file_sizes.cumsum()
-
-            # Plot cumulative file size over image count
-            plt.figure(figsize=(12, 6))
-            plt.plot(range(1, len(cumulative_size) + 1), cumulative_size, label='Cumulative File Size', color='b')
-
-            # Formatting the plot
-            plt.xlabel('Image Number')
-            plt.ylabel('Cumulative File Size (GB)')
-            plt.title('Cumulative File Size Over Image Number')
-            plt.legend()
-            plt.grid(True)  # Add grid lines
-            plt.tight_layout()
-            plt.show()
-
+            self.size_over_image_count(x_input, y_input, startDate, endDate)
 
 
-        def cumulative_photos_over_time_with_span_and_labels(self, x_input, y_input, startDate=None, endDate=None):
-            # Get date and y data
-            x, y = self.collection.get_vec_from_rolls(x_input, y_input, startDate, endDate)
 
-            # Convert dates to datetime objects
-            dates = [datetime.strptime(date_str, '%Y.%m.%d') for date_str in x]
+        def cumulative_photos_over_time_with_span_and_labels(self, x_input, y_input, startDate=None, endDate=None, freq='D'):
+            import matplotlib.pyplot as plt
+            from matplotlib.widgets import SpanSelector
+            # Cumulative photos per y_input value over time (copied, the analytics frame is shared)
+            cumulative_data = self.collection.analytics.series(y_input, 'photos', freq, startDate, endDate).copy()
+            if cumulative_data.empty:
+                db.w('[N]', 'No dated exposures to plot', y_input)
+                return
 
             # Convert dates to ordinal floats for SpanSelector compatibility
-            date_floats = [date.toordinal() for date in dates]
-
-            # Create a DataFrame with the data and count occurrences
-            data = pd.DataFrame({'Date': dates, f'{y_input}': y})
-            data['Count'] = 1
-
-            # Group by Date and Camera, then aggregate counts
-            aggregated_data = data.groupby(['Date', f'{y_input}']).sum().reset_index()
-
-            # Pivot the data to have cameras as columns and fill NaNs with 0s
-            pivot_data = aggregated_data.pivot(index='Date', columns=f'{y_input}', values='Count').fillna(0)
-
-            # Calculate cumulative sum for each camera
-            cumulative_data = pivot_data.cumsum()
             cumulative_data['DateFloat'] = cumulative_data.index.to_series().map(datetime.toordinal)
+            date_floats = list(cumulative_data['DateFloat'])
 
             # Create figure and axes for SpanSelector
             fig, (ax1, ax2) = plt.subplots(2, figsize=(12, 8))
@@ -496,69 +508,15 @@ class collectionObj:
             plt.tight_layout()
             plt.show()
 
+    # Reference tables come compiled from referenceTables.py (cached on the xlsx mtimes, shared between collections)
     def build_stocklist(self):
-        project_dir = os.path.dirname(os.path.abspath(__file__))
-        xlsx_path = os.path.join(project_dir, 'data', 'stocklist.xlsx')
-        df = pd.read_excel(xlsx_path, dtype=str, engine="openpyxl").fillna("")
-
-        stocklist = {}
-
-        for _, row in df.iterrows():
-            stk_id = row["KEY_ID"].strip()
-            if not stk_id:
-                continue
-
-            entry = {
-                "KEY_ID": row["KEY_ID"].strip(),
-                "stk": row["stk"].strip(),
-                "stock": row["stock"].strip(),
-                "manufacturer": row["manufacturer"].strip(),
-                "boxspeed": row["boxspeed"].strip(),
-                "process": row["process"].strip(),
-                "isColor": bool(int(row["isColor"])),
-                "isBlackAndWhite": bool(int(row["isBlackAndWhite"])),
-                "isInfrared": bool(int(row["isInfrared"])),
-                "isNegative": bool(int(row["isNegative"])),
-                "isSlide": bool(int(row["isSlide"])),
-                "font": row["font"].strip() if pd.notna(row["font"]) else None,
-                "color": row["color"].strip() if pd.notna(row["color"]) else None,
-            }
-
-            stocklist[stk_id] = entry
-
-        self.stocklist = stocklist
+        self.stocklist = referenceTables.load_table('stocklist')['stocklist']
 
     def build_cameralist(self):
-        project_dir = os.path.dirname(os.path.abspath(__file__))
-        xlsx_path = os.path.join(project_dir, 'data', 'cameralist.xlsx')
-        df = pd.read_excel(xlsx_path, dtype=str, engine="openpyxl").fillna("")
-
-        cameralist = {}
-
-        for _, row in df.iterrows():
-            cam_id = row["id"].strip()
-            if not cam_id:
-                continue
-
-            entry = {
-                "id": row["id"].strip(),
-                "model": row["model"].strip(),
-                "brand": row["brand"].strip(),
-                "serial": row["serial"].strip(),
-                "filmtype": row["filmtype"].strip(),
-                "filmformat": row["filmformat"].strip(),
-            }
-
-            # store under id
-            cameralist[cam_id] = entry
-            # also allow lookup by "Brand Model" and by model
-            full = f'{entry["brand"]} {entry["model"]}'.strip()
-            if full:
-                cameralist[full] = entry
-            if entry["model"]:
-                cameralist[entry["model"]] = entry
-
-        self.cameralist = cameralist
+        table = referenceTables.load_table('cameralist')
+        self.cameralist = table['cameralist']
+        self.cameras_by_brand_model = table['cameras_by_brand_model']     # (brand.lower(), model.lower()) -> camera
+        self.cameras_by_id = table['cameras_by_id']
 
     def build_lenslist(self):
         # Reference table for importMetadata.py's Lens Make/Model <-> Focal
@@ -574,64 +532,26 @@ class collectionObj:
         # Unlike stocklist/cameralist, a missing file is tolerated -- this
         # is meant to be populated manually/incrementally, same as the
         # other two, but shouldn't block startup if it doesn't exist yet.
-        project_dir = os.path.dirname(os.path.abspath(__file__))
-        xlsx_path = os.path.join(project_dir, 'data', 'lenslist.xlsx')
+        table = referenceTables.load_table('lenslist')
+        xlsx_path = referenceTables.xlsx_path('lenslist')
 
-        if not os.path.exists(xlsx_path):
+        if table['missing']:
             db.w(self.dbIdx, 'No lenslist.xlsx found -- Lens Model/Focal Length '
                               'auto-fill will be skipped.', xlsx_path)
-            self.lenslist = {}
-            self.lenslist_by_make_focal = {}
-            return
-
-        df = pd.read_excel(xlsx_path, dtype=str, engine="openpyxl").fillna("")
-
         # lenslist.xlsx is hand-maintained in Excel -- tolerate an older/
         # partial column set (eg. re-saved from a stale copy that predates a
         # newer column) rather than crashing outright. "format" specifically
         # backs make+focal-length disambiguation (see lenslist_by_make_focal
-        # below); flag its absence since that silently degrades matching.
-        if 'format' not in df.columns:
+        # above); flag its absence since that silently degrades matching.
+        elif not table['has_format']:
             db.w(self.dbIdx, 'lenslist.xlsx has no "format" column -- ambiguous '
                               'make+focal-length lens matches (eg. a 135 and a 6x7 '
                               'lens sharing a nominal focal length) can\'t be '
                               'disambiguated. Add a "format" column to enable this.',
                  xlsx_path)
 
-        def get(row, col):
-            return row.get(col, '').strip()
-
-        lenslist = {}
-        lenslist_by_make_focal = {}
-
-        for _, row in df.iterrows():
-            make = get(row, "make")
-            model = get(row, "model")
-            if not make or not model:
-                continue
-
-            entry = {
-                "make": make,
-                "model": model,
-                "focalLength": get(row, "focalLength"),
-                "maxAperture": get(row, "maxAperture"),
-                "minAperture": get(row, "minAperture"),
-                "format": get(row, "format"),
-                "weight": get(row, "weight"),
-                "cost": get(row, "cost"),
-                "owned": get(row, "owned"),
-                "sold": get(row, "sold"),
-                "SN": get(row, "SN"),
-            }
-
-            lenslist[f'{make} {model}'.strip().lower()] = entry
-
-            if entry["focalLength"]:
-                key = (make.lower(), entry["focalLength"])
-                lenslist_by_make_focal.setdefault(key, []).append(entry)
-
-        self.lenslist = lenslist
-        self.lenslist_by_make_focal = lenslist_by_make_focal
+        self.lenslist = table['lenslist']
+        self.lenslist_by_make_focal = table['lenslist_by_make_focal']
 
     # Copies over all files from a roll into a designated (cleaner) collection directory with consistent filename extensions.
     def re_export_roll(self, roll):
@@ -645,20 +565,19 @@ class collectionObj:
         db.i(self.dbIdx, f'Importing roll:', index)
 
         # Find the path for the specified index in self.paths_rolls
-        path_roll = None
-        for idx, path in self.paths_rolls:
-            if int(idx) == index:
-                path_roll = path
-                break
+        path_roll = self.paths_by_index.get(index)
         if path_roll is None:
             db.w(self.dbIdx, f'Roll not found in the collection:', index)
             return
 
-        new_roll = rollObj(directory=path_roll, collection=self)
-        if not new_roll.preprocess_roll(): return None
-        new_roll.process_roll()
-        self.rolls.append(new_roll)
-        return
+        new_roll = self.snapshot.restore(self, path_roll)
+        if new_roll is None:
+            new_roll = rollObj(directory=path_roll, collection=self)
+            if not new_roll.preprocess_roll(): return None
+            new_roll.process_roll()
+            self.snapshot.record(new_roll)
+        self._add_roll(new_roll)
+        return new_roll
 
     # Imports a single roll directly from its folder path, bypassing self.paths_rolls /
     # build_directory_tree(). Used for single-roll workflows (eg. cleanRoll.py) where the
@@ -671,44 +590,67 @@ class collectionObj:
             db.e(self.dbIdx, 'Roll path does not exist:', path)
             return None
 
-        new_roll = rollObj(directory=path, collection=self)
+        new_roll = self.snapshot.restore(self, path)
+        if new_roll is None:
+            new_roll = rollObj(directory=path, collection=self)
+            if not new_roll.preprocess_roll():
+                db.e(self.dbIdx, 'Failed to preprocess roll at path:', path)
+                return None
+            new_roll.process_roll()
+            self.snapshot.record(new_roll)
+        self._add_roll(new_roll)
+        return new_roll
+
+    # Re-imports a roll from its folder (eg. after watchTool saw its files change) and swaps the new rollObj
+    # in for the old one in self.rolls. Returns the new roll, or None (old roll kept) if the re-import failed.
+    def reload_roll(self, roll):
+        new_roll = rollObj(directory=roll.directory, collection=self)
         if not new_roll.preprocess_roll():
-            db.e(self.dbIdx, 'Failed to preprocess roll at path:', path)
+            db.e(self.dbIdx, 'Failed to re-import roll, keeping previous import:', roll.directory)
+            roll.isDirty = False
             return None
         new_roll.process_roll()
-        self.rolls.append(new_roll)
+        self.snapshot.record(new_roll)
+
+        for i, r in enumerate(self.rolls):
+            if r is roll:
+                self.rolls[i] = new_roll
+                self.registry.add(new_roll)
+                break
+        else:
+            self._add_roll(new_roll)
         return new_roll
 
-    # Identifies collection directory and builds a directory tree
-    def build_directory_tree(self):
+    # Writes the warm-start snapshot (rolls processed in this run are recorded as they're imported)
+    def save_snapshot(self):
+        if self.snapshot.save(self):
+            db.i(self.dbIdx, 'Saved warm-start snapshot', f'{len(self.snapshot.entries)} rolls, {self.snapshot.restored} restored this run')
+
+    # Writes pending EXIF overrides (see exifOverrides.py) into the files of imported rolls, in one batch.
+    # rolls: None for all imported rolls, or a list of roll indices. dry_run only reports what would change.
+    # Returns the list of files changed.
+    def materialize_exif_overrides(self, rolls=None, dry_run=False):
+        images = []
+        for roll in self.rolls:
+            if rolls is None or roll.index in rolls:
+                images.extend(roll.images)
+        changed = self.exif_overrides.materialize(images, self.exiftool, dry_run=dry_run)
+        db.i(self.dbIdx, 'Materialized EXIF overrides', f'{len(changed)} files changed')
+        return changed
+
+    # Identifies collection directory and builds a directory tree (from the library catalog, see libraryCatalog.py).
+    # refresh=True re-lists every year folder even if its mtime is unchanged.
+    def build_directory_tree(self, refresh=False):
         path_library = self.directory # typically /.../photography/film/library/
 
-        # Identify years in library
-        paths_years = []
-        for path in os.listdir(path_library):
-            if os.path.isdir(os.path.join(path_library, path)) and re.match(r'20\d{2}', path) or path == 'Temp':
-                paths_years.append(os.path.join(path_library, path))
-
-        # Index folders from each year
-        paths_rolls = []
-        for path_year in paths_years:
-            folders = os.listdir(path_year)
-            for folder in folders:
-                folder_path = os.path.join(path_year, folder)
-                if os.path.isdir(folder_path):
-                    # Get index from folder name eg 11_22-10-03 Ektar 100 Zurich Flims Andeer --> 11 or 011_22-10-03 Ektar 100 Zurich Flims Andeer --> 11
-                    if '_' in folder:
-                        index = folder.split('_')[0]
-                    elif ' - ' in folder:
-                        index = folder.split(' - ')[0]
-                    else:
-                        db.e('[C]',f'Could not ID roll index from folder name!', folder)
-                    # build list and sort by index
-                    paths_rolls.append((index, folder_path))
-                    paths_rolls = sorted(paths_rolls, key=lambda x: int(x[0]))
-                    pass
+        # Index roll folders from each year, sorted by index
+        # eg 11_22-10-03 Ektar 100 Zurich Flims Andeer --> 11 or 011_22-10-03 Ektar 100 Zurich Flims Andeer --> 11
+        paths_rolls = self.catalog.library_rolls(path_library, refresh=refresh)
             
         self.paths_rolls = paths_rolls
+        self.paths_by_index = {}
+        for idx, path in paths_rolls:
+            self.paths_by_index.setdefault(int(idx), path)
 
         if len(self.paths_rolls) == 0:
             db.w(self.dbIdx, 'No rolls found in the library directory:', path_library)
@@ -724,11 +666,37 @@ class collectionObj:
     #   [index1, index2, ...] - imports rolls with specified indices
     #   (12,13,15) - imports rolls within the specified range (inclusive)
     #   ('13-18') - imports rolls within the specified range (inclusive)
-    def import_rolls(self, rolls):
+    # workers=N imports the rolls on N processes (see parallelImport.py); self.rolls still ends up in index order
+    def import_rolls(self, rolls, workers=None):
         target_indices = self.get_import_indices(rolls)
         if target_indices == -1 or target_indices is None:
             return
 
+        if workers and workers > 1 and len(target_indices) > 1:
+            # Rolls restored from the snapshot skip the pool; the rest are merged back in index order
+            paths = []
+            restored = {}
+            for index in target_indices:
+                if index not in self.paths_by_index:
+                    db.w(self.dbIdx, f'Roll not found in the collection:', index)
+                    continue
+                path = self.paths_by_index[index]
+                paths.append(path)
+                roll = self.snapshot.restore(self, path)
+                if roll is not None:
+                    restored[path] = roll
+            to_process = [p for p in paths if p not in restored]
+            results = import_rolls_parallel(self, to_process, workers)
+            for path in paths:
+                roll = restored.get(path)
+                if roll is None:
+                    _, roll = next(results)
+                    if roll is not None:
+                        self.snapshot.record(roll)
+                if roll is not None:
+                    self._add_roll(roll)
+            return
+
         for index in target_indices:
             self.import_roll(index)
 
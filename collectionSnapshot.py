@@ -0,0 +1,125 @@
+# collectionSnapshot.py
+# Warm-start snapshot of a collection's processed rolls.
+
+import os
+import zlib
+import pickle
+import hashlib
+from rollFileIndex import RollFileIndex
+from stageMemo import digest, files_fingerprint
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'snapshots')
+# Modules whose code shapes the pickled roll graph: editing one invalidates every snapshot. Besides the
+# pickled classes that's everything process_roll runs: EXIF extraction and caching, override application,
+# stage replay and the reference table compilers.
+SOURCE_MODULES = (
+    'rollObj', 'exposureObj', 'exifRecord', 'exifReader', 'rawMatcher', 'rollFileIndex',
+    'exifTool', 'exifCache', 'exifOverrides', 'stageMemo', 'referenceTables',
+)
+
+
+# Snapshot file of a library folder, eg. data/snapshots/Film Scanning-3f9c1a20b4.snapshot
+def snapshot_path(directory):
+    directory = os.path.normpath(directory)
+    key = hashlib.sha1(directory.encode('utf-8', 'surrogatepass')).hexdigest()[:10]
+    return os.path.join(SNAPSHOT_DIR, f'{os.path.basename(directory)}-{key}.snapshot')
+
+
+def source_digest():
+    here = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha1()
+    for name in SOURCE_MODULES:
+        try:
+            with open(os.path.join(here, name + '.py'), 'rb') as f:
+                h.update(f.read())
+        except OSError:
+            h.update(name.encode())
+    return h.hexdigest()
+
+
+class collectionSnapshot:
+    def __init__(self, directory, path=None):
+        self.dbIdx = '[S]'
+        self.path = path or snapshot_path(directory)
+        self.entries = {}       # roll directory -> (files fingerprint, compressed pickled rollObj)
+        self.dirty = False
+        self.restored = 0
+        self.stale = 0
+
+    # Everything outside a roll folder that its processed state depends on
+    def header(self, collection):
+        return digest(
+            SNAPSHOT_VERSION,
+            source_digest(),
+            digest(collection.stocklist, collection.cameralist, collection.lenslist),
+            repr(collection.exif_overrides.rules),
+        )
+
+    def load(self, collection):
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:
+            db.w(self.dbIdx, 'Could not read snapshot, starting cold', f'{self.path}: {type(e).__name__}: {e}')
+            return 0
+        if not isinstance(data, dict) or data.get('header') != self.header(collection):
+            db.i(self.dbIdx, 'Snapshot out of date (code, tables or overrides changed), starting cold')
+            self.dirty = True
+            return 0
+        self.entries = data['rolls']
+        db.d(self.dbIdx, f'Loaded snapshot with {len(self.entries)} rolls', self.path)
+        return len(self.entries)
+
+    # Returns the snapshot's rollObj for a roll folder if none of its files changed, else None
+    def restore(self, collection, directory):
+        directory = os.path.normpath(directory)
+        entry = self.entries.get(directory)
+        if entry is None:
+            return None
+        fingerprint, blob = entry
+        if files_fingerprint(RollFileIndex(directory)) != fingerprint:
+            self.stale += 1
+            return None
+        try:
+            roll = pickle.loads(zlib.decompress(blob))
+        except Exception as e:
+            db.w(self.dbIdx, 'Could not restore roll from snapshot', f'{directory}: {type(e).__name__}: {e}')
+            return None
+        roll.collection = collection
+        self.restored += 1
+        db.d(roll.dbIdx, 'Restored roll from snapshot', roll.name)
+        return roll
+
+    # Stores a freshly processed roll (call before anything modifies it or its files)
+    def record(self, roll):
+        if roll.files is None or not roll.images:
+            return
+        blob = zlib.compress(pickle.dumps(roll, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        self.entries[os.path.normpath(roll.directory)] = (files_fingerprint(roll.files), blob)
+        self.dirty = True
+
+    # Writes the snapshot file if anything was recorded since it was loaded
+    def save(self, collection):
+        if not self.dirty:
+            return False
+        # forget rolls whose folder was renamed or removed (eg. cleanRoll.py renames in place)
+        self.entries = {d: e for d, e in self.entries.items() if os.path.isdir(d)}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {'header': self.header(collection), 'rolls': self.entries}
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self.dirty = False
+        db.d(self.dbIdx, f'Saved snapshot with {len(self.entries)} rolls', f'{os.path.getsize(self.path) / 1e6:.1f}MB')
+        return True
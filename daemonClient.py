@@ -0,0 +1,90 @@
+# daemonClient.py
+# Client side of collectionDaemon.py: sends one command over its Unix socket and echoes the daemon's output.
+
+import os
+import sys
+import json
+import socket
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+SOCKET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'collection.sock')
+CONNECT_TIMEOUT = 0.5
+
+
+def connect(socket_path=SOCKET_PATH, timeout=CONNECT_TIMEOUT):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+# Wire format: one JSON object per line each way.
+#   request  {"cmd": "import", "library": "...", "rolls": "93-111"}
+#   response {"ok": true, "result": ..., "output": "<captured stdout>", "error": null}
+def send(sock, message):
+    sock.sendall((json.dumps(message, default=str) + '\n').encode('utf-8'))
+
+
+def receive(sock):
+    buf = bytearray()
+    while not buf.endswith(b'\n'):
+        chunk = sock.recv(64 * 1024)
+        if not chunk:
+            break
+        buf.extend(chunk)
+    if not buf:
+        return None
+    return json.loads(buf.decode('utf-8'))
+
+
+# True if a daemon is listening on socket_path. The daemon runs one command at a time, so a ping that
+# times out means it's busy with another command (a stale socket refuses the connection right away):
+# it still counts as running, and a request() waits its turn instead of running the work alongside it.
+def is_running(socket_path=SOCKET_PATH):
+    if not os.path.exists(socket_path):
+        return False
+    try:
+        with connect(socket_path) as sock:
+            send(sock, {'cmd': 'ping'})
+            response = receive(sock)
+    except TimeoutError:
+        return True
+    except (OSError, ValueError):
+        return False
+    return bool(response and response.get('ok'))
+
+
+# Runs a command on the daemon and returns its result (None on failure). The daemon's output is
+# echoed to stdout as it would have been printed by a local run.
+# Roll selectors travel as JSON: use 'all', '13-18' or a list of indices (a (start, end) tuple
+# would arrive as a two-element list).
+def request(cmd, socket_path=SOCKET_PATH, echo=True, **args):
+    message = dict(args, cmd=cmd)
+    try:
+        with connect(socket_path) as sock:
+            sock.settimeout(None)   # commands like 'clean' run for as long as they need
+            send(sock, message)
+            response = receive(sock)
+    except OSError as e:
+        db.e('[D]', 'Could not reach collection daemon', f'{socket_path}: {e}')
+        return None
+
+    if response is None:
+        db.e('[D]', 'Collection daemon closed the connection', cmd)
+        return None
+    if echo and response.get('output'):
+        sys.stdout.write(response['output'])
+        sys.stdout.flush()
+    if not response.get('ok'):
+        db.e('[D]', f'Daemon command failed: {cmd}', response.get('error'))
+        return None
+    return response.get('result')
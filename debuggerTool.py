@@ -1,9 +1,14 @@
-import numpy as np
 import time
 import sys
 
 # TODO: handle cases when none is passed, methods will crash on NoneType at the moment
 
+# Stand-in for np.isscalar (this module is imported by everything, so it stays free of numpy).
+# Strings, numbers and numpy scalars print on one line, anything iterable prints one item per line,
+# and any other object (eg. an exception) prints as a scalar instead of failing on iteration.
+def is_scalar(data):
+    return isinstance(data, (str, bytes)) or not hasattr(data, '__iter__')
+
 class debuggerTool:
 
     def __init__(self, on_debug=1, on_warning=1, on_error=1):
@@ -77,7 +82,7 @@ class debuggerTool:
     
         if data is not None:
             # handle scalars
-            if np.isscalar(data):
+            if is_scalar(data):
                 # check length and ensure < n chars
                 if len(str(data)) < 100:
                     string_debugger = string_debugger + f'\t{self.colorize(data, self.col_data)}'
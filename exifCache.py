@@ -0,0 +1,125 @@
+# exifCache.py
+# Library-wide SQLite cache of parsed EXIF dicts, keyed by path and validated by (size, mtime_ns, inode).
+
+import os
+import json
+import sqlite3
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+EXIF_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'exif_cache.sqlite')
+BATCH = 500     # max paths per IN (...) query (stays below SQLite's bound-variable limit)
+
+
+# Returns the (size, mtime_ns, inode) validation key for a path, or None if it can't be stat'ed
+def stat_key(path, st=None):
+    try:
+        if st is None:
+            st = os.stat(path)
+        return (st.st_size, st.st_mtime_ns, st.st_ino)
+    except OSError:
+        return None
+
+
+class exifCache:
+    def __init__(self, path=EXIF_CACHE_PATH):
+        self.dbIdx = '[X]'
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # timeout: parallel imports write from several processes. check_same_thread: cleanScheduler imports on its own thread
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS exif ('
+            'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, data TEXT)'
+        )
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self.conn.commit()
+
+    # Returns (hits, misses): dict path -> exif for fresh entries, list of missing/stale paths.
+    # stats optionally maps path -> os.stat_result (or (size, mtime_ns, inode)) to skip re-stat'ing.
+    def get_many(self, paths, stats=None):
+        keys = {}
+        for path in paths:
+            st = stats.get(path) if stats else None
+            keys[path] = st if isinstance(st, tuple) else stat_key(path, st)
+
+        hits = {}
+        paths = list(keys.keys())
+        for i in range(0, len(paths), BATCH):
+            batch = paths[i:i + BATCH]
+            rows = self.conn.execute(
+                f'SELECT path, size, mtime_ns, inode, data FROM exif WHERE path IN ({",".join("?" * len(batch))})',
+                batch,
+            ).fetchall()
+            for path, size, mtime_ns, inode, data in rows:
+                if keys.get(path) != (size, mtime_ns, inode):
+                    continue
+                try:
+                    exif = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                exif['SourceFile'] = path
+                hits[path] = exif
+
+        misses = [p for p in paths if p not in hits]
+        self.hits += len(hits)
+        self.misses += len(misses)
+        return hits, misses
+
+    # Returns the cached exif for a single path (ignores staleness), or None
+    def get(self, path):
+        row = self.conn.execute('SELECT data FROM exif WHERE path = ?', (path,)).fetchone()
+        if row is None:
+            return None
+        exif = json.loads(row[0])
+        exif['SourceFile'] = path
+        return exif
+
+    # Stores exif dicts, keyed by their SourceFile, against each file's current stat.
+    # stats (as for get_many) should be taken before the exif was read; paths missing from it are skipped.
+    def put_many(self, data, stats=None):
+        rows = []
+        for exif in data:
+            if not isinstance(exif, dict):
+                continue
+            path = exif.get('SourceFile')
+            if not path:
+                continue
+            if stats is not None:
+                st = stats.get(path)
+                key = st if isinstance(st, tuple) or st is None else stat_key(path, st)
+            else:
+                key = stat_key(path)
+            if key is None:
+                continue
+            rows.append((path, key[0], key[1], key[2], json.dumps(exif, ensure_ascii=False)))
+
+        if not rows:
+            return 0
+        self.conn.executemany('INSERT OR REPLACE INTO exif VALUES (?, ?, ?, ?, ?)', rows)
+        self.conn.execute(
+            "INSERT INTO meta VALUES ('revision', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+        self.conn.commit()
+        return len(rows)
+
+    # Bumped on every write, so downstream memoization can tell when cached EXIF changed
+    @property
+    def revision(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return int(row[0]) if row else 0
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,142 @@
+# exifOverrides.py
+# Per-roll / per-frame EXIF corrections from exif_overrides.json, applied in memory on import.
+
+import os
+import json
+from exifWriter import exifWriteQueue
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+EXIF_OVERRIDES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'exif_overrides.json')
+
+# Extra tags written alongside a corrected tag when materializing, so Lightroom (which prefers
+# the XMP copy) sees the same value as the IPTC record read on import
+WRITE_ALIASES = {
+    'IPTC:City': ['XMP-photoshop:City'],
+    'IPTC:Province-State': ['XMP-photoshop:State'],
+    'IPTC:Country-PrimaryLocationName': ['XMP-photoshop:Country'],
+}
+
+
+# Returns True if an exif value counts as missing (same rule as exifRecord.get_value, which exposureObj._update_from_exif reads through)
+def is_empty(value):
+    return value in (None, "", "NaN")
+
+
+# Reads "Group:Tag" from a -g1 exif dict, or None
+def get_tag(exif, key):
+    group, tag = key.split(':', 1)
+    value = (exif.get(group) or {}).get(tag)
+    return None if is_empty(value) else value
+
+
+def matches(exif, key, expected):
+    value = get_tag(exif, key)
+    if expected is None:
+        return value is None
+    return value is not None and str(value) == str(expected)
+
+
+# Rule format (list under "rules"):
+#   roll      roll index the rule applies to (omit for library-wide rules)
+#   frames    optional list of exposure indices within the roll
+#   when      {"Group:Tag": value} -- all must match (null = tag missing/empty)
+#   when_any  {"Group:Tag": value} -- at least one must match
+#   set       {"Group:Tag": value} -- literal values (null = remove tag)
+#   copy      {"Group:Tag": "Group:Tag"} -- destination <- source (skipped if source is empty)
+#   note      free text, ignored
+class exifOverrides:
+    def __init__(self, path=EXIF_OVERRIDES_PATH):
+        self.dbIdx = '[X]'
+        self.path = path
+        self.rules = {}     # roll index (or None for library-wide) -> list of rules
+        self.load()
+
+    def load(self):
+        self.rules = {}
+        if not os.path.exists(self.path):
+            db.w(self.dbIdx, 'No EXIF override table found', self.path)
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            db.e(self.dbIdx, 'Failed to load EXIF override table', e)
+            return
+
+        for rule in data.get('rules', []):
+            roll = rule.get('roll')
+            if 'frames' in rule:
+                rule['frames'] = {int(f) for f in rule['frames']}
+            self.rules.setdefault(None if roll is None else int(roll), []).append(rule)
+        db.d(self.dbIdx, 'Loaded EXIF overrides', sum(len(r) for r in self.rules.values()))
+
+    # Returns the {"Group:Tag": value} corrections that apply to one frame's exif (value None = remove)
+    def changes_for(self, roll_index, frame, exif):
+        rules = self.rules.get(None, []) + self.rules.get(roll_index, [])
+        if not rules or not exif:
+            return {}
+
+        changes = {}
+        for rule in rules:
+            if 'frames' in rule and frame not in rule['frames']:
+                continue
+            if not all(matches(exif, k, v) for k, v in rule.get('when', {}).items()):
+                continue
+            when_any = rule.get('when_any')
+            if when_any and not any(matches(exif, k, v) for k, v in when_any.items()):
+                continue
+
+            for key, value in rule.get('set', {}).items():
+                changes[key] = value
+            for key, source in rule.get('copy', {}).items():
+                value = get_tag(exif, source)
+                if value is not None:
+                    changes[key] = value
+
+        # drop no-ops so materialize() only touches files that actually differ
+        def norm(v):
+            return None if is_empty(v) else str(v)
+        return {k: v for k, v in changes.items() if norm(get_tag(exif, k)) != norm(v)}
+
+    # Returns (patched exif, changes). The fetched dict is left untouched (it is shared with the exif cache),
+    # only the groups that change are copied.
+    def apply(self, roll_index, frame, exif):
+        changes = self.changes_for(roll_index, frame, exif)
+        if not changes:
+            return exif, changes
+
+        patched = dict(exif)
+        for key, value in changes.items():
+            group, tag = key.split(':', 1)
+            patched[group] = dict(patched.get(group) or {})
+            if is_empty(value):
+                patched[group].pop(tag, None)
+            else:
+                patched[group][tag] = value
+        return patched, changes
+
+    # Writes the pending corrections of images (exposureObj's with .exifOverrides) into their files through one
+    # exifWriteQueue flush (batched write + batched read-back). Returns the list of files changed.
+    def materialize(self, images, exiftool, dry_run=False):
+        queue = exifWriteQueue(exiftool)
+        for img in images:
+            if not img.exifOverrides:
+                continue
+            tags = {}
+            for key, value in img.exifOverrides.items():
+                for tag in [key] + WRITE_ALIASES.get(key, []):
+                    tags[tag] = value
+            tags['IPTCDigest'] = None
+            queue.add(img.filePath, tags)
+
+        db.i(self.dbIdx, f'Materializing EXIF overrides for {len(queue)} files', 'dry run' if dry_run else '')
+        if dry_run:
+            for path, tags in queue.edits.items():
+                db.i(self.dbIdx, os.path.basename(path), tags)
+            return []
+        return queue.flush()
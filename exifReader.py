@@ -0,0 +1,503 @@
+# exifReader.py
+# Pure-Python reader for the fetch_exif tag set, straight from a JPEG's or RAW/TIFF's metadata.
+
+import os
+import re
+import mmap
+import struct
+import xml.etree.ElementTree as ET
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+JPEG_EXTS = ('.jpg', '.jpeg')
+RAW_EXTS = ('.arw', '.dng', '.tif', '.tiff')
+
+EXIF_HEADER = b'Exif\x00\x00'
+XMP_HEADER = b'http://ns.adobe.com/xap/1.0/\x00'
+PHOTOSHOP_HEADER = b'Photoshop 3.0\x00'
+
+# TIFF type -> byte size
+TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8, 13: 4}
+
+# (group, tag) per TIFF tag id, for the IFDs we read
+IFD0_TAGS = {
+    0x010F: 'Make',
+    0x0110: 'Model',
+    0x0131: 'Software',
+}
+EXIF_IFD_TAGS = {
+    0x829A: 'ExposureTime',
+    0x829D: 'FNumber',
+    0x8827: 'ISO',
+    0x9003: 'DateTimeOriginal',
+    0x9004: 'CreateDate',
+    0x9201: 'ShutterSpeedValue',
+    0x920A: 'FocalLength',
+    0xA433: 'LensMake',
+    0xA434: 'LensModel',
+}
+EXIF_IFD_POINTER = 0x8769
+
+# TIFF structure tags used for RAW containers
+TIFF_SUBFILE_TYPE = 0x00FE
+TIFF_IMAGE_WIDTH = 0x0100
+TIFF_IMAGE_HEIGHT = 0x0101
+TIFF_COMPRESSION = 0x0103
+TIFF_PHOTOMETRIC = 0x0106
+TIFF_STRIP_OFFSETS = 0x0111
+TIFF_STRIP_BYTE_COUNTS = 0x0117
+TIFF_SUB_IFDS = 0x014A
+TIFF_JPEG_OFFSET = 0x0201
+TIFF_JPEG_LENGTH = 0x0202
+TIFF_XMP = 0x02BC
+PHOTOMETRIC_RAW = (32803, 34892)    # CFA, LinearRaw -- sensor data, not a viewable preview
+MAX_IFDS = 32                       # guard against IFD loops in damaged files
+STRUCTURE_TAGS = {
+    TIFF_SUBFILE_TYPE, TIFF_IMAGE_WIDTH, TIFF_IMAGE_HEIGHT, TIFF_COMPRESSION, TIFF_PHOTOMETRIC,
+    TIFF_STRIP_OFFSETS, TIFF_STRIP_BYTE_COUNTS, TIFF_SUB_IFDS, TIFF_JPEG_OFFSET, TIFF_JPEG_LENGTH, TIFF_XMP,
+}
+
+# XMP namespace -> exiftool -g1 group, and the properties read from each
+XMP_GROUPS = {
+    'http://ns.adobe.com/xap/1.0/mm/': ('XMP-xmpMM', ('PreservedFileName',)),
+    'http://ns.adobe.com/xap/1.0/': ('XMP-xmp', ('Rating',)),
+    'http://iptc.org/std/Iptc4xmpCore/1.0/xmlns/': ('XMP-iptcCore', ('Scene', 'IntellectualGenre')),
+    'http://ns.adobe.com/camera-raw-settings/1.0/': ('XMP-crs', ('ConvertToGrayscale',)),
+    'http://ns.adobe.com/exif/1.0/aux/': ('XMP-aux', ('IsMergedPanorama',)),
+}
+RDF_NS = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}'
+
+# IPTC IIM (record 2) dataset -> tag
+IPTC_TAGS = {
+    90: 'City',
+    95: 'Province-State',
+    101: 'Country-PrimaryLocationName',
+}
+
+# Mirrors exiftool's JSON output: numeric-looking strings become numbers, true/false booleans
+JSON_NUMBER_RE = re.compile(r'^-?(\d|[1-9]\d{1,14})(\.\d{1,16})?(e[-+]?\d{1,3})?$', re.IGNORECASE)
+
+
+# Reads the fetch_exif tag set from a JPEG or RAW/TIFF file. Returns a -g1 shaped dict, or None on failure.
+def read_exif(path):
+    path = str(path)
+    if path.lower().endswith(RAW_EXTS):
+        return read_raw_exif(path)
+    if not path.lower().endswith(JPEG_EXTS):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                segments = read_segments(mm)
+    except (OSError, ValueError) as e:
+        db.d('[X]', 'Native EXIF read failed', f'{path} ({e})')
+        return None
+
+    if segments is None or segments.get('exif') is None:
+        return None
+
+    try:
+        exif = {'SourceFile': path}
+        parse_tiff_segment(segments['exif'], exif)
+        if segments.get('xmp') is not None:
+            parse_xmp(segments['xmp'], exif)
+        if segments.get('iptc') is not None:
+            parse_photoshop(segments['iptc'], exif)
+        if segments.get('size') is not None:
+            width, height = segments['size']
+            exif['File'] = {'ImageWidth': width, 'ImageHeight': height}
+    except (struct.error, ValueError, IndexError, ET.ParseError) as e:
+        db.d('[X]', 'Native EXIF parse failed', f'{path} ({e})')
+        return None
+
+    return exif
+
+
+# Walks JPEG markers up to SOS and returns the metadata segment payloads (as bytes)
+def read_segments(mm):
+    if mm[:2] != b'\xff\xd8':
+        return None
+
+    segments = {'exif': None, 'xmp': None, 'iptc': None, 'size': None}
+    pos = 2
+    end = len(mm)
+    while pos + 4 <= end:
+        if mm[pos] != 0xFF:
+            return None
+        marker = mm[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # standalone markers
+            pos += 2
+            continue
+        if marker in (0xDA, 0xD9):  # start of scan / end of image
+            break
+
+        length = struct.unpack('>H', mm[pos + 2:pos + 4])[0]
+        start = pos + 4
+        stop = pos + 2 + length
+        if length < 2 or stop > end:
+            return None
+
+        if marker == 0xE1:
+            header = mm[start:start + len(XMP_HEADER)]
+            if header.startswith(EXIF_HEADER) and segments['exif'] is None:
+                segments['exif'] = mm[start + len(EXIF_HEADER):stop]
+            elif header == XMP_HEADER and segments['xmp'] is None:
+                segments['xmp'] = mm[start + len(XMP_HEADER):stop]
+        elif marker == 0xED:
+            if mm[start:start + len(PHOTOSHOP_HEADER)] == PHOTOSHOP_HEADER and segments['iptc'] is None:
+                segments['iptc'] = mm[start + len(PHOTOSHOP_HEADER):stop]
+        elif 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>HH', mm[start + 1:start + 5])
+            segments['size'] = (width, height)
+
+        pos = stop
+
+    return segments
+
+
+# =========== TIFF / EXIF ================== #
+
+# Returns (endian, offset of IFD0) for a TIFF header at the start of buf
+def read_tiff_header(buf):
+    order = bytes(buf[:2])
+    if order == b'II':
+        endian = '<'
+    elif order == b'MM':
+        endian = '>'
+    else:
+        raise ValueError('not a TIFF header')
+    magic, ifd0 = struct.unpack(endian + 'HI', buf[2:8])
+    if magic != 42:
+        raise ValueError('bad TIFF magic')
+    return endian, ifd0
+
+
+# Reads one IFD. Returns (dict tag_id -> value, offset of next IFD)
+def read_ifd(buf, offset, endian, wanted=None):
+    count = struct.unpack(endian + 'H', buf[offset:offset + 2])[0]
+    values = {}
+    for i in range(count):
+        entry = offset + 2 + i * 12
+        tag, typ, n = struct.unpack(endian + 'HHI', buf[entry:entry + 8])
+        if wanted is not None and tag not in wanted:
+            continue
+        size = TIFF_TYPE_SIZES.get(typ)
+        if size is None:
+            continue
+        total = size * n
+        if total <= 4:
+            data = buf[entry + 8:entry + 8 + total]
+        else:
+            ptr = struct.unpack(endian + 'I', buf[entry + 8:entry + 12])[0]
+            if ptr + total > len(buf):
+                continue
+            data = buf[ptr:ptr + total]
+        values[tag] = decode_tiff_value(data, typ, n, endian)
+    next_ptr = offset + 2 + count * 12
+    next_ifd = struct.unpack(endian + 'I', buf[next_ptr:next_ptr + 4])[0] if next_ptr + 4 <= len(buf) else 0
+    return values, next_ifd
+
+
+def decode_tiff_value(data, typ, n, endian):
+    if typ == 2:
+        return bytes(data).split(b'\x00')[0].decode('utf-8', errors='replace').strip()
+    if typ in (1, 6, 7):
+        values = list(bytes(data)) if typ != 6 else list(struct.unpack(endian + f'{n}b', data))
+    elif typ in (3, 8):
+        values = list(struct.unpack(endian + f'{n}{"H" if typ == 3 else "h"}', data))
+    elif typ in (4, 9, 13):
+        values = list(struct.unpack(endian + f'{n}{"i" if typ == 9 else "I"}', data))
+    elif typ in (5, 10):
+        raw = struct.unpack(endian + f'{2 * n}{"i" if typ == 10 else "I"}', data)
+        values = [raw[i] / raw[i + 1] if raw[i + 1] else 0.0 for i in range(0, len(raw), 2)]
+    elif typ == 11:
+        values = list(struct.unpack(endian + f'{n}f', data))
+    elif typ == 12:
+        values = list(struct.unpack(endian + f'{n}d', data))
+    else:
+        return None
+    return values[0] if len(values) == 1 else values
+
+
+# Parses the APP1 Exif TIFF block into exif['IFD0'] / exif['ExifIFD']
+def parse_tiff_segment(buf, exif):
+    endian, ifd0_offset = read_tiff_header(buf)
+    ifd0, _ = read_ifd(buf, ifd0_offset, endian, set(IFD0_TAGS) | {EXIF_IFD_POINTER})
+
+    group = {}
+    for tag, name in IFD0_TAGS.items():
+        if tag in ifd0 and ifd0[tag] not in (None, ''):
+            group[name] = json_value(ifd0[tag])
+    exif['IFD0'] = group
+
+    if EXIF_IFD_POINTER in ifd0:
+        exif_ifd, _ = read_ifd(buf, ifd0[EXIF_IFD_POINTER], endian, EXIF_IFD_TAGS)
+        exif['ExifIFD'] = format_exif_ifd(exif_ifd)
+    return exif
+
+
+# Formats ExifIFD values the way exiftool prints them
+def format_exif_ifd(values):
+    group = {}
+    for tag, name in EXIF_IFD_TAGS.items():
+        if tag not in values:
+            continue
+        v = values[tag]
+        if isinstance(v, list):
+            v = v[0] if v else None
+        if v in (None, ''):
+            continue
+
+        if name == 'FNumber':
+            v = print_fnumber(v)
+        elif name == 'ExposureTime':
+            v = print_exposure_time(v)
+        elif name == 'ShutterSpeedValue':
+            v = print_exposure_time(2 ** (-v) if abs(v) < 100 else 0)
+        elif name == 'FocalLength':
+            v = f'{v:.1f} mm'
+        elif name == 'ISO':
+            v = int(v)
+
+        group[name] = json_value(v)
+    return group
+
+
+def print_fnumber(v):
+    if not v or v <= 0:
+        return v
+    return f'{v:.2f}' if v < 1 else f'{v:.1f}'
+
+
+# exiftool's PrintExposureTime: '1/125' below 1/4s, else seconds with trailing '.0' dropped
+def print_exposure_time(secs):
+    if 0 < secs < 0.25001:
+        return f'1/{int(0.5 + 1 / secs)}'
+    s = f'{secs:.1f}'
+    return s[:-2] if s.endswith('.0') else s
+
+
+def json_value(v):
+    if not isinstance(v, str):
+        return v
+    if v.lower() in ('true', 'false'):
+        return v.lower() == 'true'
+    if JSON_NUMBER_RE.match(v):
+        return float(v) if any(c in v for c in '.eE') else int(v)
+    return v
+
+
+# =========== RAW / TIFF ================== #
+
+# Reads the fetch_exif tag set from a TIFF-based RAW (ARW/DNG/TIFF). File:ImageWidth/Height is the
+# largest image in the container (the sensor data, not the preview). XMP comes from the embedded
+# packet (tag 700) and then the .xmp sidecar, which wins where both set a value.
+def read_raw_exif(path):
+    try:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                exif = {'SourceFile': path}
+                parse_tiff_segment(mm, exif)
+
+                ifds = list(walk_ifds(mm))
+                width, height = 0, 0
+                for values in ifds:
+                    w, h = values.get(TIFF_IMAGE_WIDTH), values.get(TIFF_IMAGE_HEIGHT)
+                    if isinstance(w, int) and isinstance(h, int) and w * h > width * height:
+                        width, height = w, h
+                if width and height:
+                    exif['File'] = {'ImageWidth': width, 'ImageHeight': height}
+
+                xmp = ifds[0].get(TIFF_XMP) if ifds else None
+                if isinstance(xmp, list) and xmp:
+                    parse_xmp(bytes(xmp), exif)
+    except (OSError, ValueError, struct.error, IndexError, ET.ParseError) as e:
+        db.d('[X]', 'Native RAW EXIF read failed', f'{path} ({e})')
+        return None
+
+    sidecar = os.path.splitext(path)[0] + '.xmp'
+    if os.path.isfile(sidecar):
+        try:
+            with open(sidecar, 'rb') as f:
+                parse_xmp(f.read(), exif)
+        except (OSError, ET.ParseError) as e:
+            db.d('[X]', 'XMP sidecar read failed', f'{sidecar} ({e})')
+    return exif
+
+
+# Yields every IFD's tag values in a TIFF container: the IFD0 chain and, one level down, their SubIFDs
+def walk_ifds(buf):
+    endian, offset = read_tiff_header(buf)
+    seen = set()
+    queue = [offset]
+    while queue and len(seen) < MAX_IFDS:
+        offset = queue.pop(0)
+        if not offset or offset in seen or offset + 2 > len(buf):
+            continue
+        seen.add(offset)
+        values, next_ifd = read_ifd(buf, offset, endian, STRUCTURE_TAGS)
+        yield values
+        sub = values.get(TIFF_SUB_IFDS)
+        if sub is not None:
+            queue.extend(sub if isinstance(sub, list) else [sub])
+        queue.append(next_ifd)
+
+
+# Returns (offset, length) of the largest embedded JPEG preview in a TIFF-based RAW, or None
+def find_preview(buf):
+    candidates = []
+    for values in walk_ifds(buf):
+        if values.get(TIFF_PHOTOMETRIC) in PHOTOMETRIC_RAW:
+            continue
+        if TIFF_JPEG_OFFSET in values and TIFF_JPEG_LENGTH in values:
+            candidates.append((values[TIFF_JPEG_OFFSET], values[TIFF_JPEG_LENGTH]))
+        elif values.get(TIFF_COMPRESSION) in (6, 7):
+            offsets, counts = values.get(TIFF_STRIP_OFFSETS), values.get(TIFF_STRIP_BYTE_COUNTS)
+            if isinstance(offsets, int) and isinstance(counts, int):
+                candidates.append((offsets, counts))
+
+    best = None
+    for offset, length in candidates:
+        if not isinstance(offset, int) or not isinstance(length, int) or offset + length > len(buf):
+            continue
+        if buf[offset:offset + 2] != b'\xff\xd8':
+            continue
+        if best is None or length > best[1]:
+            best = (offset, length)
+    return best
+
+
+# Extracts the embedded JPEG preview of a RAW into out_path (written atomically).
+# Returns out_path, or None if the file has no usable preview.
+def extract_preview(path, out_path):
+    try:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                found = find_preview(mm)
+                if found is None:
+                    return None
+                offset, length = found
+                data = mm[offset:offset + length]
+    except (OSError, ValueError, struct.error, IndexError) as e:
+        db.d('[X]', 'Preview extraction failed', f'{path} ({e})')
+        return None
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+# =========== XMP ================== #
+
+# Parses an XMP packet into exif['XMP-*'] groups, for the properties in XMP_GROUPS
+def parse_xmp(buf, exif):
+    packet = bytes(buf).strip(b'\x00 \r\n\t')
+    root = ET.fromstring(packet)
+
+    for desc in root.iter(RDF_NS + 'Description'):
+        # attribute form: <rdf:Description xmpMM:PreservedFileName="DSC00003.ARW" ...>
+        for key, value in desc.attrib.items():
+            set_xmp_value(exif, key, value)
+
+        # element form: <xmp:Rating>3</xmp:Rating> or <Iptc4xmpCore:Scene><rdf:Bag><rdf:li>...
+        for child in desc:
+            container = next(iter(child), None)
+            if container is not None and container.tag in (RDF_NS + 'Bag', RDF_NS + 'Seq', RDF_NS + 'Alt'):
+                items = [(li.text or '').strip() for li in container.findall(RDF_NS + 'li')]
+                if container.tag == RDF_NS + 'Alt':
+                    items = items[:1]
+                value = items[0] if len(items) == 1 else items
+            else:
+                value = (child.text or '').strip()
+            set_xmp_value(exif, child.tag, value)
+    return exif
+
+
+def set_xmp_value(exif, key, value):
+    if not key.startswith('{'):
+        return
+    uri, name = key[1:].split('}', 1)
+    if uri not in XMP_GROUPS:
+        return
+    group, names = XMP_GROUPS[uri]
+    if name not in names or value in ('', []):
+        return
+    if isinstance(value, list):
+        value = [json_value(v) for v in value]
+    else:
+        value = json_value(value)
+    exif.setdefault(group, {})[name] = value
+
+
+# =========== IPTC ================== #
+
+# Parses Photoshop image resources, reading IPTC-IIM (resource 0x0404) into exif['IPTC']
+def parse_photoshop(buf, exif):
+    pos = 0
+    end = len(buf)
+    while pos + 12 <= end:
+        if bytes(buf[pos:pos + 4]) != b'8BIM':
+            break
+        res_id = struct.unpack('>H', buf[pos + 4:pos + 6])[0]
+        name_len = buf[pos + 6]
+        name_size = name_len + 1
+        if name_size % 2:
+            name_size += 1
+        size_pos = pos + 6 + name_size
+        size = struct.unpack('>I', buf[size_pos:size_pos + 4])[0]
+        data_start = size_pos + 4
+        if res_id == 0x0404:
+            parse_iptc(buf[data_start:data_start + size], exif)
+        pos = data_start + size + (size % 2)
+    return exif
+
+
+def parse_iptc(buf, exif):
+    records = {}
+    utf8 = False
+    pos = 0
+    end = len(buf)
+    while pos + 5 <= end:
+        if buf[pos] != 0x1C:
+            break
+        record = buf[pos + 1]
+        dataset = buf[pos + 2]
+        size = struct.unpack('>H', buf[pos + 3:pos + 5])[0]
+        pos += 5
+        if size & 0x8000:  # extended dataset length
+            n = size & 0x7FFF
+            size = int.from_bytes(buf[pos:pos + n], 'big')
+            pos += n
+        value = bytes(buf[pos:pos + size])
+        pos += size
+
+        if record == 1 and dataset == 90:  # CodedCharacterSet
+            utf8 = value == b'\x1b%G'
+        elif record == 2 and dataset in IPTC_TAGS:
+            records[IPTC_TAGS[dataset]] = value
+
+    group = {}
+    for name, value in records.items():
+        if utf8:
+            text = value.decode('utf-8', errors='replace')
+        else:
+            try:
+                text = value.decode('utf-8')
+            except UnicodeDecodeError:
+                text = value.decode('cp1252', errors='replace')
+        text = text.strip()
+        if text:
+            group[name] = json_value(text)
+    if group:
+        exif['IPTC'] = group
+    return exif
@@ -0,0 +1,109 @@
+# exifRecord.py
+# Compact, typed projection of one exposure's EXIF.
+
+import sys
+from datetime import datetime
+
+# Formats accepted for DateTimeOriginal / CreateDate (same set as exposureObj._convertDateTime)
+DATETIME_FORMATS = (
+    "%Y:%m:%d %H:%M:%S",
+    "%Y:%m:%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+)
+
+
+def to_datetime(value):
+    value = str(value).strip()
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+def to_focal_length(value):
+    return float(str(value).split(" ")[0]) if value else None
+
+
+def to_grayscale(value):
+    return bool(int(value)) if str(value).isdigit() else bool(value)
+
+
+# (attribute, -g1 path, conversion, default) -- values with conv None are kept as exiftool returned them
+FIELDS = (
+    ('rawFileName',      ("XMP-xmpMM", "PreservedFileName"),        None,             None),
+    ('city',             ("IPTC", "City"),                          None,             None),
+    ('state',            ("IPTC", "Province-State"),                None,             None),
+    ('country',          ("IPTC", "Country-PrimaryLocationName"),   None,             None),
+    ('scene',            ("XMP-iptcCore", "Scene"),                 None,             None),
+    ('genre',            ("XMP-iptcCore", "IntellectualGenre"),     None,             None),
+    ('rating',           ("XMP-xmp", "Rating"),                     int,              None),
+    ('iso',              ("ExifIFD", "ISO"),                        int,              None),
+    ('fNumber',          ("ExifIFD", "FNumber"),                    float,            None),
+    ('shutterSpeed',     ("ExifIFD", "ShutterSpeedValue"),          str,              None),
+    ('exposureTime',     ("ExifIFD", "ExposureTime"),               str,              None),
+    ('dateTimeOriginal', ("ExifIFD", "DateTimeOriginal"),           to_datetime,      None),
+    ('createDate',       ("ExifIFD", "CreateDate"),                 to_datetime,      None),
+    ('software',         ("IFD0", "Software"),                      str,              None),
+    ('make',             ("IFD0", "Make"),                          None,             None),
+    ('model',            ("IFD0", "Model"),                         None,             None),
+    ('lensMake',         ("ExifIFD", "LensMake"),                   None,             None),
+    ('lensModel',        ("ExifIFD", "LensModel"),                  None,             None),
+    ('focalLength',      ("ExifIFD", "FocalLength"),                to_focal_length,  None),
+    ('width',            ("File", "ImageWidth"),                    int,              None),
+    ('height',           ("File", "ImageHeight"),                   int,              None),
+    ('isGrayscale',      ("XMP-crs", "ConvertToGrayscale"),         to_grayscale,     False),
+    ('isStitched',       ("XMP-aux", "IsMergedPanorama"),           bool,             False),
+)
+
+
+# Fields whose values repeat across frames and rolls (file names and paths are unique, so they aren't interned)
+INTERNED = frozenset((
+    'city', 'state', 'country', 'scene', 'genre', 'shutterSpeed', 'exposureTime', 'software',
+    'make', 'model', 'lensMake', 'lensModel',
+))
+
+
+# Shared copy of a repeated string (anything that isn't a plain str is returned as-is)
+def intern_value(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+# Gets a nested -g1 value with optional conversion and default ("" / "NaN" count as missing)
+def get_value(exif, path, conv=None, default=None):
+    d = exif
+    try:
+        for p in path:
+            d = d[p]
+        if d in (None, "", "NaN"):
+            return default
+        return conv(d) if conv else d
+    except Exception:
+        return default
+
+
+class exifRecord:
+    __slots__ = ('sourceFile',) + tuple(f[0] for f in FIELDS)
+
+    def __init__(self, sourceFile=None, **values):
+        self.sourceFile = sourceFile
+        for name, _, _, default in FIELDS:
+            value = values.get(name, default)
+            setattr(self, name, intern_value(value) if name in INTERNED else value)
+
+    # Projects a -g1 exif dict onto a record
+    @classmethod
+    def from_exif(cls, exif):
+        record = cls(exif.get('SourceFile'))
+        for name, path, conv, default in FIELDS:
+            value = get_value(exif, path, conv, default)
+            setattr(record, name, intern_value(value) if name in INTERNED else value)
+        return record
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f'exifRecord({self.sourceFile!r})'
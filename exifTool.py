@@ -0,0 +1,346 @@
+# exifTool.py
+# Long-lived pool of `exiftool -stay_open True` workers, shared by every roll a collection imports.
+
+import os
+import json
+import shutil
+import atexit
+import queue
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+# Tag set read for every exposure (see exposureObj._update_from_exif)
+EXIF_TAGS = [
+    "-SourceFile",
+    "-XMP-xmpMM:PreservedFileName",
+    "-IPTC:City",
+    "-IPTC:Province-State",
+    "-IPTC:Country-PrimaryLocationName",
+    "-XMP-iptcCore:Scene",
+    "-XMP-iptcCore:IntellectualGenre",
+    "-XMP-xmp:Rating",
+    "-ExifIFD:ISO",
+    "-ExifIFD:FNumber",
+    "-ExifIFD:ShutterSpeedValue",
+    "-ExifIFD:ExposureTime",
+    "-ExifIFD:DateTimeOriginal",
+    "-ExifIFD:CreateDate",
+    "-IFD0:Software",
+    "-IFD0:Make",
+    "-IFD0:Model",
+    "-ExifIFD:LensMake",
+    "-ExifIFD:LensModel",
+    "-ExifIFD:FocalLength",
+    "-File:ImageWidth",
+    "-File:ImageHeight",
+    "-XMP-crs:ConvertToGrayscale",
+    "-XMP-aux:IsMergedPanorama",
+]
+
+EXIF_ARGS = ["-j", "-g1", "-fast2"] + EXIF_TAGS
+
+WORKERS = max(1, min(4, (os.cpu_count() or 1) // 2))    # default pool size
+
+
+# Returns the usable argument budget per chunk: ARG_MAX minus headroom for the environment
+# and the fixed exiftool arguments.
+def get_arg_max():
+    try:
+        arg_max = os.sysconf('SC_ARG_MAX')
+    except (AttributeError, ValueError, OSError):
+        arg_max = 131072
+    if arg_max is None or arg_max <= 0:
+        arg_max = 131072
+    return max(4096, arg_max // 2 - 4096)
+
+
+# Yields each top-level JSON object from exiftool's -j output as soon as its closing brace has been read, instead of
+# waiting for the whole array. Tracks brace depth outside of strings, so it doesn't depend on exiftool's line layout.
+def iter_json_records(lines):
+    depth = 0
+    in_string = False
+    escaped = False
+    buf = []
+    for line in lines:
+        start = 0
+        for i, c in enumerate(line):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif c == '\\':
+                    escaped = True
+                elif c == '"':
+                    in_string = False
+                continue
+            if c == '"':
+                in_string = True
+            elif c == '{':
+                if depth == 0:
+                    start = i
+                    buf = []
+                depth += 1
+            elif c == '}':
+                depth -= 1
+                if depth == 0:
+                    buf.append(line[start:i + 1])
+                    try:
+                        yield json.loads(''.join(buf))
+                    except json.JSONDecodeError as e:
+                        db.e('[X]', 'Failed to parse exiftool record', e)
+                    buf = []
+                    start = i + 1
+        if depth > 0:
+            buf.append(line[start:])
+
+
+# Splits pathList into chunks whose summed argument length stays below limit
+def chunk_paths(pathList, fixed_args=(), limit=None):
+    if limit is None:
+        limit = get_arg_max()
+    base = sum(len(os.fsencode(a)) + 1 for a in fixed_args)
+
+    chunks = []
+    chunk = []
+    size = base
+    for path in pathList:
+        n = len(os.fsencode(str(path))) + 1
+        if chunk and size + n > limit:
+            chunks.append(chunk)
+            chunk = []
+            size = base
+        chunk.append(path)
+        size += n
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+class exifWorker:
+    def __init__(self, index=0):
+        self.index = index
+        self.proc = None
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.proc is not None and self.proc.poll() is None:
+            return
+        self.proc = subprocess.Popen(
+            ["exiftool", "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+        )
+        db.d('[X]', f'Started exiftool worker {self.index}', self.proc.pid)
+
+    # Sends one command (list of args) and returns exiftool's stdout for it as a string
+    def execute(self, args):
+        return ''.join(self.execute_iter(args))
+
+    # Sends one command and yields exiftool's stdout line by line as it is written. The worker stays locked until the
+    # command's {readyN} marker is read -- if the caller stops early, the rest of the output is drained on close.
+    def execute_iter(self, args):
+        with self.lock:
+            self.start()
+            self.counter += 1
+            n = self.counter
+            payload = ''.join(f'{a}\n' for a in args) + f'-execute{n}\n'
+            self.proc.stdin.write(payload)
+            self.proc.stdin.flush()
+
+            ready = f'{{ready{n}}}'
+            done = False
+            try:
+                while True:
+                    line = self.proc.stdout.readline()
+                    if line == '':
+                        db.e('[X]', f'exiftool worker {self.index} exited unexpectedly')
+                        self.proc = None
+                        done = True
+                        break
+                    if line.rstrip('\r\n') == ready:
+                        done = True
+                        break
+                    yield line
+            finally:
+                while not done and self.proc is not None:
+                    line = self.proc.stdout.readline()
+                    done = line == '' or line.rstrip('\r\n') == ready
+
+    # Sends several commands in one round trip and returns their outputs in order. The payload is written from a helper
+    # thread while replies are read here, so a long command list can't deadlock on full stdin/stdout pipes.
+    def execute_many(self, commands):
+        if not commands:
+            return []
+        with self.lock:
+            self.start()
+            first = self.counter + 1
+            self.counter += len(commands)
+            payload = ''.join(
+                ''.join(f'{a}\n' for a in args) + f'-execute{first + i}\n'
+                for i, args in enumerate(commands)
+            )
+            proc = self.proc
+
+            def feed():
+                try:
+                    proc.stdin.write(payload)
+                    proc.stdin.flush()
+                except (BrokenPipeError, ValueError):
+                    pass
+
+            writer = threading.Thread(target=feed, daemon=True)
+            writer.start()
+
+            outputs = []
+            lines = []
+            ready = f'{{ready{first}}}'
+            while len(outputs) < len(commands):
+                line = proc.stdout.readline()
+                if line == '':
+                    db.e('[X]', f'exiftool worker {self.index} exited unexpectedly')
+                    self.proc = None
+                    outputs.extend([''.join(lines)] + [''] * (len(commands) - len(outputs) - 1))
+                    break
+                if line.rstrip('\r\n') == ready:
+                    outputs.append(''.join(lines))
+                    lines = []
+                    ready = f'{{ready{first + len(outputs)}}}'
+                    continue
+                lines.append(line)
+            writer.join()
+            return outputs
+
+    def close(self):
+        with self.lock:
+            if self.proc is None:
+                return
+            try:
+                if self.proc.poll() is None:
+                    self.proc.stdin.write('-stay_open\nFalse\n')
+                    self.proc.stdin.flush()
+                    self.proc.wait(timeout=5)
+            except Exception:
+                self.proc.kill()
+            self.proc = None
+
+
+class exifTool:
+    def __init__(self, workers=WORKERS, arg_limit=None):
+        self.dbIdx = '[X]'
+        self.n_workers = max(1, int(workers))
+        self.arg_limit = arg_limit
+        self.workers = []
+        self.available = shutil.which("exiftool") is not None
+        atexit.register(self.close)
+
+    def _get_workers(self, n):
+        while len(self.workers) < min(n, self.n_workers):
+            self.workers.append(exifWorker(len(self.workers)))
+        return self.workers[:min(n, self.n_workers)]
+
+    # Runs args + paths over the pool and returns exiftool's raw output per chunk, in order
+    def run(self, pathList, args):
+        if not self.available:
+            db.e(self.dbIdx, 'Failed to open exiftool!')
+            return None
+        if not pathList:
+            return []
+
+        chunks = chunk_paths(pathList, args, self.arg_limit)
+        workers = self._get_workers(len(chunks))
+
+        if len(workers) == 1:
+            return [workers[0].execute(list(args) + list(chunk)) for chunk in chunks]
+
+        # Round-robin chunks over workers; each worker runs its own share sequentially
+        def run_worker(i):
+            out = []
+            for j in range(i, len(chunks), len(workers)):
+                out.append((j, workers[i].execute(list(args) + list(chunks[j]))))
+            return out
+
+        outputs = [None] * len(chunks)
+        with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+            for result in executor.map(run_worker, range(len(workers))):
+                for j, out in result:
+                    outputs[j] = out
+        return outputs
+
+    # Fetches the EXIF tag set for pathList. Returns list of -g1 dicts (same shape as
+    # `exiftool -j -g1`), or None if exiftool isn't available.
+    def fetch(self, pathList, args=EXIF_ARGS):
+        outputs = self.run(pathList, args)
+        if outputs is None:
+            return None
+
+        data = []
+        for out in outputs:
+            try:
+                data.extend(json.loads(out or "[]"))
+            except json.JSONDecodeError as e:
+                db.e(self.dbIdx, 'Failed to parse exiftool output', e)
+        return data
+
+    # Streaming variant of fetch(): yields each file's -g1 dict as soon as exiftool has emitted it, so callers can process
+    # records while the rest of the batch is still being read. With several workers, records arrive in completion order.
+    def fetch_iter(self, pathList, args=EXIF_ARGS):
+        if not self.available:
+            db.e(self.dbIdx, 'Failed to open exiftool!')
+            return
+        if not pathList:
+            return
+
+        chunks = chunk_paths(pathList, args, self.arg_limit)
+        workers = self._get_workers(len(chunks))
+
+        if len(workers) == 1:
+            for chunk in chunks:
+                yield from iter_json_records(workers[0].execute_iter(list(args) + list(chunk)))
+            return
+
+        records = queue.Queue()
+        done = object()
+
+        def run_worker(i):
+            try:
+                for j in range(i, len(chunks), len(workers)):
+                    for record in iter_json_records(workers[i].execute_iter(list(args) + list(chunks[j]))):
+                        records.put(record)
+            finally:
+                records.put(done)
+
+        threads = [threading.Thread(target=run_worker, args=(i,), daemon=True) for i in range(len(workers))]
+        for thread in threads:
+            thread.start()
+
+        remaining = len(threads)
+        while remaining:
+            record = records.get()
+            if record is done:
+                remaining -= 1
+                continue
+            yield record
+
+    # Runs a list of commands (each a list of args incl. paths) on one worker in a single round trip, returns outputs
+    # in order, or None if exiftool isn't available. Used for batched writes (see exifWriter.py).
+    def execute_many(self, commands):
+        if not self.available:
+            db.e(self.dbIdx, 'Failed to open exiftool!')
+            return None
+        return self._get_workers(1)[0].execute_many(commands)
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
+        self.workers = []
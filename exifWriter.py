@@ -0,0 +1,115 @@
+# exifWriter.py
+# Write queue for EXIF/XMP tag edits, flushed to a persistent exiftool worker in one batch.
+
+from exifTool import exifTool, chunk_paths, get_arg_max
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+WRITE_ARGS = ["-overwrite_original"]
+READ_ARGS = ["-j", "-G1"]
+
+
+# Normalizes a tag value for comparison (exiftool prints numbers unquoted in -j output)
+def norm_value(value):
+    if value in (None, "", "NaN"):
+        return None
+    return str(value).strip()
+
+
+# Finds "Group:Tag" (or a bare "Tag" in any group) in a -G1 record
+def find_tag(record, tag):
+    if tag in record:
+        return record[tag]
+    if ':' not in tag:
+        for key, value in record.items():
+            if key.split(':')[-1] == tag:
+                return value
+    return None
+
+
+class exifWriteQueue:
+    def __init__(self, exiftool=None, arg_limit=None):
+        self.dbIdx = '[X]'
+        self.exiftool = exiftool if exiftool is not None else exifTool(workers=1)
+        self.arg_limit = arg_limit
+        self.edits = {}     # path -> {tag: value}, value None = delete tag
+
+    def __len__(self):
+        return len(self.edits)
+
+    # Queues tag edits for one file; later edits to the same tag replace earlier ones
+    def add(self, path, tags):
+        self.edits.setdefault(str(path), {}).update(tags)
+
+    def clear(self):
+        self.edits = {}
+
+    # Reads the queued tags back for paths, returns path -> -G1 record
+    def read_back(self, paths, tags):
+        data = self.exiftool.fetch(paths, READ_ARGS + [f"-{t}" for t in sorted(tags)])
+        if data is None:
+            return None
+        return {record.get('SourceFile'): record for record in data}
+
+    # Returns the paths whose files still differ from their queued edits, according to records
+    def pending(self, records):
+        pending = []
+        for path, tags in self.edits.items():
+            record = records.get(path, {})
+            if any(norm_value(find_tag(record, t)) != norm_value(v) for t, v in tags.items()):
+                pending.append(path)
+        return pending
+
+    # Writes all queued edits, verifies them with a single read-back and returns the list of changed files.
+    # skip_unchanged does one extra batched read first and drops files that already hold the queued values.
+    # verify=False skips the read-back and reports every written file as changed.
+    def flush(self, verify=True, skip_unchanged=False):
+        if not self.edits:
+            return []
+        tags = {t for edits in self.edits.values() for t in edits}
+
+        paths = list(self.edits.keys())
+        if skip_unchanged:
+            records = self.read_back(paths, tags)
+            if records is None:
+                return []
+            paths = self.pending(records)
+            db.d(self.dbIdx, 'Files already up to date', len(self.edits) - len(paths))
+
+        # Group files by identical edits -> one command per group (split to stay below ARG_MAX)
+        groups = {}
+        for path in paths:
+            key = tuple(sorted((t, '' if norm_value(v) is None else str(v)) for t, v in self.edits[path].items()))
+            groups.setdefault(key, []).append(path)
+
+        commands = []
+        for edits, group in groups.items():
+            args = WRITE_ARGS + [f"-{t}={v}" for t, v in edits]
+            for chunk in chunk_paths(group, args, self.arg_limit or get_arg_max()):
+                commands.append(args + chunk)
+
+        if commands:
+            db.d(self.dbIdx, f'Writing EXIF for {len(paths)} files', f'{len(commands)} commands')
+            if self.exiftool.execute_many(commands) is None:
+                return []
+
+        written = set(paths)
+        if not verify or not written:
+            self.clear()
+            return sorted(written)
+
+        records = self.read_back(sorted(written), tags)
+        if records is None:
+            return []
+        failed = set(self.pending(records)) & written
+        for path in sorted(failed):
+            db.e(self.dbIdx, 'EXIF write not confirmed by read-back', path)
+
+        changed = sorted(written - failed)
+        db.i(self.dbIdx, f'EXIF written to {len(changed)} files', f'{len(failed)} failed' if failed else '')
+        self.clear()
+        return changed
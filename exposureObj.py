@@ -1,10 +1,7 @@
-import numpy as np
-import pandas as pd
 import sys
+import math
 import tempfile
 import os
-from PIL import Image
-from PIL.ExifTags import TAGS
 import re
 import glob
 from datetime import datetime
@@ -14,6 +11,7 @@ import json
 import shutil
 import subprocess
 from typing import Iterable, Union
+from exifRecord import exifRecord, intern_value
 from debuggerTool import debuggerTool
 
 
@@ -25,6 +23,33 @@ db = debuggerTool(DEBUG, WARNING, ERROR)
 
 
 class exposureObj:
+    # A full-library import holds thousands of these: fixed slots instead of a per-instance __dict__.
+    # Every attribute has to be listed here (setting one that isn't raises AttributeError).
+    __slots__ = (
+        'roll',
+        # File
+        'filePath', 'fileName', 'name', 'fileType', 'fileSize', 'rawFileName', 'rawFilePath', 'previewFilePath',
+        'isRaw', 'newFileName',
+        # Exposure
+        'index', 'index_str', 'dbIdx', 'index_original', 'location', 'state', 'country', 'stk', 'stock', 'rating',
+        'fNumber', 'shutterSpeed', 'iso', 'exposureTime', 'exposureValue',
+        # Datetime
+        'dateExposed', 'dateCreated',
+        # Camera & lens
+        'camera', 'cameraBrand', 'cameraModel', 'cam', 'lensBrand', 'lensModel', 'lens', 'lns', 'focalLength',
+        'maxAperture',
+        # Image data
+        'width', 'height', 'mpx', 'aspectRatio', 'isVertical', 'isSquare', 'isHorizontal', 'isPano',
+        # Film
+        'isExpired', 'isColor', 'isBlackAndWhite', 'isInfrared', 'isNegative', 'isSlide', 'boxspeed', 'process',
+        'filmtype', 'filmformat',
+        # Copies
+        'original', 'copies', 'isOriginal', 'copyCount', 'containsCopies', 'isCopy', 'isGrayscale', 'isStitched',
+        'copyType', 'isTrichrome',
+        # EXIF
+        'exif', 'exifOverrides',
+    )
+
     def __init__(self, roll, path):
         self.roll = roll                     # roll object reference
         
@@ -32,12 +57,12 @@ class exposureObj:
         self.filePath = path
         self.fileName = os.path.basename(path)
         self.name = self.fileName.split(".jpg")[0]
-        self.fileType = self.fileName.split(".")[-1]
-        self.fileSize = os.path.getsize(self.filePath)
+        self.fileType = intern_value(self.fileName.split(".")[-1])
+        self.fileSize = roll.files.size(self.filePath)
         self.rawFileName = None     # Raw file name, EXIF
         self.rawFilePath = None       # Raw file path, derived TODO: grab from self.roll.rawPaths and search for matching filenames
-        self.previewFilePath = None   # Preview file path, derived TODO
-        self.attributesFile = {}
+        self.previewFilePath = None   # Preview file path, derived (embedded JPEG extracted from the RAW for RAW-only rolls)
+        self.isRaw = self.fileType.lower() in ('arw', 'dng', 'tif', 'tiff')    # Exposure built straight from a RAW file (RAW-only roll)
         self.newFileName = None
 
         # Exposure attributes
@@ -56,7 +81,6 @@ class exposureObj:
         self.iso = None                     # ISO, EXIF
         self.exposureTime = None            # Exposure time, derived (float value of self.shutterspeed)
         self.exposureValue = None           # EV, derived
-        self.attributesExposure = {}
 
         # Datetime attributes
         self.dateExposed = None            # Exposure time, EXIF
@@ -72,7 +96,7 @@ class exposureObj:
         self.lens = None                    # Lens, Derived
         self.lns = None                     # Lens ID, Cast
         self.focalLength = None             # Focal length, EXIF
-        self.attributesCamera = {}
+        self.maxAperture = None             # Max aperture, derived from lensModel
 
         # Image data
         self.width = None                   # Image width, EXIF
@@ -83,7 +107,6 @@ class exposureObj:
         self.isSquare = None                # Is square, derived
         self.isHorizontal = None            # Is horizontal, derived
         self.isPano = None                  # Is panorama, derived       
-        self.attributesImage = {} 
         
         # Film attributes
         self.isExpired = None               # Is film expired, cast
@@ -93,9 +116,9 @@ class exposureObj:
         self.isNegative = None              # Is negative film, cast
         self.isSlide = None                 # Is slide film, cast
         self.boxspeed = None                # Box speed, cast
+        self.process = None                 # Development process, cast from the roll
         self.filmtype = None                # Film type, cast (135, 120, 45, 810)
         self.filmformat = None              # Film format, cast (35mm, half frame, 6x7, 6x6 etc)
-        self.attributesFilm = {}
 
         # Duplicate Attributes
         self.original = None                # Master exposure obj (none if master), derived
@@ -107,12 +130,12 @@ class exposureObj:
         self.isGrayscale = None             # Is grayscale, EXIF
         self.isStitched = None              # Is stitched, EXIF
         self.copyType = None                # Type of virtual copy (pano, BW, edit, trichrome), string, derived
-        self.attributesCopies = {}
+        self.isTrichrome = None             # Master of a trichrome set, derived (rollObj copy grouping)
 
 
-        # Full EXIF / metadata JSON
+        # EXIF: compact typed record (exifRecord); the full -g1 dict is read back on demand via get_exif_dict()
         self.exif = None
-        self.attributes = {}
+        self.exifOverrides = {}             # Corrections applied from exif_overrides.json, not yet written to file
 
         # Methods
         self.process_fileName()  # Process filename to extract exposure index
@@ -130,8 +153,12 @@ class exposureObj:
     def process_fileName(self):
         name = self.name
 
+        # RAW-only roll: camera-assigned raw names (DSC00003.ARW) sort in capture order
+        if self.isRaw:
+            self.index = self._resolve_index_from_raw_order()
+
         # Case 0: new style: 072_230907_10_P400_Zug_F3'_55f2.8_3s_pano.jpg
-        if self.roll.isNewCollection:
+        elif self.roll.isNewCollection:
             n = name.split('_')
             try:
                 self.index = int(n[2])
@@ -214,11 +241,23 @@ class exposureObj:
         self.index_str = str(self.index).zfill(2)
         self.dbIdx = f'{self.roll.dbIdx}[{self.index_str}]'
 
-    # Set exif data to image
+    # Path of a PIL-readable image for this exposure: the extracted preview for RAW-only exposures, else the file itself
+    def get_image_path(self):
+        return self.previewFilePath or self.filePath
+
+    # Set exif data (-g1 dict) to image. Only the compact exifRecord projection is kept.
     def set_exif(self, exif):
         self.exif = exif
         self._update_from_exif()
 
+    # Returns the full -g1 exif dict (overrides applied), read back from the collection's exif cache
+    def get_exif_dict(self):
+        exif = self.roll.collection.exif_cache.get(self.filePath)
+        if exif is None:
+            return None
+        exif, _ = self.roll.collection.exif_overrides.apply(self.roll.index, self.index, exif)
+        return exif
+
 
     # =========== Private methods ================== #
 
@@ -239,20 +278,7 @@ class exposureObj:
             return None
 
         stem = os.path.splitext(self.name)[0].strip()
-        raw_exts = ('.arw', '.dng', '.tif', '.tiff')
-
-        all_raw_names = []
-        for rawDir in self.roll.rawDirs:
-            try:
-                for f in os.listdir(rawDir):
-                    if f.lower().endswith(raw_exts):
-                        all_raw_names.append(f)
-            except FileNotFoundError:
-                continue
-
-        all_raw_names.sort()
-
-        matches = [f for f in all_raw_names if os.path.splitext(f)[0].strip() == stem]
+        matches = self.roll.raws.stem_matches(stem)
         if len(matches) != 1:
             db.e(
                 self.roll.dbIdx,
@@ -261,7 +287,7 @@ class exposureObj:
             )
             return None
 
-        return all_raw_names.index(matches[0]) + 1
+        return self.roll.raws.position(matches[0])
 
 
     def _resolve_raw_file_path(self):
@@ -269,77 +295,11 @@ class exposureObj:
             return None
 
         rawDir = self.roll.rawDirs[0]
-        rawName = os.path.basename(str(self.rawFileName)).strip()
-        rawStem = os.path.splitext(rawName)[0].strip()
-
-        if rawDir in (-1, None) or rawStem in (-1, None, ""):
-            return None
-
-        def get_core(name):
-            stem = os.path.splitext(os.path.basename(str(name)))[0].strip()
-            m = re.match(r"^([A-Za-z]*\d+)", stem)
-            if m:
-                return m.group(1)
-            return stem.split("-")[0].split("_")[0].split(" ")[0]
-
-        try:
-            files = []
-            for name in os.listdir(rawDir):
-                path = os.path.join(rawDir, name)
-                if not os.path.isfile(path):
-                    continue
-
-                ext = os.path.splitext(name)[1].lower()
-                if ext not in (".arw", ".dng", ".tif", ".tiff"):
-                    continue
-
-                files.append((name, path))
-
-        except FileNotFoundError:
-            return None
-
-        # 1) prefer exact basename match
-        exact_matches = [path for name, path in files if name == rawName]
-        if len(exact_matches) == 1:
-            return exact_matches[0]
-        if len(exact_matches) > 1:
-            db.e(
-                self.dbIdx,
-                "Error finding raw path! Duplicate exact raw filenames",
-                f"{self.name} :: {self.rawFileName}"
-            )
+        if rawDir in (-1, None):
             return None
 
-        # 2) fallback: exact stem match
-        exact_stem_matches = [
-            path for name, path in files
-            if os.path.splitext(name)[0].strip() == rawStem
-        ]
-        if len(exact_stem_matches) == 1:
-            return exact_stem_matches[0]
-        if len(exact_stem_matches) > 1:
-            db.e(
-                self.dbIdx,
-                "Error finding raw path! Duplicate exact raw stems",
-                f"{self.name} :: {self.rawFileName}"
-            )
-            return None
-
-        # 3) fallback: loose core match
-        core = get_core(rawName)
-        core_matches = [path for name, path in files if get_core(name) == core]
-
-        if len(core_matches) == 1:
-            return core_matches[0]
-
-        if len(core_matches) > 1:
-            db.e(
-                self.dbIdx,
-                "Error finding raw path! Duplicate DSC files",
-                f"{self.name} :: {self.rawFileName}"
-            )
-
-        return None
+        # exact basename, then exact stem, then loose core match (see rawMatcher.py)
+        return self.roll.raws.resolve(self.rawFileName, folder=rawDir, dbIdx=self.dbIdx, label=f"{self.name} :: {self.rawFileName}")
 
     def cast_lns(self):
         lns = None
@@ -376,8 +336,17 @@ class exposureObj:
         if not self.exif:
             db.e(self.dbIdx, "No EXIF data available")
 
+        # Apply per-roll/frame corrections from the override table (in memory only, see exifOverrides.py),
+        # then keep only the typed projection of the dict
+        exif, self.exifOverrides = self.roll.collection.exif_overrides.apply(self.roll.index, self.index, self.exif or {})
+        if self.exifOverrides:
+            db.d(self.dbIdx, 'Applied EXIF overrides', self.exifOverrides)
+        rec = self.exif = exifRecord.from_exif(exif)
+
         # File attributes
-        self.rawFileName = self.get_exif(("XMP-xmpMM", "PreservedFileName"))
+        self.rawFileName = rec.rawFileName
+        if self.rawFileName is None and self.isRaw:
+            self.rawFileName = self.fileName
         if self.roll.index == 12:
             db.w(self.dbIdx, 'hardcode workaround --> renaming exif-filename from .ARW to .dng to match raw files')
             self.rawFileName = self.rawFileName.split(".")[0]+".dng"
@@ -387,13 +356,13 @@ class exposureObj:
                 
         
         if self.rawFileName == None:
-            db.e(self.dbIdx, "Could not ID raw file name from EXIF!", f'self.get_exif(("XMP-xmpMM", "PreservedFileName")) = {self.get_exif(("XMP-xmpMM", "PreservedFileName"))}')
+            db.e(self.dbIdx, "Could not ID raw file name from EXIF!", f'XMP-xmpMM:PreservedFileName = {rec.rawFileName}')
 
         # Exposure attributes
-        self.location   = self.get_exif(("IPTC", "City"))
-        self.state      = self.get_exif(("IPTC", "Province-State"))
-        self.country    = self.get_exif(("IPTC", "Country-PrimaryLocationName"))
-        self.verify_location() # hardcode fix for [035][34-35], [083][05]
+        self.location   = rec.city
+        self.state      = rec.state
+        self.country    = rec.country
+        self.verify_location()
 
         # Film stock identifier. Corrected: newRoll.py's xlsx schema had
         # Intellectual Genre/Scene swapped relative to your established,
@@ -402,35 +371,30 @@ class exposureObj:
         # first" version was chasing that swapped (incorrect) schema; with
         # newRoll.py's mapping now fixed to match, Scene is once again the
         # right (and only) source here.
-        self.stk        = self.get_exif(("XMP-iptcCore", "Scene"))
-        self.rating     = self.get_exif(("XMP-xmp", "Rating"), conv=int)
+        self.stk        = rec.scene
+        self.rating     = rec.rating
         if self.rating is None:
             self.rating = 0
-        self.iso        = self.get_exif(("ExifIFD", "ISO"), conv=int)
-        self.fNumber    = self.get_exif(("ExifIFD", "FNumber"), conv=float)
+        self.iso        = rec.iso
+        self.fNumber    = rec.fNumber
 
-        shutter_str     = self.get_exif(("ExifIFD", "ShutterSpeedValue"))
-        if shutter_str:
-            self.shutterSpeed = str(shutter_str)
+        if rec.shutterSpeed:
+            self.shutterSpeed = rec.shutterSpeed
             self.exposureTime = self._convertShutterspeed(self.shutterSpeed)
         else:
             self.shutterSpeed = None
 
         # Datetime
-        self.dateExposed = self._convertDateTime(
-            self.get_exif(("ExifIFD", "DateTimeOriginal"))
-        )
-        self.dateCreated = self._convertDateTime(
-            self.get_exif(("ExifIFD", "CreateDate"))
-        )
+        self.dateExposed = rec.dateTimeOriginal
+        self.dateCreated = rec.createDate
 
         # Camera & lens
-        self.cameraBrand = self.get_exif(("IFD0", "Make"))
-        self.cameraModel = self.get_exif(("IFD0", "Model"))
+        self.cameraBrand = rec.make
+        self.cameraModel = rec.model
         self.camera      = f"{self.cameraBrand} {self.cameraModel}" if self.cameraBrand and self.cameraModel else None
 
-        self.lensBrand   = self.get_exif(("ExifIFD", "LensMake"))
-        self.lensModel   = self.get_exif(("ExifIFD", "LensModel"))
+        self.lensBrand   = rec.lensMake
+        self.lensModel   = rec.lensModel
         self.lens        = f"{self.lensBrand} {self.lensModel}" if self.lensBrand and self.lensModel else ''
 
         if self.lensModel:
@@ -445,28 +409,24 @@ class exposureObj:
             self.maxAperture = ''
 
         # TODO: improve lens ID casting to handle zoom (35-105) etc. --> grab from lensModel.
-        self.focalLength = self.get_exif(("ExifIFD", "FocalLength"),
-                                        conv=lambda v: float(v.split(" ")[0]) if v else None)
+        self.focalLength = rec.focalLength
         self.lns         = self.cast_lns()
 
 
 
         # Image data
-        self.width  = self.get_exif(("File", "ImageWidth"), conv=int)
-        self.height = self.get_exif(("File", "ImageHeight"), conv=int)
+        self.width  = rec.width
+        self.height = rec.height
 
         # Duplicate attributes
-        self.isGrayscale = self.get_exif(("XMP-crs", "ConvertToGrayscale"),
-                                        conv=lambda v: bool(int(v)) if str(v).isdigit() else bool(v),
-                                        default=False)
-        self.isStitched  = self.get_exif(("XMP-aux", "IsMergedPanorama"),
-                                        conv=bool,
-                                        default=False)
-        
+        self.isGrayscale = rec.isGrayscale
+        self.isStitched  = rec.isStitched
 
-        # Hard code workaround for roll 29 (exif scene name issue)
-        if self.stk == 'Gold 200 OM Accura':
-            self.stk = 'Gold 200'
+        # Shared copies of the strings repeated across a roll and the library (EXIF strings are interned by exifRecord)
+        self.location = intern_value(self.location)
+        self.camera = intern_value(self.camera)
+        self.lens = intern_value(self.lens)
+        self.maxAperture = intern_value(self.maxAperture)
 
         # Update derived attributes
         self._update_derived_attributes()
@@ -483,23 +443,11 @@ class exposureObj:
             else:
                 self.copyType = 'edit'
 
-    # Helper function to get nested EXIF values with optional conversion and default.
-    def get_exif(self, path, conv=None, default=None):
-        d = self.exif
-        try:
-            for p in path:
-                d = d[p]
-            if d in (None, "", "NaN"):
-                return default
-            return conv(d) if conv else d
-        except Exception:
-            return default
-
     # Processes all derived attributes
     def _update_derived_attributes(self):
         # Exposure attributes
         if self.exposureTime and self.iso and self.fNumber:
-            self.exposureValue = np.log2((self.fNumber ** 2) / self.iso * (1 / self.exposureTime))
+            self.exposureValue = math.log2((self.fNumber ** 2) / self.iso * (1 / self.exposureTime))
         else:
             self.exposureValue =  'Unavailable'
 
@@ -573,10 +521,10 @@ class exposureObj:
     # prints all (filtered) attributes of an image as a table
     def getInfo(self, key=None):
         # setup
-        if self.attributes == {}: self.buildInfo()
+        attributes = self.buildInfo()
 
         missingCount = 0
-        for dict in self.attributes.values():
+        for dict in attributes.values():
             for term in dict.keys():
                 val = dict[term]
                 if val == None:
@@ -586,19 +534,19 @@ class exposureObj:
 
         # Find max key length for alignment
         max_len = 0
-        for subdict in self.attributes.values():
+        for subdict in attributes.values():
             for term in subdict.keys():
                 max_len = max(max_len, len(str(term)))
 
         if key == 'none':
-            for dict in self.attributes.values():
+            for dict in attributes.values():
                 for term in dict.keys():
                     val = dict[term]
                     if val == None:
                         dots = '.' * (max_len - len(term) + 1)
                         print(f'{term}{dots}{val}')
         elif key == None:
-            dict = self.attributes
+            dict = attributes
             for subdict in dict.values():
                 for term in subdict.keys():
                     val = subdict[term]
@@ -606,13 +554,13 @@ class exposureObj:
                         dots = '.' * (max_len - len(term) + 1)
                         print(f'{term}{dots}{val}')
         else:
-            dict = self.attributes[key]
+            dict = attributes[key]
             for key in dict.keys():
                 val = dict[key]
                 dots = '.' * (max_len - len(key) + 1)
                 print(f'{key}{dots}{val}')
 
-    # Build attribute dictionary for image
+    # Build attribute dictionary for image (built on demand, not kept on the exposure)
     def buildInfo(self):
         # Build sub-dictionaries
         attributesFile = {}
@@ -699,19 +647,11 @@ class exposureObj:
         attributes['film'] = attributesFilm
         attributes['copies'] = attributesCopies
 
-        # Cast back to obj
-        self.attributesFile = attributesFile
-        self.attributesExposure = attributesExposure
-        self.attributesCamera = attributesCamera
-        self.attributesImage = attributesImage
-        self.attributesFilm = attributesFilm
-        self.attributesCopies = attributesCopies
-        self.attributes = attributes
+        return attributes
 
     def count_unassigned_attr(self):
-        self.buildInfo()
         count = 0
-        for dict in self.attributes.values():
+        for dict in self.buildInfo().values():
             for term in dict.values():
                 if term == None:
                     count += 1
@@ -720,8 +660,11 @@ class exposureObj:
     # Show image PIL with pixel size
     def display(self, size=None):
         path = Path(self.filePath).with_name(f"{self.name}.{self.fileType}")
+        if self.previewFilePath:
+            path = Path(self.previewFilePath)
 
         if size:
+            from PIL import Image       # only needed to show a resized preview
             img = Image.open(path)
             shortest = min(img.size)
             scale = size / shortest
@@ -743,7 +686,6 @@ class exposureObj:
 
     # Final check and handle hardcoded fixes
     def verify(self):
-        self.verify_camera()
         self.get_new_name()
         return
     
@@ -795,179 +737,8 @@ class exposureObj:
 
         return new_name
 
-    # Hardcode fix to update camera exif error on rolls [33, ...]
-    def verify_camera(self):
-        def update_camera(self, make, model, path, lensMake=None, lensModel=None):
-
-
-
-
-            # write
-            subprocess.run(
-                [
-                    "exiftool",
-                    "-overwrite_original",
-                    f"-IFD0:Make={make}",
-                    f"-IFD0:Model={model}",
-                    "-IPTCDigest=",
-                    path,
-                ],
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-
-            # read back (values only, one per line, in the same order as requested)
-            result = subprocess.run(
-                [
-                    "exiftool",
-                    "-s", "-s", "-s",
-                    "-IFD0:Make",
-                    "-IFD0:Model",
-                    path,
-                ],
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-
-            lines = [ln.strip() for ln in result.stdout.splitlines() if ln.strip()]
-            if len(lines) >= 2:
-                self.cameraBrand = lines[0]
-                self.cameraModel = lines[1]
-            else:
-                raise RuntimeError(f"Unexpected exiftool output:\n{result.stdout}\n{result.stderr}")
-
-        if self.roll.index == 33:
-            new_make = 'Minolta'
-            new_model = 'Maxxum 7000'
-            if self.cameraBrand == 'SONY' or self.cameraModel == 'DSLR-A550':
-                db.e(self.dbIdx, 'Updating exif: camera model error', f'({new_make}, {new_model})')
-                update_camera(self, new_make, new_model, self.filePath)
-        
-        if self.roll.index == 36:
-            new_make = 'Nikon'
-            new_model = 'F3 - Skye'
-            if self.cameraBrand == 'SONY' or self.cameraModel == 'DSLR-A550':
-                db.e(self.dbIdx, 'Updating exif: camera model error', f'({new_make}, {new_model})')
-                update_camera(self, new_make, new_model, self.filePath)
-
-        if self.roll.index == 41:
-            new_make = 'Minolta'
-            new_model = 'x700 - Skye'
-            if self.cameraBrand == 'SONY' or self.cameraModel == 'DSLR-A550':
-                db.e(self.dbIdx, 'Updating exif: camera model error', f'({new_make}, {new_model})')
-                update_camera(self, new_make, new_model, self.filePath)
-        
-        if self.roll.index == 3:
-            new_make = 'Canon'
-            new_model = 'Ugo'
-            if self.cameraBrand == 'SONY' or self.cameraModel == 'DSLR-A550':
-                db.e(self.dbIdx, 'Updating exif: camera model error', f'({new_make}, {new_model})')
-                update_camera(self, new_make, new_model, self.filePath)
-            if self.lensModel == 'DT 18-55mm F3.5-5.6 SAM':
-                db.e(self.dbIdx, 'Updating exif: lens model error')
-                # self.fNumber    = self.get_exif(("ExifIFD", "FNumber"), conv=float)
-
-                # shutter_str     = self.get_exif(("ExifIFD", "ShutterSpeedValue"))
-                subprocess.run(
-                    [
-                        "exiftool",
-                        "-overwrite_original",
-                        f"-ExifIFD:LensMake=",
-                        f"-ExifIFD:LensModel=",
-                        f"-ExifIFD:FNumber=",
-                        f"-ExifIFD:ShutterSpeedValue=",
-                        self.filePath,
-                    ],
-                    check=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                )
-        
-        if self.roll.index == 78:
-            new_make = 'Rollei'
-            new_model = '35S'
-            if self.cameraBrand == None or self.cameraModel == None:
-                db.e(self.dbIdx, 'Updating exif: camera model error', f'({new_make}, {new_model})')
-                update_camera(self, new_make, new_model, self.filePath)
-
-
+    # Reports incomplete location data (known gaps are filled from exif_overrides.json before this runs)
     def verify_location(self):
-        def update_state(path, state=None, country=None, location=None):
-            # self.location   = self.get_exif(("IPTC", "City"))
-            # self.state      = self.get_exif(("IPTC", "Province-State"))
-            # self.country    = self.get_exif(("IPTC", "Country-PrimaryLocationName"))
-            subprocess.run(
-                [
-                    "exiftool",
-                    "-overwrite_original",
-                    f"-IPTC:Province-State={state}",
-                    f"-XMP-photoshop:State={state}",
-                    f"-XMP-iptcCore:State={state}",
-                    f"-IPTC:Country-PrimaryLocationName={country}",
-                    f"-XMP-photoshop:Country={country}",
-                    f"-XMP-iptcCore:Country={country}",
-                    f"-IPTC:City={location}",
-                    f"-XMP-photoshop:City={location}",
-                    f"-XMP-iptcCore:City={location}",
-                    "-IPTCDigest=",
-                    path,
-                ],
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-
-            # fresh read from disk (inline, no helper)
-            result = subprocess.run(
-                [
-                    "exiftool",
-                    "-s", "-s", "-s",
-                    "-IPTC:Province-State",
-                    "-XMP-photoshop:State",
-                    "-XMP-iptcCore:State",
-                    path,
-                ],
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-
-            # first non-empty line wins
-            for line in result.stdout.splitlines():
-                if line.strip():
-                    self.state = line.strip()
-                    break
-
-        if self.state is None:
-            if self.roll.index == 83 and self.index == 5: # harcode fix
-                path = self.filePath
-                state = "Graubunden"
-                update_state(path, state)
-            if self.roll.index == 45 or self.roll.index == 46: # hardcode fix
-                if self.location is not None:
-                    path = self.filePath
-                    state = self.location
-                    update_state(path, state)
-        
-        if self.roll.index == 8 and self.location is None: # hardcode fix for [8]:[20]&[21]
-            if self.state is not None:
-                self.location = self.state
-                
-        
-
-        if self.roll.index == 35 and (self.index == 34 or self.index == 35) and self.state is None:
-            path = self.filePath
-            state = "Bologna"
-            update_state(path, state)
-
-
         if self.location is None or self.state is None or self.country is None:
             if self.location is not None and self.state is None:
                 db.d(self.dbIdx, 'No state given, location error ignored.')
@@ -0,0 +1,151 @@
+# exposureTable.py
+# Columnar table of every resident exposure in a collection, for collection-wide queries.
+
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+# column -> value getter for an exposure
+COLUMNS = {
+    'roll':          lambda img: img.roll.index,
+    'index':         lambda img: img.index,
+    'dateExposed':   lambda img: img.dateExposed,
+    'rating':        lambda img: img.rating,
+    'iso':           lambda img: img.iso,
+    'fNumber':       lambda img: img.fNumber,
+    'exposureTime':  lambda img: img.exposureTime,
+    'exposureValue': lambda img: img.exposureValue,
+    'cam':           lambda img: img.cam,
+    'lns':           lambda img: img.lns,
+    'stk':           lambda img: img.stk,
+    'location':      lambda img: img.location,
+    'filmformat':    lambda img: img.filmformat,
+    'fileSize':      lambda img: img.fileSize,
+    'mpx':           lambda img: img.mpx,
+    'isCopy':        lambda img: bool(img.isCopy),
+    'copyType':      lambda img: img.copyType,
+}
+NUMERIC = ('rating', 'iso', 'fNumber', 'exposureTime', 'exposureValue', 'fileSize', 'mpx')
+CATEGORICAL = ('cam', 'lns', 'stk', 'location', 'filmformat', 'copyType')
+# Names the older roll.image_data based helpers used
+ALIASES = {'date': 'dateExposed', 'camera': 'cam', 'stock': 'stk', 'lens': 'lns', 'EV': 'exposureValue', 'format': 'filmformat'}
+
+
+class exposureTable:
+    def __init__(self, registry):
+        self.dbIdx = '[E]'
+        self.registry = registry
+        self.blocks = {}        # roll index -> (rollObj, block frame, exposures in row order)
+        self.frame = None
+        self.rows = []          # exposureObj of each frame row
+        self.rebuilt = 0        # blocks built so far (for profiling the incremental refresh)
+
+    # Typed columns of a list of exposures (one roll's images_all)
+    def build_block(self, images):
+        import pandas as pd
+        data = {name: [getter(img) for img in images] for name, getter in COLUMNS.items()}
+        block = pd.DataFrame(data, columns=list(COLUMNS))
+        block['roll'] = pd.to_numeric(block['roll'], errors='coerce').astype('Int64')
+        block['index'] = pd.to_numeric(block['index'], errors='coerce').astype('Int64')
+        block['dateExposed'] = pd.to_datetime(block['dateExposed'], errors='coerce')
+        for name in NUMERIC:
+            block[name] = pd.to_numeric(block[name], errors='coerce').astype(float)
+        block['isCopy'] = block['isCopy'].astype(bool)
+        self.rebuilt += 1
+        return block
+
+    # Brings the blocks in line with the registry's resident rolls. Returns True if anything changed.
+    def refresh(self):
+        changed = False
+        for roll_index in list(self.blocks):
+            if self.registry.rolls.get(roll_index) is not self.blocks[roll_index][0]:
+                del self.blocks[roll_index]
+                changed = True
+        for roll_index, roll in self.registry.rolls.items():
+            if roll_index not in self.blocks:
+                images = list(roll.images_all or [])
+                self.blocks[roll_index] = (roll, self.build_block(images), images)
+                changed = True
+        if changed or self.frame is None:
+            self.concat()
+        return changed
+
+    def concat(self):
+        import pandas as pd
+        order = sorted(self.blocks)
+        blocks = [self.blocks[i][1] for i in order]
+        if blocks:
+            frame = pd.concat(blocks, ignore_index=True)
+        else:
+            frame = self.build_block([])
+        for name in CATEGORICAL:
+            frame[name] = frame[name].astype('category')
+        self.frame = frame
+        self.rows = [img for i in order for img in self.blocks[i][2]]
+        db.d(self.dbIdx, f'Exposure table: {len(frame)} exposures from {len(order)} rolls')
+
+    # Drops the block of a roll (or of every roll) so the next to_frame() rebuilds it
+    def invalidate(self, roll_index=None):
+        if roll_index is None:
+            self.blocks.clear()
+        else:
+            self.blocks.pop(int(roll_index), None)
+        self.frame = None
+
+    # The whole table as a pandas DataFrame (shared between calls: copy it before modifying it)
+    def to_frame(self):
+        self.refresh()
+        return self.frame
+
+    # exposureObj's of a frame, a subset of its rows or a boolean mask over it
+    def exposures(self, rows):
+        import pandas as pd
+        if isinstance(rows, pd.Series) and rows.dtype == bool:
+            rows = self.frame[rows]
+        return [self.rows[i] for i in rows.index]
+
+    # Exposures with a rating compared to stars ('>=', '<=' or '=='), in table order. With include_copies,
+    # the copies of every selected original are added as well, the way rollObj.filter_by_rating does.
+    def filter_by_rating(self, stars, logic, include_copies=False):
+        frame = self.to_frame()
+        rating = frame['rating']
+        if logic == '>=':
+            mask = rating >= stars
+        elif logic == '<=':
+            mask = rating <= stars
+        elif logic == '==':
+            mask = rating == stars
+        else:
+            raise ValueError(f'Unknown rating logic: {logic}')
+        mask &= ~frame['isCopy']
+        selected = []
+        for img in self.exposures(mask):
+            selected.append(img)
+            if include_copies:
+                selected.extend(img.copies)
+        return selected
+
+    # Two columns as lists for the rows whose dateExposed is within [startDate, endDate] ('YYYY.MM.DD').
+    # Dates come back as 'YYYY.MM.DD' strings, which is what the Plot helpers parse.
+    def vectors(self, x, y, startDate=None, endDate=None):
+        import pandas as pd
+        frame = self.to_frame()
+        x, y = ALIASES.get(x, x), ALIASES.get(y, y)
+        mask = frame['dateExposed'].notna()
+        if startDate:
+            mask &= frame['dateExposed'] >= pd.to_datetime(startDate, format='%Y.%m.%d')
+        if endDate:
+            mask &= frame['dateExposed'] < pd.to_datetime(endDate, format='%Y.%m.%d') + pd.Timedelta(days=1)
+        selected = frame.loc[mask, [x, y]]
+
+        def values(name):
+            column = selected[name]
+            if name == 'dateExposed':
+                return list(column.dt.strftime('%Y.%m.%d'))
+            return column.tolist()
+
+        return values(x), values(y)
+
@@ -33,6 +33,7 @@ from openpyxl import load_workbook
 from pynput import keyboard
 
 import collectionObj
+from libraryCatalog import libraryCatalog
 from newRoll import (
     LIBRARY_PATH, RAW_EXTS, METADATA_COLUMNS, IMPORT_COLUMNS,
     list_raw_files, force_text_format, build_import_sheet,
@@ -105,21 +106,10 @@ def reset_selection_to_first(select_all_after=True):
         time.sleep(0.3)
 
 
-def find_roll_folder(library_path, index):
-    index_str = str(index).zfill(3)
-    matches = []
-    if os.path.isdir(library_path):
-        for name in sorted(os.listdir(library_path)):
-            if name.startswith('.'):
-                continue
-            full = os.path.join(library_path, name)
-            if not os.path.isdir(full):
-                continue
-            token = name.split('_')[0] if '_' in name else name.split(' - ')[0]
-            token = token.strip()
-            if token == index_str or (token.isdigit() and int(token) == index):
-                matches.append(full)
-    return matches
+# Roll folders in library_path whose index token matches index, from the library catalog (see libraryCatalog.py)
+def find_roll_folder(library_path, index, catalog=None):
+    catalog = catalog or libraryCatalog()
+    return [path for token, path in catalog.roll_dirs(library_path) if int(token) == index]
 
 
 def prompt_roll_folder():
@@ -204,11 +194,7 @@ def auto_fix_xlsx(xlsx_path, scans_path, roll_root, collection):
 
     stk_code, cam_id = parse_roll_tokens(roll_root)
     stk_entry = collection.stocklist.get(stk_code, {})
-    cam_entry = {}
-    for entry in collection.cameralist.values():
-        if entry.get('id') == cam_id:
-            cam_entry = entry
-            break
+    cam_entry = collection.cameras_by_id.get(cam_id, {})
 
     header = [cell.value for cell in ws[1]] or METADATA_COLUMNS
 
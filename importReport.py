@@ -0,0 +1,79 @@
+# importReport.py
+# Import-time report for the entry points (main.py, archiver.py, cleanRoll.py, newRoll.py).
+
+import os
+import sys
+import subprocess
+from time import time
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+# Libraries that should only be imported by the code that uses them
+HEAVY_MODULES = ('numpy', 'pandas', 'matplotlib', 'PIL', 'tkinter', 'openpyxl', 'pyparsing')
+ENTRY_MODULES = ('collectionObj', 'importTool', 'archiver', 'cleanRoll', 'newRoll', 'daemonClient')
+TOP_N = 10
+
+
+# Heavy libraries currently in sys.modules
+def loaded_heavy_modules():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+# Prints how long an entry point took to import its modules, warning about heavy libraries that got loaded
+# (other than the ones in expected, which the entry point needs anyway)
+def report(label, t0, expected=()):
+    dt = time() - t0
+    heavy = [name for name in loaded_heavy_modules() if name not in expected]
+    if heavy:
+        db.w('[T]', f'{label} imports loaded in {dt:.2f}s, including heavy libraries', heavy)
+    else:
+        db.i('[T]', f'{label} imports loaded in {dt:.2f}s')
+    return dt
+
+
+# Imports a module in a fresh interpreter with -X importtime. Returns {module: (self_us, cumulative_us)}.
+def profile_import(module):
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=here, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        db.e('[T]', f'Could not import {module}', result.stderr.strip().splitlines()[-1:])
+        return {}
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        fields = [f.strip() for f in line[len('import time:'):].split('|')]
+        if not fields[0].isdigit():
+            continue    # header row
+        times[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return times
+
+
+def print_report(modules):
+    for module in modules:
+        times = profile_import(module)
+        if module not in times:
+            continue
+        total = times[module][1] / 1e6
+        heavy = []
+        for name in HEAVY_MODULES:
+            cumulative = [cum for mod, (_, cum) in times.items() if mod == name or mod.startswith(name + '.')]
+            if cumulative:
+                heavy.append(f'{name}: {max(cumulative) / 1e6:.2f}s')
+        top = sorted(((cum, name) for name, (_, cum) in times.items() if name != module), reverse=True)[:TOP_N]
+        db.i('[T]', f'import {module}: {total:.2f}s', [f'{cum / 1e6:.3f}s  {name}' for cum, name in top])
+        if heavy:
+            db.w('[T]', f'{module} imports heavy libraries at the top level', heavy)
+
+
+# python importReport.py [module ...]: per-module breakdown of each entry point, from `python -X importtime`
+if __name__ == '__main__':
+    print_report(sys.argv[1:] or ENTRY_MODULES)
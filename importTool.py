@@ -1,21 +1,17 @@
-import numpy as np
-import pandas as pd
 import sys
 import os
-from tkinter import Tk
-from tkinter.filedialog import askdirectory
 import shutil
 import random
 from debuggerTool import debuggerTool
 from time import time, sleep
-from PIL import Image
-import renderTool
 
 DEBUG = 0
 WARNING = 1
 ERROR = 1
 db = debuggerTool(DEBUG, WARNING, ERROR) 
 
+DEFAULT_LIBRARY_PATH = r'/Users/rja/Documents/Coding/film-photo-archive-manager/data/photography'
+
 class importTool:
     def __init__(self):
         
@@ -110,8 +106,13 @@ class importTool:
         if not os.path.exists(dest_folder):
             os.makedirs(dest_folder)
 
-        # grab source file
+        # grab source file (RAW-only rolls: the embedded preview, the RAW itself already goes to scans)
         src_path = img.filePath
+        if img.isRaw:
+            if not img.previewFilePath:
+                db.d(img.dbIdx, 'No preview to export for RAW', img.fileName)
+                return
+            src_path = img.previewFilePath
 
         # define new naming convention
         new_name = self.get_photo_name(img) # eg [roll index]_[YYMMDD]_[index]_[stk]_[location]_[cam]_[lns]_[rating]
@@ -135,7 +136,7 @@ class importTool:
         new_name = self.get_photo_name(img) + '_lowres'  # eg [roll index]_[YYMMDD]_[index]_[stk]_[location]_[cam]_[lns]_[rating]
 
         # define dest path
-        dest_path = os.path.join(dest_folder, new_name + os.path.splitext(img.fileName)[1])  # preserve original extension
+        dest_path = os.path.join(dest_folder, new_name + os.path.splitext(img.get_image_path())[1])  # extension of the image the preview is made from (.jpg for RAWs)
 
         try:
             # copy preview
@@ -147,7 +148,8 @@ class importTool:
 
     def generate_preview(self, img, path):
         # Generate a preview image for the given image of {size} px on shortest side
-        image = img.filePath
+        from PIL import Image
+        image = img.get_image_path()
 
         # Calculate new size based on shortest side == {size}
         dimensions = Image.open(image).size
@@ -249,23 +251,27 @@ class importTool:
         rolls = rolls.copy()
         random.shuffle(rolls)
 
-        # Iterate through rolls and images to select based on rating and size limit
+        # Exposures (originals and copies) at or above the rating limit, per roll, from the collection's exposure table
+        table = rolls[0].collection.table if rolls else None
+        candidates = {}
+        if table is not None:
+            frame = table.to_frame()
+            mask = frame['roll'].isin([roll.index for roll in rolls]) & (frame['rating'] >= rating_limit)
+            candidates = {int(index): group['fileSize'] for index, group in frame[mask].groupby('roll', sort=False)}
+
+        # Walk through the rolls, taking candidates until the size limit is met
         selected_rolls = []
         for roll in rolls:
             selected_rolls.append(roll.index)
-            images = roll.images.copy()
-            for img in images:
-                if img.rating >= rating_limit:
-                    img_size = img.fileSize
-                    if total_size + img_size <= size_limit:
-                        selected.append(img)
-                        total_size += img_size
-                for copy in img.copies:
-                    if copy.rating >= rating_limit:
-                        copy_size = os.path.getsize(copy.filePath)
-                        if total_size + copy_size <= size_limit:
-                            selected.append(copy)
-                            total_size += copy_size
+            sizes = candidates.get(roll.index)
+            if sizes is None:
+                continue
+            for row, img_size in sizes.items():
+                if img_size != img_size:    # NaN: size unknown
+                    continue
+                if total_size + img_size <= size_limit:
+                    selected.append(table.rows[row])
+                    total_size += int(img_size)
                 if total_size >= size_limit:
                     break
             if total_size >= size_limit:
@@ -300,7 +306,7 @@ class importTool:
         db.i(roll.dbIdx, 'Cleaning roll:', f'{roll.countAll + roll.countRaw} files, {roll.sizeAll / (1024*1024):.0f}MB: {roll.countRaw} RAW, {roll.countJpg} JPG: {roll.countExposures} Exp, {roll.countCopies} Copies.')
 
         if library_path is None:
-            library_path = r'/Users/rja/Documents/Coding/film-photo-archive-manager/data/photography'
+            library_path = DEFAULT_LIBRARY_PATH
         
 
         # Determine index and date of roll
@@ -329,7 +335,7 @@ class importTool:
 
 
         roll_folder_name = roll.newName
-        roll_base_path = os.path.join(library_path, 'film', 'library', date.strftime('%Y'), roll_folder_name)
+        roll_base_path = self.get_roll_base_path(roll, library_path)
 
         if os.path.exists(roll_base_path):
             shutil.rmtree(roll_base_path)
@@ -438,60 +444,7 @@ class importTool:
 
         # Render contact sheets
         if clean_contact_sheet:
-
-            progress_index += 3 * m
-            output_folder = contact_sheets_path
-            save_path = roll_base_path
-            if not os.path.exists(contact_sheets_path):
-                os.makedirs(contact_sheets_path)
-            renderer = renderTool.Renderer()
-
-            # Render metadata page
-            db.progress(
-                pre=f"[All] [1/3]",
-                current=progress_index,
-                total=total_length,
-                post=f"Rendering contact sheets info...",
-                mode="info"
-            )
-            renderer.render(roll, P1=0,P2=0,P3=1, save=1, show=0, output_folder=output_folder, save_path=save_path)
-            progress_index += round(alpha / 5 * m)
-
-            # Render main page
-            db.progress(
-                pre=f"[All] [2/3]",
-                current=progress_index,
-                total=total_length,
-                post=f"Rendering contact sheet...",
-                mode="info"
-            )
-            renderer.render(roll, P1=1,P2=0,P3=0, save=1, show=0, output_folder=output_folder, save_path=save_path)
-            progress_index += round(alpha / 5 * m * 3)
-
-
-            # Render copies page
-            db.progress(
-                pre=f"[All] [3/3]",
-                current=progress_index,
-                total=total_length,
-                post=f"Rendering contact sheets...",
-                mode="info"
-            )
-            renderer.render(roll, P1=0,P2=1,P3=0, save=1, show=0, output_folder=output_folder, save_path=save_path)
-            progress_index += round(alpha / 5 * m)
-
-            # copy contact sheet to to export folder as well
-            contact_sheets_folder = os.path.join(library_path, 'film', 'library', 'contact sheets')
-            if not os.path.exists(contact_sheets_folder):
-                os.makedirs(contact_sheets_folder)
-            
-            # copy exported contact sheet from save_path/XXX_contact_sheet.png to contact_sheets_folder/{roll.newName}.png
-            src_contact_sheet = os.path.join(save_path, f"{roll.index_str}_contact_sheet.png")
-            dst_contact_sheet = os.path.join(contact_sheets_folder, f"{roll.newName}.png")
-            # print(src_contact_sheet, '\n'*4, dst_contact_sheet)
-            self.copy_file(src_contact_sheet, dst_contact_sheet)
-        
-
+            progress_index = self.render_contact_sheets(roll, roll_base_path, library_path, progress_index, total_length)
 
         # export exif json
         if clean_exif:
@@ -516,6 +469,77 @@ class importTool:
         db.i(roll.dbIdx, roll_base_path)
 
 
+    # Renders a roll's contact sheets into <roll_base_path>/05_other/02_contact_sheets and copies the main sheet
+    # into the library's shared 'contact sheets' folder. Returns the advanced progress_index.
+    # Split out of cleanRoll() so cleanScheduler can run rendering as its own pipeline stage.
+    def render_contact_sheets(self, roll, roll_base_path, library_path, progress_index=0, total_length=None):
+        m = len(roll.images_all)
+        alpha = 2.6
+        if total_length is None:
+            total_length = progress_index + 3 * m + round(alpha * m)
+        contact_sheets_path = os.path.join(roll_base_path, '05_other', '02_contact_sheets')
+
+        progress_index += 3 * m
+        output_folder = contact_sheets_path
+        save_path = roll_base_path
+        if not os.path.exists(contact_sheets_path):
+            os.makedirs(contact_sheets_path)
+        import renderTool       # PIL is only loaded once contact sheets are rendered
+        renderer = renderTool.Renderer()
+
+        # Render metadata page
+        db.progress(
+            pre=f"[All] [1/3]",
+            current=progress_index,
+            total=total_length,
+            post=f"Rendering contact sheets info...",
+            mode="info"
+        )
+        renderer.render(roll, P1=0,P2=0,P3=1, save=1, show=0, output_folder=output_folder, save_path=save_path)
+        progress_index += round(alpha / 5 * m)
+
+        # Render main page
+        db.progress(
+            pre=f"[All] [2/3]",
+            current=progress_index,
+            total=total_length,
+            post=f"Rendering contact sheet...",
+            mode="info"
+        )
+        renderer.render(roll, P1=1,P2=0,P3=0, save=1, show=0, output_folder=output_folder, save_path=save_path)
+        progress_index += round(alpha / 5 * m * 3)
+
+
+        # Render copies page
+        db.progress(
+            pre=f"[All] [3/3]",
+            current=progress_index,
+            total=total_length,
+            post=f"Rendering contact sheets...",
+            mode="info"
+        )
+        renderer.render(roll, P1=0,P2=1,P3=0, save=1, show=0, output_folder=output_folder, save_path=save_path)
+        progress_index += round(alpha / 5 * m)
+
+        # copy contact sheet to to export folder as well
+        contact_sheets_folder = os.path.join(library_path, 'film', 'library', 'contact sheets')
+        if not os.path.exists(contact_sheets_folder):
+            os.makedirs(contact_sheets_folder)
+
+        # copy exported contact sheet from save_path/XXX_contact_sheet.png to contact_sheets_folder/{roll.newName}.png
+        src_contact_sheet = os.path.join(save_path, f"{roll.index_str}_contact_sheet.png")
+        dst_contact_sheet = os.path.join(contact_sheets_folder, f"{roll.newName}.png")
+        # print(src_contact_sheet, '\n'*4, dst_contact_sheet)
+        self.copy_file(src_contact_sheet, dst_contact_sheet)
+
+        return progress_index
+
+    # Target folder of a cleaned roll: <library_path>/film/library/<YYYY>/<roll.newName>
+    def get_roll_base_path(self, roll, library_path=None):
+        if library_path is None:
+            library_path = DEFAULT_LIBRARY_PATH
+        return os.path.join(library_path, 'film', 'library', roll.startDate.strftime('%Y'), roll.newName)
+
     def cleanRoll_in_place(self, roll, clean_raw=True, clean_jpg=True, clean_preview=True, clean_edits=True, clean_contact_sheet=True, clean_exif=True):
         """
         Cleans up a roll IN PLACE: writes 03_previews/04_edits/05_other outputs
@@ -677,6 +701,7 @@ class importTool:
             save_path = roll_base_path
             if not os.path.exists(contact_sheets_path):
                 os.makedirs(contact_sheets_path)
+            import renderTool
             renderer = renderTool.Renderer()
 
             # Render metadata page
@@ -0,0 +1,143 @@
+# libraryCatalog.py
+# On-disk SQLite catalog of the library's year and roll folders, refreshed by mtime.
+
+import os
+import re
+import sqlite3
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'library_catalog.sqlite')
+
+
+# Index token of a roll folder name: "11_22-10-03 Ektar 100 Zurich" / "011_..." --> "11" / "011",
+# "11 - Ektar 100" --> "11". None if the name has neither separator.
+def roll_token(name):
+    if '_' in name:
+        return name.split('_')[0].strip()
+    if ' - ' in name:
+        return name.split(' - ')[0].strip()
+    return None
+
+
+# True for year folders ("2023", "2024 - 120") and the 'Temp' folder
+def is_year_dir(name):
+    return bool(re.match(r'20\d{2}', name)) or name == 'Temp'
+
+
+class libraryCatalog:
+    def __init__(self, path=CATALOG_PATH):
+        self.dbIdx = '[C]'
+        self.path = path
+        self.rescans = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)    # cleanScheduler imports on its own thread
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS dirs ('
+            'path TEXT PRIMARY KEY, parent TEXT, name TEXT, token TEXT, '
+            'mtime_ns INTEGER, listed_ns INTEGER)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent)')
+        self.conn.commit()
+
+    # Sub-folders of path as a sorted list of (name, full path), skipping hidden folders.
+    # Served from the catalog unless path's mtime changed since it was last listed (or refresh=True).
+    def subdirs(self, path, refresh=False):
+        path = os.path.normpath(path)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            self._forget(path)
+            return []
+
+        row = self.conn.execute('SELECT listed_ns FROM dirs WHERE path = ?', (path,)).fetchone()
+        if refresh or row is None or row[0] != mtime_ns:
+            self._rescan(path, mtime_ns)
+
+        rows = self.conn.execute('SELECT name, path FROM dirs WHERE parent = ? ORDER BY name', (path,)).fetchall()
+        return [(name, child) for name, child in rows]
+
+    # Roll folders directly under path as (token, full path), sorted by index. Folders without a
+    # numeric token are skipped (reported as errors with report=True).
+    def roll_dirs(self, path, refresh=False, report=False):
+        rolls = []
+        for name, child in self.subdirs(path, refresh):
+            token = roll_token(name)
+            if token is None or not token.isdigit():
+                if report:
+                    db.e(self.dbIdx, f'Could not ID roll index from folder name!', name)
+                continue
+            rolls.append((token, child))
+        return sorted(rolls, key=lambda x: int(x[0]))
+
+    # Roll folders of a year-structured library (root -> 20XX / Temp -> rolls), sorted by index
+    def library_rolls(self, path, refresh=False):
+        rolls = []
+        for name, year in self.subdirs(path, refresh):
+            if is_year_dir(name):
+                rolls.extend(self.roll_dirs(year, refresh, report=True))
+        return sorted(rolls, key=lambda x: int(x[0]))
+
+    # mtime_ns of a cataloged folder as of its parent's last listing, or None
+    def mtime(self, path):
+        row = self.conn.execute('SELECT mtime_ns FROM dirs WHERE path = ?', (os.path.normpath(path),)).fetchone()
+        return row[0] if row else None
+
+    def _rescan(self, path, mtime_ns):
+        children = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if not entry.is_dir():
+                            continue
+                        children.append((entry.path, path, entry.name, roll_token(entry.name), entry.stat().st_mtime_ns))
+                    except OSError:
+                        continue
+        except OSError as e:
+            db.e(self.dbIdx, 'Could not list folder', f'{path}: {e}')
+            return
+
+        self.rescans += 1
+        keep = {c[0] for c in children}
+        stale = [p for (p,) in self.conn.execute('SELECT path FROM dirs WHERE parent = ?', (path,)) if p not in keep]
+        for p in stale:
+            self._forget(p, commit=False)
+
+        # Upsert keeps listed_ns of children that are still there, so their own listings stay valid
+        self.conn.executemany(
+            'INSERT INTO dirs (path, parent, name, token, mtime_ns) VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT(path) DO UPDATE SET parent = excluded.parent, name = excluded.name, '
+            'token = excluded.token, mtime_ns = excluded.mtime_ns',
+            children,
+        )
+        self.conn.execute(
+            'INSERT INTO dirs (path, parent, name, token, mtime_ns, listed_ns) VALUES (?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT(path) DO UPDATE SET mtime_ns = excluded.mtime_ns, listed_ns = excluded.listed_ns',
+            (path, os.path.dirname(path), os.path.basename(path), roll_token(os.path.basename(path)), mtime_ns, mtime_ns),
+        )
+        self.conn.commit()
+        db.d(self.dbIdx, f'Re-listed folder ({len(children)} sub-folders, {len(stale)} removed)', path)
+
+    # Drops a folder and everything cataloged below it
+    def _forget(self, path, commit=True):
+        self.conn.execute(
+            'DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?',
+            (path, len(path) + 1, path + os.sep),
+        )
+        if commit:
+            self.conn.commit()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
@@ -12,6 +12,12 @@ import subprocess
 import sys
 from tkinter import Tk, filedialog
 
+# This script is run from lrplugin-dev/, so the project root (where xmpSidecar lives) isn't on sys.path
+PROJECT_DIR = str(Path(__file__).resolve().parent.parent)
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+import xmpSidecar
+
 class db:
     @staticmethod
     def d(msg):
@@ -816,7 +822,7 @@ class metadataTool:
 
 
 
-    def set_capture_time(file_path, dt_str):
+    def set_capture_time(self, file_path, dt_str):
         subprocess.run([
             "exiftool",
             f"-DateTimeOriginal={dt_str}",
@@ -948,44 +954,22 @@ class metadataTool:
                 db.d(f"Skip EXIF date {i}: missing rawFilePath or dateTimeOriginal")
                 continue
 
-            # check current EXIF datetime first
-            check_cmd = [
-                "exiftool",
-                "-s3",
-                "-DateTimeOriginal",
-                raw_path
-            ]
-
-            check_result = subprocess.run(check_cmd, capture_output=True, text=True)
+            xmp_path = Path(raw_path).with_suffix(".xmp")
 
-            if check_result.returncode != 0:
-                db.d(f"ExifTool read error on {raw_path}: {check_result.stderr.strip()}")
+            # Patched in Python (xmpSidecar): compares the sidecar's current dates and
+            # only rewrites it (atomically) if they differ -- no exiftool per RAW.
+            try:
+                changed = xmpSidecar.write_dates(str(xmp_path), dt_original)
+            except (OSError, ValueError) as e:
+                db.d(f"XMP write error on {xmp_path}: {e}")
                 continue
 
-            current_dt = check_result.stdout.strip()
-
-            if current_dt == dt_original:
+            if not changed:
                 db.d(f"Skip EXIF date {i}/{len(self.data)}: already correct")
                 continue
 
-            xmp_path = Path(raw_path).with_suffix(".xmp")
-
-            cmd = [
-            "exiftool",
-            f"-DateTimeOriginal={dt_original}",
-            f"-CreateDate={dt_original}",
-            f"-ModifyDate={dt_original}",
-            "-overwrite_original",
-            str(xmp_path)
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True)
-
-            if result.returncode != 0:
-                db.d(f"ExifTool write error on {raw_path}: {result.stderr.strip()}")
-            else:
-                db.d(f"EXIF date set {i}/{len(self.data)}: {raw_path}")
-                changed_any = True
+            db.d(f"EXIF date set {i}/{len(self.data)}: {raw_path}")
+            changed_any = True
 
         if changed_any:
             self.refresh_lr_metadata_from_files()
@@ -29,17 +29,17 @@
 # 81-90
 # 91-100
 
-import numpy as np
-import pandas as pd
 import sys
 import os
-from PIL import Image
-from PIL.ExifTags import TAGS
-import re
-import glob
-import importlib  # Import the importlib module
+import importlib
 from time import time
 
+import_t0 = time()
+# Re-running this file in an open interpreter (Jupyter / VS Code interactive) reloads the modules below so edits
+# are picked up. A fresh `python main.py` has nothing to reload, and reloading there would import everything twice.
+RELOAD_MODULES = ('rollObj', 'exposureObj', 'collectionObj', 'renderTool', 'importTool', 'watchTool', 'cleanScheduler')
+to_reload = [name for name in RELOAD_MODULES if name in sys.modules]
+
 # Import and reload modules
 import collectionObj
 import rollObj 
@@ -47,16 +47,21 @@ import exposureObj
 import renderTool 
 import importTool
 import debuggerTool
-importlib.reload(rollObj)  
-importlib.reload(exposureObj) 
-importlib.reload(collectionObj)  
-importlib.reload(renderTool)
-importlib.reload(importTool)
+import watchTool
+import cleanScheduler
+import daemonClient
+import importReport
+for name in to_reload:
+    importlib.reload(sys.modules[name])
 
 # ======================== Setup Vars ================================
 DEVMODE = 0         # If true, work in local dir. If false, work in production dir. Contains rolls 72, 74, 83, 85
 CLEANMODE = 0    # import from cleaned library
 EXTERNAL_SSD = 0
+WATCHMODE = 0       # after the run below, keep watching the imported rolls and re-run on changes (see watchTool.py)
+IMPORT_WORKERS = 1  # >1 imports rolls on that many processes (see parallelImport.py)
+PIPELINE = 0        # import, copy and render contact sheets concurrently in one pass (see cleanScheduler.py)
+DAEMON = 0          # hand the import + clean to a running collection daemon, which keeps rolls hot between runs (see collectionDaemon.py)
 
 # rolls_to_import = 'all'
 # rolls_to_import = [72, 74, 83, 85]
@@ -77,114 +82,136 @@ library_clean = r'/Users/rja/Photography/Temporary'
 
 # ====================================================================
 
-runtime_t0 = time()
-# Set library path
-if DEVMODE:
-    # Set abspath and reference library to this workspace
-    sys.path.append(os.path.abspath(r'C:\A_Documents\Documents\Coding\Lightroom_FileFinder'))
-    library = r'/Users/rja/Documents/Coding/film-photo-archive-manager/data/filmCollectionTestAll'
-    if CLEANMODE:
-        library = r'/Users/rja/Documents/Coding/film-photo-archive-manager/data/photography/film/library'
-else:
-    sys.path.append(os.path.abspath(r'C:\A_Documents\Documents\Coding\Lightroom_FileFinder'))
-    # library = r'/Users/rja/Photography/Film Scanning'
-    library = r'/Users/rja/Photography/Film Scanning/Temp/'
-    if EXTERNAL_SSD:
-        library = r'/Volumes/NVME_C/Film Scanning'
-        library_clean = r'/Volumes/NVME_C/photography'
-
-print("===================================================================")
-print("===================================================================")
-print("===================================================================")
-for i in range(20):
-    print('\n')
-
-
-# Initialize collection
-collection = collectionObj.collectionObj(library)
-importer = importTool.importTool()
-db = debuggerTool.debuggerTool()
-collection.build_directory_tree()
-
-# Import rolls
-t1 = time()
-collection.import_rolls(rolls_to_import)
-t2 = time()
-db.i('[I]', f'Import completed in {t2 - t1:.2f}s')
-
-# Example rendering
-# for roll in collection.rolls:
-#     img = roll.images[0]
-#     contact_sheet = renderTool.Renderer(roll)
-#     contact_sheet.render()
-
-# Example wallpaper generation
-# importer.generate_wallpapers(collection.rolls, wallpaper_path, rating_limit=3, size_limit=1)
-
-# Example Clean up library
-# importer.cleanRoll(collection.rolls[0], library_path=None, mode=[1,1,0,1])
-
-for i in range(3):
-    print('\n')
-
-# =================================================================================
-# =================================================================================
-renderer = renderTool.Renderer()
-startDates = set()
-for roll in collection.rolls:
-    # importer.cleanRoll(roll, library_path=library_clean, clean_raw=1, clean_jpg=0, clean_preview=0, clean_edits=0, clean_contact_sheet=0, clean_exif=0)
-    importer.cleanRoll(roll, library_path=library_clean)
-    # renderer.render(roll, P1=1, P2=1, P3=1, show=True)
-    # print(roll.index, roll.startDate, roll.endDate)
-    # startDates.add((roll.index, roll.startDate, roll.name))
-
-
-    # img1 = roll.getImage(10)
-    # img1.display()
-
-    # roll.getImage(8).display(100)
-    # roll.getImage(10).display(100)
-
-    # dir = roll.rawDirs[0]
-    # # print(dir)
-    # # print(os.listdir(dir))
-    # print('\n')
-
-    # for f in os.listdir(dir):
-    #     print(f)
-
-    # print("DEBUG","-"*190)
-    # for img in roll.images_all:
-    #     print(f'idx:{img.index}\t\tidx_original:{img.index_original}\t\trawFileName:{img.rawFileName}\t\tdateExposed:{img.dateExposed}\t\tcopyCount:{img.copyCount}\t\tisCopy:{img.isCopy}\t\tisPano:{int(img.isPano)}')
-    # print("DEBUG","-"*190,'\n')
-    # for img in roll.images_all:
-        # print(os.path.basename(img.rawFileName) if img.rawFileName else None)
-    #     print(img.exif)
-    #     print('\n'*3)
-    #         print('\n'*1)
-    #         print(img.shutterSpeed)
-        # print(img.lns)
+# Everything below runs only when main.py is the script being run: parallel imports re-import it in their
+# worker processes (see parallelImport.py)
+if __name__ == '__main__':
+    importReport.report('main.py', import_t0, expected=('PIL',))    # renderTool renders the contact sheets
+
+    runtime_t0 = time()
+    # Set library path
+    if DEVMODE:
+        # Set abspath and reference library to this workspace
+        sys.path.append(os.path.abspath(r'C:\A_Documents\Documents\Coding\Lightroom_FileFinder'))
+        library = r'/Users/rja/Documents/Coding/film-photo-archive-manager/data/filmCollectionTestAll'
+        if CLEANMODE:
+            library = r'/Users/rja/Documents/Coding/film-photo-archive-manager/data/photography/film/library'
+    else:
+        sys.path.append(os.path.abspath(r'C:\A_Documents\Documents\Coding\Lightroom_FileFinder'))
+        # library = r'/Users/rja/Photography/Film Scanning'
+        library = r'/Users/rja/Photography/Film Scanning/Temp/'
+        if EXTERNAL_SSD:
+            library = r'/Volumes/NVME_C/Film Scanning'
+            library_clean = r'/Volumes/NVME_C/photography'
+
+    print("===================================================================")
+    print("===================================================================")
+    print("===================================================================")
+    for i in range(20):
+        print('\n')
+
+
+    # Thin-client mode: the daemon re-uses its resident rolls and only re-imports the ones whose files changed
+    if DAEMON and daemonClient.is_running():
+        daemonClient.request('clean', library=library, rolls=rolls_to_import, library_path=library_clean)
+        print(f"Runtime: {time() - runtime_t0:.2f}s")
+        sys.exit(0)
+
+    # Initialize collection
+    collection = collectionObj.collectionObj(library)
+    importer = importTool.importTool()
+    db = debuggerTool.debuggerTool()
+    collection.build_directory_tree()
+
+    # Import rolls
+    t1 = time()
+    if PIPELINE:
+        scheduler = cleanScheduler.cleanScheduler(collection, importer, library_path=library_clean, import_workers=IMPORT_WORKERS)
+        scheduler.run(rolls_to_import)
+    else:
+        collection.import_rolls(rolls_to_import, workers=IMPORT_WORKERS)
+    t2 = time()
+    db.i('[I]', f'Import completed in {t2 - t1:.2f}s')
+    collection.save_snapshot()  # next run starts from these rolls (see collectionSnapshot.py)
+
+    # Example rendering
+    # for roll in collection.rolls:
+    #     img = roll.images[0]
+    #     contact_sheet = renderTool.Renderer(roll)
+    #     contact_sheet.render()
+
+    # Example wallpaper generation
+    # importer.generate_wallpapers(collection.rolls, wallpaper_path, rating_limit=3, size_limit=1)
+
+    # Example Clean up library
+    # importer.cleanRoll(collection.rolls[0], library_path=None, mode=[1,1,0,1])
+
+    for i in range(3):
+        print('\n')
+
+    # =================================================================================
+    # =================================================================================
+    renderer = renderTool.Renderer()
+    startDates = set()
+    for roll in collection.rolls:
+        # importer.cleanRoll(roll, library_path=library_clean, clean_raw=1, clean_jpg=0, clean_preview=0, clean_edits=0, clean_contact_sheet=0, clean_exif=0)
+        if not PIPELINE:
+            importer.cleanRoll(roll, library_path=library_clean)
+        # renderer.render(roll, P1=1, P2=1, P3=1, show=True)
+        # print(roll.index, roll.startDate, roll.endDate)
+        # startDates.add((roll.index, roll.startDate, roll.name))
+
+
+        # img1 = roll.getImage(10)
+        # img1.display()
+
+        # roll.getImage(8).display(100)
+        # roll.getImage(10).display(100)
+
+        # dir = roll.rawDirs[0]
+        # # print(dir)
+        # # print(os.listdir(dir))
+        # print('\n')
+
+        # for f in os.listdir(dir):
+        #     print(f)
+
+        # print("DEBUG","-"*190)
+        # for img in roll.images_all:
+        #     print(f'idx:{img.index}\t\tidx_original:{img.index_original}\t\trawFileName:{img.rawFileName}\t\tdateExposed:{img.dateExposed}\t\tcopyCount:{img.copyCount}\t\tisCopy:{img.isCopy}\t\tisPano:{int(img.isPano)}')
+        # print("DEBUG","-"*190,'\n')
+        # for img in roll.images_all:
+            # print(os.path.basename(img.rawFileName) if img.rawFileName else None)
+        #     print(img.exif)
+        #     print('\n'*3)
+        #         print('\n'*1)
+        #         print(img.shutterSpeed)
+            # print(img.lns)
     
-    continue
+        continue
+
 
+    # sort startDates by startDate[1]
+    # startDates = sorted(startDates, key=lambda x: x[1])
+    # for i, startDate in enumerate(startDates):
+    #     oldIndex = startDate[0] - 900 - 22 + 93
+    #     newIndex = i + 93
+    #     if oldIndex != newIndex:
+    #         print(f'{oldIndex}\t{newIndex} \t{startDate[2]}\t\t{startDate[1]}')
+    #     else:
+    #         print(f'{oldIndex}\t{newIndex} \t{startDate[2]}\t\t{startDate[1]}')
 
-# sort startDates by startDate[1]
-# startDates = sorted(startDates, key=lambda x: x[1])
-# for i, startDate in enumerate(startDates):
-#     oldIndex = startDate[0] - 900 - 22 + 93
-#     newIndex = i + 93
-#     if oldIndex != newIndex:
-#         print(f'{oldIndex}\t{newIndex} \t{startDate[2]}\t\t{startDate[1]}')
-#     else:
-#         print(f'{oldIndex}\t{newIndex} \t{startDate[2]}\t\t{startDate[1]}')
 
+    # =================================================================================
+    for i in range(3):
+        print('\n')
+    print("===================================================================")
+    db.i('[I]', f"Runtime: {time() - runtime_t0:.2f}s")
 
-# =================================================================================
-for i in range(3):
-    print('\n')
-print("===================================================================")
-db.i('[I]', f"Runtime: {time() - runtime_t0:.2f}s")
+    # Watch mode: re-import rolls as their files change and re-clean each updated roll as soon as it's ready
+    if WATCHMODE:
+        watcher = watchTool.watchTool(collection, on_update=lambda roll: importer.cleanRoll(roll, library_path=library_clean))
+        watcher.run()
 
 
 
-# importer.generate_wallpapers_bw(collection.rolls, wallpaper_path, rating_limit=3, size_limit=1)
\ No newline at end of file
+    # importer.generate_wallpapers_bw(collection.rolls, wallpaper_path, rating_limit=3, size_limit=1)
\ No newline at end of file
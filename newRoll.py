@@ -26,12 +26,12 @@ import re
 import subprocess
 from datetime import datetime
 
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font
-from openpyxl.utils import get_column_letter
+# pandas / openpyxl are imported where they're used: cleanRoll.py imports this module just for
+# LIBRARY_PATH and shouldn't pay for them
 
 import collectionObj
+import referenceTables
+from libraryCatalog import libraryCatalog
 
 # Working "scan/edit" library root -- where rolls live while you're still in Lightroom
 # editing them, before cleanRoll.py archives them into the final dated library.
@@ -117,6 +117,7 @@ def force_text_format(ws, column_names=None):
     reinterprets a typed value like "1/15" or "250" as a date/number --
     applies to any cell in that column, including rows added later, since
     it's stored as the column's own default format rather than per-cell."""
+    from openpyxl.utils import get_column_letter
     header = [cell.value for cell in ws[1]]
     for idx, name in enumerate(header, start=1):
         if column_names is not None and name not in column_names:
@@ -125,6 +126,8 @@ def force_text_format(ws, column_names=None):
 
 
 def style_import_sheet(ws):
+    from openpyxl.styles import PatternFill, Font
+    from openpyxl.utils import get_column_letter
     header = [cell.value for cell in ws[1]]
     for names, hex_color in IMPORT_COLUMN_GROUPS:
         fill = PatternFill(start_color=hex_color, end_color=hex_color, fill_type='solid')
@@ -154,19 +157,12 @@ def build_import_sheet(wb, rows):
     return ws
 
 
-def get_next_index(library_path):
+# Next free roll index in library_path, from the library catalog (see libraryCatalog.py)
+def get_next_index(library_path, catalog=None):
+    catalog = catalog or libraryCatalog()
     max_idx = 0
-    if os.path.isdir(library_path):
-        for name in os.listdir(library_path):
-            if name.startswith('.'):
-                continue
-            full = os.path.join(library_path, name)
-            if not os.path.isdir(full):
-                continue
-            token = name.split('_')[0] if '_' in name else name.split(' - ')[0]
-            token = token.strip()
-            if token.isdigit():
-                max_idx = max(max_idx, int(token))
+    for token, _ in catalog.roll_dirs(library_path):
+        max_idx = max(max_idx, int(token))
     return max_idx + 1
 
 
@@ -208,32 +204,15 @@ def prompt_stock(collection):
 
 
 def load_camera_rows():
-    """Reads cameralist.xlsx rows directly, instead of going through
+    """Returns cameralist.xlsx's rows, instead of going through
     collectionObj.build_cameralist()'s dict. That dict is keyed by id/model/"brand model"
     with a plain assignment per row, so when multiple distinct camera bodies share the
     same model name (eg. three "F3"s with ids F3/F3S/F3'), each later row silently
     overwrites the earlier one under the shared 'model' key -- whichever row happens to
-    be listed last in the sheet wins, with no way to tell from the result. Reading the
-    raw rows here lets prompt_camera() detect that ambiguity and ask, instead of
-    guessing."""
-    project_dir = os.path.dirname(os.path.abspath(collectionObj.__file__))
-    xlsx_path = os.path.join(project_dir, 'data', 'cameralist.xlsx')
-    df = pd.read_excel(xlsx_path, dtype=str, engine='openpyxl').fillna('')
-
-    rows = []
-    for _, row in df.iterrows():
-        cam_id = row['id'].strip()
-        if not cam_id:
-            continue
-        rows.append({
-            'id': cam_id,
-            'model': row['model'].strip(),
-            'brand': row['brand'].strip(),
-            'serial': row['serial'].strip(),
-            'filmtype': row['filmtype'].strip(),
-            'filmformat': row['filmformat'].strip(),
-        })
-    return rows
+    be listed last in the sheet wins, with no way to tell from the result. The raw rows
+    let prompt_camera() detect that ambiguity and ask, instead of guessing. They come
+    from referenceTables' compiled cache, the same one collectionObj reads."""
+    return referenceTables.load_table('cameralist')['rows']
 
 
 def prompt_camera():
@@ -360,6 +339,7 @@ def list_raw_files(scans_path):
 
 
 def build_metadata_template(roll_root, folder_name, raw_files, stk_entry, cam_entry, lab_name):
+    from openpyxl import Workbook
     wb = Workbook()
     ws = wb.active
     ws.title = 'Metadata'
@@ -412,7 +392,7 @@ def build_metadata_template(roll_root, folder_name, raw_files, stk_entry, cam_en
 def main():
     collection = collectionObj.collectionObj(LIBRARY_PATH)
 
-    next_idx = get_next_index(LIBRARY_PATH)
+    next_idx = get_next_index(LIBRARY_PATH, collection.catalog)
     index = prompt_index(next_idx)
 
     stk_entry = prompt_stock(collection)
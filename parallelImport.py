@@ -0,0 +1,121 @@
+# parallelImport.py
+# Process-pool roll import for collectionObj.import_rolls(..., workers=N).
+# Callers must run under an `if __name__ == '__main__':` guard (the pool uses forkserver/spawn).
+
+import io
+import sys
+import itertools
+from collections import deque
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from rollObj import rollObj
+from exifTool import exifTool
+from exifCache import exifCache
+from exifOverrides import exifOverrides
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+# Set once per worker process by init_worker
+worker_collection = None
+
+
+# Stand-in for collectionObj inside a worker: the reference tables plus per-process services
+class workerCollection:
+    def __init__(self, tables, cache_path, overrides_path):
+        self.dbIdx = '[I]'
+        self.stocklist = tables['stocklist']
+        self.cameralist = tables['cameralist']
+        self.cameras_by_brand_model = tables['cameras_by_brand_model']
+        self.lenslist = tables['lenslist']
+        self.lenslist_by_make_focal = tables['lenslist_by_make_focal']
+        self.exiftool = exifTool(workers=1)
+        self.exif_cache = exifCache(cache_path)
+        self.exif_overrides = exifOverrides(overrides_path)
+
+
+def init_worker(tables, cache_path, overrides_path):
+    global worker_collection
+    worker_collection = workerCollection(tables, cache_path, overrides_path)
+
+
+# Imports one roll in a worker. Returns (rollObj or None, captured output).
+def import_roll_worker(path):
+    out = io.StringIO()
+    roll = None
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+        try:
+            new_roll = rollObj(directory=path, collection=worker_collection)
+            if new_roll.preprocess_roll():
+                new_roll.process_roll()
+                roll = new_roll
+        except Exception as e:
+            db.e(worker_collection.dbIdx, 'Roll import failed in worker', f'{path}: {type(e).__name__}: {e}')
+    return roll, out.getvalue()
+
+
+# Start method for the pool: forkserver on Linux, spawn on macOS (fork is unsafe there, see CPython bpo-33725) and Windows
+def get_context():
+    methods = multiprocessing.get_all_start_methods()
+    if sys.platform != 'darwin' and 'forkserver' in methods:
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+# Pool of worker processes for import_rolls_parallel, with every worker started (and initialized)
+# before it returns. cleanScheduler starts it on the main thread, before its stage threads run.
+def start_pool(collection, workers):
+    tables = {
+        'stocklist': collection.stocklist,
+        'cameralist': collection.cameralist,
+        'cameras_by_brand_model': collection.cameras_by_brand_model,
+        'lenslist': collection.lenslist,
+        'lenslist_by_make_focal': collection.lenslist_by_make_focal,
+    }
+    sys.stdout.flush()
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context(),
+        initializer=init_worker,
+        initargs=(tables, collection.exif_cache.path, collection.exif_overrides.path),
+    )
+    for future in [pool.submit(int) for _ in range(workers)]:
+        future.result()
+    return pool
+
+
+# Imports the roll folders in paths over a pool of worker processes. Yields (path, rollObj or None)
+# in the order of paths, printing each roll's buffered output just before it's yielded.
+# window caps how many rolls are submitted ahead of the consumer (None = all at once), so a slow
+# consumer (eg. cleanScheduler's copy stage) holds back the imports instead of piling up results.
+# pool is a start_pool() pool to use (the caller shuts it down), otherwise one is started for this call.
+def import_rolls_parallel(collection, paths, workers, window=None, pool=None):
+    if not paths:
+        return
+    if pool is None:
+        workers = max(1, min(int(workers), len(paths)))
+        with start_pool(collection, workers) as pool:
+            yield from import_rolls_parallel(collection, paths, workers, window, pool)
+        return
+    db.i(collection.dbIdx, f'Importing {len(paths)} rolls on {workers} processes')
+
+    window = len(paths) if window is None else max(workers, int(window))
+    pending = deque()
+    todo = iter(paths)
+    for path in itertools.islice(todo, window):
+        pending.append((path, pool.submit(import_roll_worker, path)))
+    while pending:
+        path, future = pending.popleft()
+        roll, output = future.result()
+        for next_path in itertools.islice(todo, 1):
+            pending.append((next_path, pool.submit(import_roll_worker, next_path)))
+        if output:
+            sys.stdout.write(output)
+            sys.stdout.flush()
+        if roll is not None:
+            roll.collection = collection
+        yield path, roll
@@ -0,0 +1,148 @@
+# rawMatcher.py
+# Matches exported JPGs / copies to their RAW scans through hash maps built once per roll.
+
+import os
+import re
+from rollFileIndex import RAW_EXTS
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+CORE_RE = re.compile(r"^([A-Za-z]*\d+)")
+PANO = '-Pano'
+
+
+def raw_stem(name):
+    return os.path.splitext(os.path.basename(str(name)))[0].strip()
+
+
+# "DSC01694-Pano-2.dng" --> "DSC01694"
+def raw_core(name):
+    stem = raw_stem(name)
+    m = CORE_RE.match(stem)
+    if m:
+        return m.group(1)
+    return stem.split("-")[0].split("_")[0].split(" ")[0]
+
+
+# Normalized suffix form: "DSC01694-Pano.dng" / "DSC01694-HDR.dng" --> "DSC01694", "scan12-positive-2.tif" --> "scan12"
+def raw_key(name):
+    stem = raw_stem(name)
+    if stem.endswith('-Pano'):
+        stem = stem[:-5]
+    elif stem.endswith('-HDR'):
+        stem = stem[:-4]
+    elif stem.endswith('-positive'):
+        stem = stem.split('-')[0]
+    return stem
+
+
+# Base stem of a pano merge raw: "DSC01694-Pano-2.dng" --> "DSC01694", None for anything else
+def pano_base(name):
+    stem = raw_stem(name)
+    i = stem.find(PANO)
+    return stem[:i] if i > 0 else None
+
+
+class RawMatcher:
+    def __init__(self, files, rawDirs):
+        self.dbIdx = '[R]'
+        self.files = files
+        self.rawDirs = [d for d in (rawDirs or []) if d not in (-1, None)]
+        self.raws = []          # rollFile entries of every RAW in rawDirs, sorted by name
+        self.folder = {}        # raw path -> raw dir it was found in
+        self.rank = {}          # raw path -> 1-based position in self.raws
+        self.by_name = {}       # "DSC01694.ARW" -> [rollFile]
+        self.by_stem = {}       # "DSC01694" -> [rollFile]
+        self.by_core = {}       # "DSC01694" -> [rollFile] (DSC01694.ARW, DSC01694-Pano.dng, ...)
+        self.by_key = {}        # raw_key() form -> [rollFile]
+        self.by_pano = {}       # pano base stem -> [rollFile] of its -Pano merges
+        self.build()
+
+    def build(self):
+        raws = []
+        for rawDir in self.rawDirs:
+            for f in self.files.files(rawDir, RAW_EXTS):
+                if f.name.startswith('._'):     # macOS AppleDouble files
+                    continue
+                raws.append(f)
+                self.folder[f.path] = rawDir
+        raws.sort(key=lambda f: f.name)
+        self.raws = raws
+
+        for i, f in enumerate(raws):
+            self.rank[f.path] = i + 1
+            self.by_name.setdefault(f.name, []).append(f)
+            self.by_stem.setdefault(raw_stem(f.name), []).append(f)
+            self.by_core.setdefault(raw_core(f.name), []).append(f)
+            self.by_key.setdefault(raw_key(f.name), []).append(f)
+            base = pano_base(f.name)
+            if base:
+                self.by_pano.setdefault(base, []).append(f)
+        db.d(self.dbIdx, f'Indexed {len(raws)} RAW files', self.rawDirs)
+
+    def __len__(self):
+        return len(self.raws)
+
+    def _in(self, matches, folder):
+        if folder is None:
+            return matches
+        return [f for f in matches if self.folder[f.path] == folder]
+
+    # Resolves a RAW file name (from EXIF) to a path: exact name, then stem, then core.
+    # Returns None if nothing or more than one RAW matches at the first level that has a hit.
+    # folder restricts the search to one raw dir.
+    def resolve(self, rawFileName, folder=None, dbIdx=None, label=None):
+        rawName = os.path.basename(str(rawFileName)).strip()
+        rawStem = raw_stem(rawName)
+        if not rawStem:
+            return None
+
+        levels = (
+            (self.by_name, rawName, "Duplicate exact raw filenames"),
+            (self.by_stem, rawStem, "Duplicate exact raw stems"),
+            (self.by_core, raw_core(rawName), "Duplicate DSC files"),
+        )
+        for table, key, error in levels:
+            matches = self._in(table.get(key, []), folder)
+            if len(matches) == 1:
+                return matches[0].path
+            if len(matches) > 1:
+                db.e(dbIdx or self.dbIdx, f"Error finding raw path! {error}", label or rawName)
+                return None
+        return None
+
+    # RAW files sharing this stem (any raw dir)
+    def stem_matches(self, stem):
+        return list(self.by_stem.get(str(stem).strip(), []))
+
+    # 1-based position of a RAW among all of the roll's RAWs sorted by name (= capture order for camera names)
+    def position(self, raw):
+        return self.rank.get(raw.path)
+
+    # First -Pano merge for a base stem ("DSC01694" --> DSC01694-Pano.dng), or None
+    def pano_for(self, name):
+        matches = self.by_pano.get(raw_stem(name), [])
+        return matches[0] if matches else None
+
+    # Exact name lookup, or None
+    def find(self, name):
+        matches = self.by_name.get(name, [])
+        return matches[0] if matches else None
+
+    # Core names with more than one RAW in the same raw dir -> [rollFile]
+    def ambiguous(self):
+        groups = {}
+        for core, matches in self.by_core.items():
+            for rawDir in self.rawDirs:
+                found = self._in(matches, rawDir)
+                if len(found) > 1:
+                    groups.setdefault(core, []).extend(found)
+        return groups
+
+    # RAW files whose normalized key is still in remaining (the keys no image or copy claimed)
+    def unmatched(self, remaining):
+        return [f for f in self.raws if raw_key(f.name) in remaining]
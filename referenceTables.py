@@ -0,0 +1,214 @@
+# referenceTables.py
+# Compiled cache of the reference workbooks (stocklist, cameralist and lenslist .xlsx).
+
+import os
+import pickle
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+TABLES_VERSION = 1      # bump when a compile_* function changes what it produces
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+CACHE_PATH = os.path.join(DATA_DIR, 'tables.cache')
+WORKBOOKS = {
+    'stocklist': 'stocklist.xlsx',
+    'cameralist': 'cameralist.xlsx',
+    'lenslist': 'lenslist.xlsx',
+}
+
+shared = {}         # table name -> (signature, compiled table), shared by every collection in this process
+disk = None         # contents of CACHE_PATH once read: table name -> (signature, compiled table)
+
+
+def xlsx_path(name):
+    return os.path.join(DATA_DIR, WORKBOOKS[name])
+
+
+# (TABLES_VERSION, mtime_ns, size) of a workbook, or None if it doesn't exist
+def signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (TABLES_VERSION, st.st_mtime_ns, st.st_size)
+
+
+def read_workbook(path):
+    import pandas as pd     # only needed when a workbook has to be compiled
+    return pd.read_excel(path, dtype=str, engine="openpyxl").fillna("")
+
+
+def compile_stocklist(path):
+    df = read_workbook(path)
+    stocklist = {}
+
+    for _, row in df.iterrows():
+        stk_id = row["KEY_ID"].strip()
+        if not stk_id:
+            continue
+
+        stocklist[stk_id] = {
+            "KEY_ID": row["KEY_ID"].strip(),
+            "stk": row["stk"].strip(),
+            "stock": row["stock"].strip(),
+            "manufacturer": row["manufacturer"].strip(),
+            "boxspeed": row["boxspeed"].strip(),
+            "process": row["process"].strip(),
+            "isColor": bool(int(row["isColor"])),
+            "isBlackAndWhite": bool(int(row["isBlackAndWhite"])),
+            "isInfrared": bool(int(row["isInfrared"])),
+            "isNegative": bool(int(row["isNegative"])),
+            "isSlide": bool(int(row["isSlide"])),
+            "font": row["font"].strip(),
+            "color": row["color"].strip(),
+        }
+
+    return {"stocklist": stocklist}
+
+
+def compile_cameralist(path):
+    df = read_workbook(path)
+    rows = []
+    cameralist = {}
+
+    for _, row in df.iterrows():
+        cam_id = row["id"].strip()
+        if not cam_id:
+            continue
+
+        entry = {
+            "id": cam_id,
+            "model": row["model"].strip(),
+            "brand": row["brand"].strip(),
+            "serial": row["serial"].strip(),
+            "filmtype": row["filmtype"].strip(),
+            "filmformat": row["filmformat"].strip(),
+        }
+        rows.append(entry)
+
+        # store under id
+        cameralist[cam_id] = entry
+        # also allow lookup by "Brand Model" and by model
+        full = f'{entry["brand"]} {entry["model"]}'.strip()
+        if full:
+            cameralist[full] = entry
+        if entry["model"]:
+            cameralist[entry["model"]] = entry
+
+    # Same order the old lookups scanned cameralist.values() in, so the first match still wins
+    cameras_by_brand_model = {}
+    cameras_by_id = {}
+    for cam in cameralist.values():
+        cameras_by_brand_model.setdefault((cam["brand"].lower(), cam["model"].lower()), cam)
+        cameras_by_id.setdefault(cam["id"], cam)
+
+    return {
+        "cameralist": cameralist,
+        "rows": rows,
+        "cameras_by_brand_model": cameras_by_brand_model,
+        "cameras_by_id": cameras_by_id,
+    }
+
+
+def compile_lenslist(path):
+    if not os.path.exists(path):
+        return {"lenslist": {}, "lenslist_by_make_focal": {}, "missing": True, "has_format": False}
+
+    df = read_workbook(path)
+
+    def get(row, col):
+        return row.get(col, '').strip()
+
+    lenslist = {}
+    lenslist_by_make_focal = {}
+
+    for _, row in df.iterrows():
+        make = get(row, "make")
+        model = get(row, "model")
+        if not make or not model:
+            continue
+
+        entry = {
+            "make": make,
+            "model": model,
+            "focalLength": get(row, "focalLength"),
+            "maxAperture": get(row, "maxAperture"),
+            "minAperture": get(row, "minAperture"),
+            "format": get(row, "format"),
+            "weight": get(row, "weight"),
+            "cost": get(row, "cost"),
+            "owned": get(row, "owned"),
+            "sold": get(row, "sold"),
+            "SN": get(row, "SN"),
+        }
+
+        lenslist[f'{make} {model}'.strip().lower()] = entry
+
+        if entry["focalLength"]:
+            key = (make.lower(), entry["focalLength"])
+            lenslist_by_make_focal.setdefault(key, []).append(entry)
+
+    return {
+        "lenslist": lenslist,
+        "lenslist_by_make_focal": lenslist_by_make_focal,
+        "missing": False,
+        "has_format": 'format' in df.columns,
+    }
+
+
+COMPILERS = {
+    'stocklist': compile_stocklist,
+    'cameralist': compile_cameralist,
+    'lenslist': compile_lenslist,
+}
+
+
+def read_cache():
+    global disk
+    if disk is not None:
+        return disk
+    disk = {}
+    if os.path.exists(CACHE_PATH):
+        try:
+            with open(CACHE_PATH, 'rb') as f:
+                disk = pickle.load(f)
+        except Exception as e:
+            db.w('[C]', 'Could not read reference table cache, recompiling', f'{CACHE_PATH}: {type(e).__name__}: {e}')
+            disk = {}
+    return disk
+
+
+def write_cache():
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        tmp = CACHE_PATH + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(disk, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, CACHE_PATH)
+    except OSError as e:
+        db.w('[C]', 'Could not write reference table cache', f'{CACHE_PATH}: {e}')
+
+
+# Compiled table by name ('stocklist', 'cameralist' or 'lenslist'), read from the workbook only if it changed
+def load_table(name):
+    path = xlsx_path(name)
+    sig = signature(path)
+
+    hit = shared.get(name)
+    if hit is not None and hit[0] == sig:
+        return hit[1]
+
+    cached = read_cache().get(name)
+    if cached is not None and cached[0] == sig:
+        shared[name] = cached
+        return cached[1]
+
+    db.d('[C]', f'Compiling {WORKBOOKS[name]}', path)
+    table = COMPILERS[name](path)
+    shared[name] = (sig, table)
+    disk[name] = (sig, table)
+    write_cache()
+    return table
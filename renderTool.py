@@ -3,14 +3,11 @@
 
 # Import libraries
 import os
-from tkinter import Tk
-from tkinter.filedialog import askdirectory
 from PIL import Image, ImageDraw, ImageFont
 import math
 from concurrent.futures import ThreadPoolExecutor
 import random
 
-from pyparsing import line
 from debuggerTool import debuggerTool
 import subprocess
 import sys
@@ -932,7 +929,7 @@ class Renderer:
         :param md: metadata dict
         :param i: index
         """
-        path = image.filePath
+        path = image.get_image_path()
         # set rebate object to grayscale if black and white
         if self.roll.isBlackAndWhite:
             rebate = rebate_orig.copy()
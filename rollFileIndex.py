@@ -0,0 +1,145 @@
+# rollFileIndex.py
+# One os.scandir pass over a roll folder, kept for the lifetime of the rollObj.
+
+import os
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+JPG_EXTS = ('.jpg', '.jpeg', '.png')
+RAW_EXTS = ('.arw', '.dng', '.tif', '.tiff')
+MAX_DEPTH = 2   # roll dir -> sub-folder -> sub-sub-folder (eg. 05_other/01_unmatched_raws)
+
+# Top-level sub-folders of the current roll layout
+SCANS = '01_scans'
+EXPORTS = '02_exports'
+EDITS = '04_edits'
+OTHER = '05_other'
+
+
+# Returns 'jpg', 'raw', 'xmp' or 'other' for a file name
+def file_kind(name):
+    ext = os.path.splitext(name)[1].lower()
+    if ext in JPG_EXTS:
+        return 'jpg'
+    if ext in RAW_EXTS:
+        return 'raw'
+    if ext == '.xmp':
+        return 'xmp'
+    return 'other'
+
+
+class rollFile:
+    __slots__ = ('name', 'path', 'folder', 'kind', 'size', 'mtime_ns', 'inode')
+
+    def __init__(self, entry, folder):
+        st = entry.stat()
+        self.name = entry.name
+        self.path = entry.path
+        self.folder = folder            # top-level sub-folder of the roll ('' for files in the roll dir itself)
+        self.kind = file_kind(entry.name)
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+        self.inode = st.st_ino
+
+    def __repr__(self):
+        return f'rollFile({self.path!r})'
+
+
+class RollFileIndex:
+    def __init__(self, directory):
+        self.directory = os.path.normpath(directory)
+        self.dbIdx = '[F]'
+        self.entries = {}       # dir path -> list of rollFile (files directly in that dir)
+        self.subdirs = {}       # dir path -> list of sub-folder names
+        self.by_path = {}       # file path -> rollFile
+        self.refresh()
+
+    # (Re)scans the roll folder
+    def refresh(self):
+        self.entries = {}
+        self.subdirs = {}
+        self.by_path = {}
+        self._scan(self.directory, '', 0)
+        db.d(self.dbIdx, f'Indexed {len(self.by_path)} files', self.directory)
+
+    def _scan(self, path, folder, depth):
+        files = []
+        dirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            dirs.append(entry.name)
+                        elif entry.is_file():
+                            f = rollFile(entry, folder)
+                            files.append(f)
+                            self.by_path[f.path] = f
+                    except OSError:
+                        continue
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return False
+        self.entries[path] = files
+        self.subdirs[path] = dirs
+
+        if depth < MAX_DEPTH:
+            for name in dirs:
+                self._scan(os.path.join(path, name), folder or name, depth + 1)
+        return True
+
+    def _key(self, path):
+        return os.path.normpath(str(path))
+
+    # True if path is a directory inside the index
+    def isdir(self, path):
+        return self._key(path) in self.entries
+
+    # File names + sub-folder names of a directory (like os.listdir), [] if not indexed
+    def listdir(self, path):
+        key = self._key(path)
+        return [f.name for f in self.entries.get(key, [])] + list(self.subdirs.get(key, []))
+
+    # rollFile entries directly in a directory, optionally filtered by extension(s)
+    def files(self, path, exts=None):
+        files = self.entries.get(self._key(path), [])
+        if exts is None:
+            return list(files)
+        if isinstance(exts, str):
+            exts = (exts,)
+        exts = tuple(e.lower() for e in exts)
+        return [f for f in files if f.name.lower().endswith(exts)]
+
+    # Sub-folder names of a directory
+    def dirs(self, path):
+        return list(self.subdirs.get(self._key(path), []))
+
+    # rollFile entries anywhere in the roll, filtered by kind ('jpg', 'raw', 'xmp', 'other') and/or top-level folder
+    def by_kind(self, kind=None, folder=None):
+        return [f for f in self.by_path.values()
+                if (kind is None or f.kind == kind) and (folder is None or f.folder == folder)]
+
+    # rollFile for a path, or None
+    def get(self, path):
+        return self.by_path.get(self._key(path))
+
+    # File size from the index, falling back to os.path.getsize for files outside it
+    def size(self, path):
+        f = self.get(path)
+        if f is not None:
+            return f.size
+        return os.path.getsize(path)
+
+    # (size, mtime_ns, inode) from the index, falling back to os.stat for files outside it. None if the file is gone
+    def stat_key(self, path):
+        f = self.get(path)
+        if f is not None:
+            return (f.size, f.mtime_ns, f.inode)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns, st.st_ino)
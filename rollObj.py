@@ -1,9 +1,5 @@
-import numpy as np
-import pandas as pd
 import sys
 import os
-from PIL import Image
-from PIL.ExifTags import TAGS
 import re
 import glob
 from datetime import datetime
@@ -15,9 +11,11 @@ import shutil
 import subprocess
 from typing import Iterable, Union
 from exposureObj import exposureObj
+from exifReader import read_exif, extract_preview
+from rollFileIndex import RollFileIndex, JPG_EXTS, RAW_EXTS
+from rawMatcher import RawMatcher, raw_key, raw_stem
 from collections import Counter
 from debuggerTool import debuggerTool
-from renderTool import FORMATS
 from time import time
 
 DEBUG = 0
@@ -25,8 +23,27 @@ WARNING = 1
 ERROR = 1
 db = debuggerTool(DEBUG, WARNING, ERROR) 
 
+CACHE_FLUSH = 64     # streamed exif records written to the exif cache per batch
+
 
 class rollObj:
+    # Fixed slots instead of a per-instance __dict__, like exposureObj: every attribute has to be listed here
+    __slots__ = (
+        'collection',
+        # File handling
+        'directory', 'name', 'newName', 'jpgDirs', 'rawDirs', 'files', 'raws', 'rawMissing', 'images', 'images_all',
+        'unmatched_raws', 'isNewCollection', 'isRawOnly', 'isDirty', 'exif',
+        # File data
+        'sizeAll', 'sizeJpg', 'sizeRaw', 'sizeExposures', 'sizeCopies', 'countAll', 'countJpg', 'countRaw',
+        'countExposures', 'countCopies',
+        # Film stock
+        'manufacturer', 'stock', 'boxspeed', 'stk', 'process', 'isColor', 'isBlackAndWhite', 'isInfrared',
+        'isNegative', 'isSlide', 'isTrichrome', 'fontPath', 'fontColor',
+        # Roll
+        'startDate', 'endDate', 'duration', 'index', 'index_str', 'dbIdx', 'title', 'containsCopies', 'cameras',
+        'cam', 'lenses', 'locations', 'exposures', 'filmtype', 'filmformat',
+    )
+
     def __init__(self, directory, collection):
         self.collection = collection  # Collection object reference
 
@@ -36,11 +53,15 @@ class rollObj:
         self.newName = None                         # cleaned name after processing, used for renaming files 
         self.jpgDirs = None                         # sPath to folder with jpg files
         self.rawDirs = None                         # Path to folder with raw files
+        self.files = None                           # RollFileIndex: one scandir pass over the roll folder, built in process_directory
+        self.raws = None                            # RawMatcher over rawDirs (name/stem/core/suffix maps), built in process_directory
         self.rawMissing = None                      # Flag for whether raw files could be found
         self.images = None                          # List of ExposureMetadata objects, derived
         self.images_all = []                        # List of all ExposureMetadata objects including copies, derived
         self.unmatched_raws = None                 # List of unmatched raw files after verification, derived
         self.isNewCollection = False                  # if searching using new collection formatting
+        self.isRawOnly = False                      # No JPG exports yet: exposures are built from the RAW scans (embedded previews)
+        self.isDirty = False                        # Files changed since import (set by watchTool, cleared by re-import)
         self.exif = None                           # Roll-level exif data, imported
 
         # File data TODO
@@ -84,10 +105,22 @@ class rollObj:
         self.cameras = []                         # List of cameras used in the roll, derived
         self.cam = None
         self.lenses = None                          # List of lenses used in the roll, derived
+        self.locations = None                       # Most common locations of the roll, derived (update_locations)
         self.exposures = None                       # List of addresses to exposures in the roll, derived
         self.filmtype = None                      # Film format, derived from stock info. eg 135, 120, 45, 810
         self.filmformat = None                      # Exposure format, eg 135, 6x7, 6x6, half frame, xpan
 
+    # Pickled without the collection (its exiftool pool and sqlite connections can't cross processes);
+    # the importing collection re-attaches itself, see parallelImport.py
+    def __getstate__(self):
+        state = {name: getattr(self, name) for name in self.__slots__ if hasattr(self, name)}
+        state['collection'] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     # Runs preprocessing until exif is required
     def preprocess_roll(self):
         if not self.process_directory(): return None # get data from folder names
@@ -99,13 +132,22 @@ class rollObj:
         if self.images is None or len(self.images) == 0:
             self.images = []
             return
-        self.process_exif()
-        self.update_metadata() # update film emulsion info for roll and other metadata
-        self.process_copies() # check for copies and nest them in the master copy object
-        self.update_file_metadata()
-        self.generate_title()
-        self.update_name()
-        self.verify_roll()
+        stages = (
+            ('exif', self.process_exif),
+            ('metadata', self.update_metadata), # update film emulsion info for roll and other metadata
+            ('copies', self.process_copies), # check for copies and nest them in the master copy object
+            ('file_metadata', self.update_file_metadata),
+            ('title', self.generate_title),
+            ('name', self.update_name),
+            ('verify', self.verify_roll),
+        )
+        # Stages whose inputs are unchanged since this folder was last imported are replayed (see stageMemo.py)
+        memo = getattr(self.collection, 'stage_memo', None)
+        if memo is not None:
+            memo.run(self, stages)
+            return
+        for _, stage in stages:
+            stage()
 
     # 2) Identify filepaths & gather directory data
         # Search through all jpg files and get their filepaths.
@@ -120,8 +162,9 @@ class rollObj:
         self.index_str = str(self.index).zfill(3)
         self.dbIdx = f'[{self.index_str}]'
 
-
+        self.files = RollFileIndex(dir)
         self.find_image_dirs()
+        self.raws = RawMatcher(self.files, self.rawDirs)
 
 
         # Print warnings if no jpg/raw files found
@@ -130,10 +173,10 @@ class rollObj:
         if jpgDirs == []:
             if rawDirs == []:
                 db.e(self.dbIdx, 'RAW+JPG missing!')
-            else:
-                db.e(self.dbIdx, 'JPG missing, but RAW exists!')
-            self.images = []
-            return None
+                self.images = []
+                return None
+            db.w(self.dbIdx, 'JPG missing, indexing RAW files directly')
+            self.isRawOnly = True
         elif rawDirs == []:
             db.w(self.dbIdx, 'RAW missing, but JPG exists!')
             self.rawMissing = True
@@ -180,7 +223,7 @@ class rollObj:
         new_jpgDir = os.path.join(dir, '02_exports')
         new_copyDir = os.path.join(dir, '04_edits')
         new_rawDir_backups = os.path.join(dir, '05_other','01_unmatched_raws')
-        if not os.path.isdir(new_jpgDir): # return if identified as old legacy folder structure
+        if not self.files.isdir(new_jpgDir): # return if identified as old legacy folder structure
             self.find_image_dirs_legacy()
             return
         
@@ -192,27 +235,17 @@ class rollObj:
         jpgDirs.append(new_jpgDir)
 
         # Check in 01_scans
-        if os.path.isdir(new_rawDir):
-            contains_files = 0
-            for file in os.listdir(new_rawDir):
-                if file.lower().endswith(('.arw', '.dng', '.tif', '.tiff')):
-                    contains_files = 1
-            if contains_files:
-                self.rawMissing = False
-                rawDirs.append(new_rawDir)
+        if self.files.files(new_rawDir, RAW_EXTS):
+            self.rawMissing = False
+            rawDirs.append(new_rawDir)
         
         # Check in 05_other/01_unmatched_raws
-        if os.path.isdir(new_rawDir_backups):
-            contains_files = 0
-            for file in os.listdir(new_rawDir_backups):
-                if file.lower().endswith(('.arw', '.dng', '.tif', '.tiff')):
-                    contains_files = 1
-            if contains_files:
-                self.rawMissing = False
-                rawDirs.append(new_rawDir_backups)
+        if self.files.files(new_rawDir_backups, RAW_EXTS):
+            self.rawMissing = False
+            rawDirs.append(new_rawDir_backups)
 
         # Check copies
-        if os.path.isdir(new_copyDir):
+        if self.files.isdir(new_copyDir):
             jpgDirs.append(new_copyDir)
 
         self.jpgDirs = jpgDirs
@@ -223,61 +256,30 @@ class rollObj:
         jpgDirs = []
         rawDirs = []
         dir = self.directory
-        # Search main directory
-        for file in os.listdir(dir):
-            path = os.path.join(dir, file)
-            # Skip if a file
-            if os.path.isfile(path): continue
-
-            # Check main directory for jpg or raw files
-            for file in os.listdir(dir):
-                if file.lower().endswith('.jpg') or file.lower().endswith('.png'):
-                    if dir not in jpgDirs:
-                        jpgDirs.append(dir)
-                    break
-            for file in os.listdir(dir):
-                if file.lower().endswith(('.arw', '.dng', '.tif', '.tiff')):
-                    if dir not in rawDirs:
-                        rawDirs.append(dir)
-                    break
+        subdirs = self.files.dirs(dir)
+
+        # Search main directory (only checked when the roll has sub-folders)
+        if subdirs:
+            if self.files.files(dir, ('.jpg', '.png')):
+                jpgDirs.append(dir)
+            if self.files.files(dir, RAW_EXTS):
+                rawDirs.append(dir)
         
         # Search subdirs (only one tier)
-        for file in os.listdir(dir):
-            path = os.path.join(dir, file)
-            # Skip if a file
-            if os.path.isfile(path): continue
-
-            # search through subdirs
-            for file in os.listdir(path):
-                # Warn if contains subsubdirs
-                conditions_ignore = (
-                    file == "Scene" or
-                    file == "Camera"
-                )
-                if conditions_ignore: continue
-                if os.path.isdir(os.path.join(path,file)):
-                    db.w(self.dbIdx, 'Additional subfolder found in image directory!', f'"{file}" in {path}')
+        for folder in subdirs:
+            path = os.path.join(dir, folder)
 
-                conditions = (
-                    file.lower().endswith('.jpg') or
-                    file.lower().endswith('.png')
-                )
-                conditions_ignore = (
-                    file == "Scene" or
-                    file == "Camera"
-                )
-                # print("[",index,'] ', conditions, conditions_ignore)
-                if conditions:
-                    if conditions_ignore:
-                        continue
-                    if path not in jpgDirs:
-                        jpgDirs.append(path)
-                    break
-            for file in os.listdir(path):
-                if file.lower().endswith(('.arw', '.dng', '.tif', '.tiff')):
-                    if path not in rawDirs:
-                        rawDirs.append(path)
-                    break
+            # Warn if contains subsubdirs
+            for file in self.files.dirs(path):
+                if file == "Scene" or file == "Camera": continue
+                db.w(self.dbIdx, 'Additional subfolder found in image directory!', f'"{file}" in {path}')
+
+            if self.files.files(path, ('.jpg', '.png')):
+                if path not in jpgDirs:
+                    jpgDirs.append(path)
+            if self.files.files(path, RAW_EXTS):
+                if path not in rawDirs:
+                    rawDirs.append(path)
 
         self.jpgDirs = jpgDirs
         self.rawDirs = rawDirs
@@ -286,7 +288,11 @@ class rollObj:
     # Only process files that are explicitly valid (e.g. skip '5mb' folders or misnamed files)
     def process_images(self):
         images = []
-        
+
+        if self.isRawOnly:
+            self.process_raw_images()
+            return
+
         if not self.jpgDirs:
             return
 
@@ -310,178 +316,191 @@ class rollObj:
 
         # Process valid image files
         for dir_path in self.jpgDirs:
-            for file in os.listdir(dir_path):
-                if file.lower().endswith(('.jpg', '.jpeg', '.png')) and not file.startswith('._'):
-                    file_path = os.path.join(dir_path, file)
-                    image = exposureObj(self, file_path)
+            for file in self.files.files(dir_path, JPG_EXTS):
+                if not file.name.startswith('._'):
+                    image = exposureObj(self, file.path)
                     images.append(image)
 
 
+        # Freshly scanned roll (02_exports still empty): fall back to the RAW scans
+        if not images and self.rawDirs and self.rawDirs[0] != -1:
+            db.w(self.dbIdx, 'No JPG exports found, indexing RAW files directly')
+            self.isRawOnly = True
+            self.process_raw_images()
+            return
+
         # Update image list attribute
         self.images = images
         self.reindex_images()
 
+    # 3b) RAW-only rolls: one exposure per RAW in the main raw dir (01_scans). Each RAW's embedded JPEG preview is
+    # extracted to 05_other/02_previews (re-extracted only when the RAW is newer) and used as the image source for
+    # rendering and previews, so no demosaicing or Lightroom export is needed.
+    def process_raw_images(self):
+        images = []
+        rawDir = self.rawDirs[0]
+        previewDir = os.path.join(self.directory, '05_other', '02_previews')
+
+        for entry in sorted(self.files.files(rawDir, RAW_EXTS), key=lambda f: f.name):
+            file = entry.name
+            if file.startswith('._'):
+                continue
+            file_path = entry.path
+            image = exposureObj(self, file_path)
+
+            preview_path = os.path.join(previewDir, os.path.splitext(file)[0] + '.jpg')
+            try:
+                fresh = os.path.getmtime(preview_path) >= os.path.getmtime(file_path)
+            except OSError:
+                fresh = False
+            if fresh or extract_preview(file_path, preview_path):
+                image.previewFilePath = preview_path
+            elif not file.lower().endswith(('.tif', '.tiff')):
+                db.w(self.dbIdx, 'No embedded preview found in RAW', file)
+
+            images.append(image)
+
+        db.d(self.dbIdx, 'Indexed RAW-only roll', len(images))
+        self.images = images
+        self.reindex_images()
+
     # 4) Bulk process EXIF data for all images. Overflow to process a single exif if requested
         # exif process approach:
-        # - build filepath list. check each file if exif already processed.
-        # - then fetch exif data. returns a data vector, with each data[i] being the correspnding exif data that needs to be passed back to the image obj
-        # - cast each exif to the correct object (image.exif = data[i])
+        # - build filepath list. check each file against the collection's exif cache (path + size/mtime/inode).
+        # - seed anything missing from the roll's exported exif json, then fetch the rest. records are streamed: each exif is
+        #   handed to its image obj as soon as it has been read, while exiftool is still working through the rest of the batch
+        # - cast each exif to the correct object (image.exif = exif)
         # - call image.update_from_exif() to update image attributes
     def process_exif(self, image=None):
-        # If a single image obj was passed, process it
-        if image is not None or len(self.images) == 1:
-            if image.exif:
-                return # skip if processed
-            path = list(image.filePath)
-            db.d(f'[{self.index_str}]','Fetching EXIF...')
-            data = self.fetch_exif(path)
-            exif = data[0]
-
+        images = [image] if image is not None else self.images
+        pathsToFetch = {}
+        for img in images:
+            if not img.exif:
+                pathsToFetch[img.filePath] = img
+        if not pathsToFetch:
+            return # skip if processed
+
+        # Stream exif and cast it back to objects as it arrives
+        pathList = list(pathsToFetch.keys())
+        t1 = time()
+        count = 0
+        for exif in self.iter_exif(pathList):
+            count += 1
+            # Check exif valid
             if exif is None:
                 db.e(f'[{self.index_str}]', 'EXIF FETCH FAILED')
-                return
-            if 'Negative Lab Pro' not in exif.get('IFD0').get('Software'):
-                db.e(f'[{self.index_str}]', 'EXIF FETCH FAILED', 'Metadata doesnt contain NLP info')
-                return
-            image.set_exif(exif)
-
-            
-        # Else, handle all files in buffer
-        else:
-            pathsToFetch = {}
+                continue
+            if not self.isRawOnly and 'Negative Lab Pro' not in str(exif.get('IFD0', {}).get('Software', '')):
+                db.e(f'[{self.index_str}]', 'EXIF FETCH FAILED', 'Metadata does not contain NLP info')
+            exif_path = exif.get("SourceFile")
 
-            for img in self.images:
-                if not img.exif:
-                    pathsToFetch[img.filePath] = img
-
-            # Batch fetch exif
-            pathList = list(pathsToFetch.keys())
-            # db.d(self.dbIdx, f'Fetching EXIF...')
-            t1 = time()
-
-            # check if exif path exists, then fetch json if so
-            exif_path = os.path.join(self.directory, '05_other/01_exif/exif_072.json')
-            if os.path.isfile(exif_path):
-                data = self.fetch_exif_json(exif_path)
-                # replace all 'SourceFile' with img.filePath
-                for newImg in self.images:
-                    newPath = newImg.filePath
-                    newName = os.path.basename(newPath).split('.jpg')[0]
-
-                    if newName not in data:
-                        continue
+            if exif_path not in pathsToFetch:
+                db.e(self.dbIdx, "Exif path does not match any image in batch!", f'{exif_path}')
+                continue
 
-                    exif = data[newName]
+            img = pathsToFetch[exif_path]
 
-                    # make a copy so we don’t mutate cached data
-                    exif = dict(exif)
+            # pass exif to image
+            img.set_exif(exif)
+        t2 = time()
+        dt = t2 - t1
+        db.d(self.dbIdx, f'Processed EXIF in {dt:.2f}s', f'{dt/len(pathList)*1000:.0f}ms per img')
 
-                    # update SourceFile to current correct path
-                    data[newName]['SourceFile'] = newPath
+        if count == 0:
+            db.e(self.dbIdx, 'Failed to fetch exif!')
 
-                # flatten data
-                data_list = []
+    # Returns exif for pathList as a list (see iter_exif), or None if nothing could be read
+    def load_exif(self, pathList):
+        data = list(self.iter_exif(pathList))
+        return data if data else None
 
-                for exif in data.values():
-                    if isinstance(exif, dict):
-                        data_list.append(exif)
+    # Yields exif for pathList: fresh entries from the collection's exif cache, then entries seeded from the roll's exported
+    # exif json, then a native/exiftool fetch for whatever is left. Everything not already cached is written back to the cache
+    # in batches of CACHE_FLUSH as it streams past, so a large roll never holds the whole fetch in memory.
+    # Entries are keyed by the stats taken before the read: a file re-exported mid-fetch is stale on the next import.
+    def iter_exif(self, pathList):
+        cache = self.collection.exif_cache
+        stats = {path: self.files.stat_key(path) for path in pathList}
+        cached, missing = cache.get_many(pathList, stats)
+        yield from cached.values()
+        if not missing:
+            db.d(self.dbIdx, 'EXIF cache hit for all images', len(cached))
+            return
 
-                # optional: deterministic order by SourceFile
-                try:
-                    data_list.sort(key=lambda d: d.get('SourceFile', ''))
-                except Exception:
-                    pass
+        seeded = self.seed_exif_from_json(missing)
+        if seeded:
+            cache.put_many(seeded, stats)
+            yield from seeded
+            seeded_paths = {exif['SourceFile'] for exif in seeded}
+            missing = [p for p in missing if p not in seeded_paths]
 
-                data = data_list
-                    
-            else:
-                data = self.fetch_exif(pathList)
+        if missing:
+            db.d(self.dbIdx, 'Fetching EXIF...', f'{len(missing)} missing/stale, {len(cached)} cached')
+            pending = []
+            try:
+                for exif in self.iter_fetch_exif(missing):
+                    pending.append(exif)
+                    if len(pending) >= CACHE_FLUSH:
+                        cache.put_many(pending, stats)
+                        pending = []
+                    yield exif
+            finally:
+                cache.put_many(pending, stats)
+
+    # Looks up missing paths in the roll's exported exif json (05_other/01_exif/exif_XXX.json, keyed by file name stem).
+    # Only used when the json is newer than the image, so a re-export after the json was written is fetched fresh instead.
+    def seed_exif_from_json(self, pathList):
+        exif_dir = os.path.join(self.directory, '05_other', '01_exif')
+        data = self.fetch_exif_json(exif_dir)
+        if not isinstance(data, dict):
+            return []
 
-            t2 = time()
-            dt = t2 - t1
-            db.d(self.dbIdx, f'Fetched in EXIF {dt:.2f}s', f'{dt/len(pathList)*1000:.0f}ms per img')
+        json_path = os.path.join(exif_dir, f'exif_{self.index_str}.json')
+        json_mtime = os.path.getmtime(json_path)
 
-            if data is None:
-                db.e(self.dbIdx, 'Failed to fetch exif!')
-            
-            # Cast exif back to objects
-            for exif in data:
-                # Check exif valid
-                if exif is None:
-                    db.e(f'[{self.index_str}]', 'EXIF FETCH FAILED')
-                if 'Negative Lab Pro' not in exif.get('IFD0', {}).get('Software', ''):
-                    db.e(f'[{self.index_str}]', 'EXIF FETCH FAILED', 'Metadata does not contain NLP info')
-                exif_path = exif.get("SourceFile")
-
-                if exif_path not in pathsToFetch:
-                    db.e(self.dbIdx, "Exif path does not match any image in batch!", f'{exif_path}')
+        seeded = []
+        for path in pathList:
+            name = os.path.splitext(os.path.basename(path))[0]
+            exif = data.get(name)
+            if not isinstance(exif, dict):
+                continue
+            try:
+                if os.path.getmtime(path) > json_mtime:
                     continue
+            except OSError:
+                continue
 
-                img = pathsToFetch[exif_path]
+            # make a copy so we don't mutate the loaded json, and update SourceFile to current correct path
+            exif = dict(exif)
+            exif['SourceFile'] = path
+            seeded.append(exif)
 
-                # hard assert
-                if exif_path != img.filePath:
-                    db.e(self.dbIdx, "Exif path does not match any image in batch!", f'Image:\t{img.filePath}\nExif:\t{exif_path}')
-                    continue
+        if seeded:
+            db.d(self.dbIdx, 'Seeded EXIF from exported json', len(seeded))
+        return seeded
 
-                # pass exif to image
-                img.set_exif(exif)
-
-    # generate exiftool command and run it. returns list of data[i] with each item being exif data for that path
+    # fetch exif for each path: JPGs are read natively from their metadata segments (exifReader), anything that fails to parse
+    # falls back to the collection's shared exiftool pool. returns list of data[i] with each item being exif data for that path
     def fetch_exif(self, pathList):
-
-        # check if fetch exists
-
-        if not shutil.which("exiftool"):
-            db.e(self.dbIdx, 'Failed to open exiftool!')
-            return None
-
         if not pathList:
             return []
+        data = list(self.iter_fetch_exif(pathList))
+        return data if data else None
 
-        tags = [
-            "-SourceFile",
-            "-XMP-xmpMM:PreservedFileName",
-            "-IPTC:City",
-            "-IPTC:Province-State",
-            "-IPTC:Country-PrimaryLocationName",
-            "-XMP-iptcCore:Scene",
-            "-XMP-iptcCore:IntellectualGenre",
-            "-XMP-xmp:Rating",
-            "-ExifIFD:ISO",
-            "-ExifIFD:FNumber",
-            "-ExifIFD:ShutterSpeedValue",
-            "-ExifIFD:ExposureTime",
-            "-ExifIFD:DateTimeOriginal",
-            "-ExifIFD:CreateDate",
-            "-IFD0:Software",
-            "-IFD0:Make",
-            "-IFD0:Model",
-            "-ExifIFD:LensMake",
-            "-ExifIFD:LensModel",
-            "-ExifIFD:FocalLength",
-            "-File:ImageWidth",
-            "-File:ImageHeight",
-            "-XMP-crs:ConvertToGrayscale",
-            "-XMP-aux:IsMergedPanorama",
-        ]
-
-        cmd = ["exiftool", "-j", "-g1", "-stay_open"]
-        cmd += ["-fast2"]
-        cmd += tags
-        cmd += pathList
-        
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=False
-        )
-
-        data = json.loads(result.stdout or "[]")
+    # Streaming variant of fetch_exif: native reads are yielded one by one, and the exiftool fallback is read record by record
+    # as each worker emits it (exifTool.fetch_iter) instead of waiting for the whole -j array.
+    def iter_fetch_exif(self, pathList):
+        fallback = []
+        for path in pathList:
+            exif = read_exif(path)
+            if exif is None:
+                fallback.append(path)
+            else:
+                yield exif
 
-        return data if data else None
+        if fallback:
+            db.d(self.dbIdx, 'Native EXIF read failed, falling back to exiftool', len(fallback))
+            yield from self.collection.exiftool.fetch_iter(fallback)
     
     def fetch_exif_json(self, path):
         # path can be file or directory
@@ -539,7 +558,8 @@ class rollObj:
         dupes = 0
 
         for img in self.images_all:
-            exif = getattr(img, 'exif', None)
+            # images only keep a compact exifRecord -- the full dict comes back from the exif cache
+            exif = img.get_exif_dict()
             if not exif:
                 continue
 
@@ -796,22 +816,22 @@ class rollObj:
         key = img.stk
         stkFound = False
 
-        # Identify stock in stock list using first image STK
-        for stock in self.collection.stocklist.values():
-            if stock['KEY_ID'] == key:
-                self.manufacturer = stock['manufacturer']
-                self.stock = stock['stock']
-                self.boxspeed = stock['boxspeed']
-                self.stk = stock['stk']
-                self.process = stock['process']
-                self.isColor = stock['isColor']
-                self.isBlackAndWhite = stock['isBlackAndWhite']
-                self.isInfrared = stock['isInfrared']
-                self.isNegative = stock['isNegative']
-                self.isSlide = stock['isSlide']
-                self.fontPath = stock['font'] # 'fonts/Impact Label Reversed.ttf'
-                self.fontColor = tuple(map(int, stock['color'].split(','))) # '252, 194, 180, 255' --> tuple(rgba)
-                stkFound = True
+        # Identify stock in stock list (keyed by KEY_ID) using first image STK
+        stock = self.collection.stocklist.get(key)
+        if stock is not None:
+            self.manufacturer = stock['manufacturer']
+            self.stock = stock['stock']
+            self.boxspeed = stock['boxspeed']
+            self.stk = stock['stk']
+            self.process = stock['process']
+            self.isColor = stock['isColor']
+            self.isBlackAndWhite = stock['isBlackAndWhite']
+            self.isInfrared = stock['isInfrared']
+            self.isNegative = stock['isNegative']
+            self.isSlide = stock['isSlide']
+            self.fontPath = stock['font'] # 'fonts/Impact Label Reversed.ttf'
+            self.fontColor = tuple(map(int, stock['color'].split(','))) # '252, 194, 180, 255' --> tuple(rgba)
+            stkFound = True
 
         if not stkFound:
             db.w(self.dbIdx, f"stk not found in stocklist, using placeholder:", f'"{key}" --> "STK"')
@@ -860,17 +880,15 @@ class rollObj:
         self.countJpg = 0
         if self.jpgDirs:
             for dir in self.jpgDirs:
-                for file in os.listdir(dir):
-                    if file.lower().endswith(('.jpg', '.jpeg', '.png')):
-                        file_path = os.path.join(dir, file)
-                        self.sizeJpg += os.path.getsize(file_path)
-                        self.countJpg += 1
+                for file in self.files.files(dir, JPG_EXTS):
+                    self.sizeJpg += file.size
+                    self.countJpg += 1
         self.sizeRaw = 0
         self.countRaw = 0
         for img in self.images_all:
             self.countRaw += 1
             if img.rawFilePath:
-                self.sizeRaw += os.path.getsize(img.rawFilePath)
+                self.sizeRaw += self.files.size(img.rawFilePath)
         # if self.rawDirs and self.rawDirs[0] != -1:
         #     for dir in self.rawDirs:
         #         for file in os.listdir(dir):
@@ -931,30 +949,27 @@ class rollObj:
 
             camfound = False
 
-            for cam in self.collection.cameralist.values():
-                cbrand = (cam.get("brand") or "").strip().lower()
-                cmodel = (cam.get("model") or "").strip().lower()
+            # Normalized (brand, model) index of the cameralist (first matching row wins, as the old scan did)
+            cam = self.collection.cameras_by_brand_model.get((brand, model))
+            if cam is not None:
+                filmtype = cam.get("filmtype")
+                filmformat = cam.get("filmformat")
+                cam_id = cam.get("id")
 
-                if brand == cbrand and model == cmodel:
-                    filmtype = cam.get("filmtype")
-                    filmformat = cam.get("filmformat")
-                    cam_id = cam.get("id")
+                # Apply only to matching images
+                camera_key = str(f'{brand_raw} {model_raw}')
+                for img in self.images_all:
+                    if (img.cameraBrand is not None and img.cameraModel is not None) and (img.camera == camera_key):
+                        img.filmtype = filmtype
+                        img.filmformat = filmformat
+                        img.cam = cam_id
 
-                    # Apply only to matching images
-                    camera_key = str(f'{brand_raw} {model_raw}')
-                    for img in self.images_all:
-                        if (img.cameraBrand is not None and img.cameraModel is not None) and (img.camera == camera_key):
-                            img.filmtype = filmtype
-                            img.filmformat = filmformat
-                            img.cam = cam_id
+                # Store roll-level fields (if you want last match to win)
+                self.filmtype = filmtype
+                self.filmformat = filmformat
+                self.cam = cam_id
 
-                    # Store roll-level fields (if you want last match to win)
-                    self.filmtype = filmtype
-                    self.filmformat = filmformat
-                    self.cam = cam_id
-
-                    camfound = True
-                    break  # stop searching cameralist for this pair
+                camfound = True
 
             if not camfound:
                 db.e(self.dbIdx, "Cam not in cameralist:", f"({brand_raw}, {model_raw})")
@@ -965,6 +980,7 @@ class rollObj:
         # (FORMATS[None] KeyError). Resolve it once per roll instead.
         unresolved = [img for img in self.images_all if img.cam is None or img.filmformat is None]
         if unresolved:
+            from renderTool import FORMATS      # renderTool pulls in PIL, so only import it for unresolved rolls
             fallback_format = self.resolve_filmformat_interactively()
             fallback_filmtype = FORMATS.get(fallback_format, {}).get('filmformat')
 
@@ -986,6 +1002,7 @@ class rollObj:
     # renderer never crashes on FORMATS[None]. Falls back to '135' automatically when not
     # running interactively (eg. batch/headless imports via main.py's import_rolls('all')).
     def resolve_filmformat_interactively(self):
+        from renderTool import FORMATS
         choices = [k for k in FORMATS.keys() if k != 'custom']
 
         if not sys.stdin.isatty():
@@ -1050,7 +1067,9 @@ class rollObj:
     def dir_contains(self, dir, key):
         try:
             # Iterate through files in directory. Return true if key found, return false if no matches in dir.
-            for file in os.listdir(dir):
+            if not self.files.isdir(dir):
+                raise FileNotFoundError(dir)
+            for file in self.files.listdir(dir):
                 if file.lower().endswith(key.lower()):
                     return True
             if WARNING:
@@ -1097,82 +1116,35 @@ class rollObj:
 
 
     def check_for_dupe_raw(self):
-        for rawDir in self.rawDirs:
-            if rawDir == -1:
-                continue
-            raw_files = os.listdir(rawDir)
-            raw_names = [os.path.splitext(f)[0].split('-')[0] for f in raw_files]
-            raw_name_counts = Counter(raw_names)
-            for name, count in raw_name_counts.items():
-                if count > 1:
-                    db.e(f'[{self.index_str}]', f'Multiple RAW files under {name}')
+        for name in self.raws.ambiguous():
+            db.e(f'[{self.index_str}]', f'Multiple RAW files under {name}')
 
 
 
 
     # check all img and copies match to a raw file, flag any that are duplicates or missing
     def verify_raw_files(self):
-        def normalize_raw_key(filename):
-            stem = os.path.splitext(os.path.basename(filename))[0]
-
-            if stem.endswith('-Pano'):
-                stem = stem[:-5]
-            elif stem.endswith('-HDR'):
-                stem = stem[:-4]
-            elif stem.endswith('-positive'):
-                stem = stem.split('-')[0]
-
-            return stem
-
         if self.rawMissing:
             return
-        # Build set of raw filenames (without extensions)
-        raw_filenames = set()
-        if self.rawDirs and self.rawDirs[0] != -1:
-            for rawDir in self.rawDirs:
-                for file in os.listdir(rawDir):
-                    if file.lower().endswith(('.arw', '.dng', '.tif', '.tiff')):
-                        raw_filenames.add(file)
+        raws = self.raws
 
-        # Walk through all images and copies and ensure raw file exists. If exists, remove from set. Print remaining unmatched raws at end.
-        unmatched_raws = set()
-        for filename in raw_filenames:
-            unmatched_raws.add(normalize_raw_key(filename))
+        # Normalized RAW keys (-Pano/-HDR/-positive stripped) not yet claimed by an image or copy.
+        # Print remaining unmatched raws at end.
+        unmatched_raws = set(raws.by_key)
 
 
-        # Hardcode fix for raw file matching roll 9 (pano naming + path casting)
+        # Hardcode fix for raw file matching roll 9 (pano naming + path casting): an image or copy whose RAW
+        # name didn't resolve (eg. DSC01694.ARW with two DSC01694-Pano merges on disk) takes its pano merge
         if self.index == 9:
-            cleaned_unmatched_raws = set()
-
-            for file in unmatched_raws:
-                stem, ext = os.path.splitext(file)
-
-                # normalize pano-derived raws to the base .ARW name for matching logic
-                if "-Pano" in stem:
-                    while stem.endswith("-Pano"):
-                        stem = stem[:-5]
-                    match_name = stem + ".ARW"
-                    cleaned_unmatched_raws.add(match_name)
-                else:
-                    match_name = file
-                    cleaned_unmatched_raws.add(match_name)
-
-                # cast rawFilePath for any image/copy that claims this match_name
-                for img in self.images:
-                    if img.rawFileName == match_name:
-                        for rawDir in self.rawDirs:
-                            candidate = os.path.join(rawDir, file)  # real on-disk file (e.g. *-Pano.dng or pano x.tif)
-                            if os.path.exists(candidate):
-                                img.rawFilePath = candidate
-                                break
-
-                    for copy in img.copies:
-                        if copy.rawFileName == match_name:
-                            for rawDir in self.rawDirs:
-                                candidate = os.path.join(rawDir, file)
-                                if os.path.exists(candidate):
-                                    copy.rawFilePath = candidate
-                                    break
+            for img in self.images:
+                for exposure in [img] + img.copies:
+                    if exposure.rawFilePath is not None or not exposure.rawFileName:
+                        continue
+                    # real on-disk file: DSC01694-Pano.dng, else the first other merge (DSC01694-Pano-2.dng)
+                    matches = raws.stem_matches(raw_stem(exposure.rawFileName) + '-Pano')
+                    raw = matches[0] if matches else raws.pano_for(exposure.rawFileName)
+                    if raw is not None:
+                        exposure.rawFilePath = raw.path
 
 
         for img in self.images:
@@ -1187,41 +1159,30 @@ class rollObj:
 
             for copy in img.copies:
                 copy_rawName = copy.rawFileName
-                if copy_rawName in unmatched_raws:
-                    unmatched_raws.discard(copy_rawName)
+                if copy.isPano and copy.isStitched:
+
+                    # find corresponding pano raw file: eg match DSC01694.ARW <--> DSC01694-pano.dng
+                    pano_raw = raws.pano_for(copy_rawName)
+                    new_raw_name = 'N/A'
+                    if pano_raw is not None:
+                        new_raw_name = pano_raw.name
+                        copy.rawFileName = new_raw_name
+                        if copy.rawFilePath:
+                            copy.rawFilePath = copy.rawFilePath.replace(copy_rawName, new_raw_name)
+                        unmatched_raws.discard(raw_key(new_raw_name))
+                        db.d(f'[{self.index_str}][{img.index_str}]', f'Adjusted panorama RAW filename:', [f'{copy.name} --> {copy_rawName} --> {new_raw_name}', copy.rawFilePath])
+                    else:
+                        db.e(f'[{self.index_str}][{img.index_str}]', f'No matching RAW file for panorama:', f'{copy.name} --> {copy_rawName} ({copy.original.mpx:.0f},{copy.mpx:.0f})MP at ({copy.original.aspectRatio:.2f},{copy.aspectRatio:.2f}):1 --> copy.isStitched={copy.isStitched}')
                 else:
-                    if copy.isPano and copy.isStitched:
-
-                        # find corresponding pano raw file: eg match DSC01694.ARW <--> DSC01694-pano.dng
-                        base_name = os.path.splitext(copy_rawName)[0]+'-Pano'
-                        pano_raw_candidates = [f for f in raw_filenames if f.startswith(base_name) and '-Pano' in os.path.splitext(f)[0]]
-                        new_raw_name = 'N/A'
-                        if pano_raw_candidates:
-                            new_raw_name = pano_raw_candidates[0]
-                            copy.rawFileName = new_raw_name
-                            if copy.rawFilePath:
-                                copy.rawFilePath = copy.rawFilePath.replace(copy_rawName, new_raw_name)
-                            unmatched_raws.discard(new_raw_name)
-                            db.d(f'[{self.index_str}][{img.index_str}]', f'Adjusted panorama RAW filename:', [f'{copy.name} --> {copy_rawName} --> {new_raw_name}', copy.rawFilePath])
-                        else:
-                            db.e(f'[{self.index_str}][{img.index_str}]', f'No matching RAW file for panorama:', f'{copy.name} --> {copy_rawName} ({copy.original.mpx:.0f},{copy.mpx:.0f})MP at ({copy.original.aspectRatio:.2f},{copy.aspectRatio:.2f}):1 --> copy.isStitched={copy.isStitched}')
+                    unmatched_raws.discard(raw_key(copy_rawName))
 
                     
 
 
-        if len(unmatched_raws) > 0:
-            unmatched_files = list(unmatched_raws)
-            # build paths to unmatched raws
-            self.unmatched_raws = []
-            for rawDir in self.rawDirs:
-                for rawFile in unmatched_files:
-                    rawPath = os.path.join(rawDir, rawFile)
-                    if rawFile.startswith('._'):
-                        continue
-                    if os.path.exists(rawPath):
-                        self.unmatched_raws.append(rawPath)
-            if len(self.unmatched_raws) > 0:
-                db.w(f'[{self.index_str}]', f'Unmatched RAW files remaining:', self.unmatched_raws)
+        # build paths to unmatched raws
+        self.unmatched_raws = [f.path for f in raws.unmatched(unmatched_raws)]
+        if len(self.unmatched_raws) > 0:
+            db.w(f'[{self.index_str}]', f'Unmatched RAW files remaining:', self.unmatched_raws)
         
         for img in self.images_all:
             rawFileName_ending = img.rawFileName.split('.')[-1]
@@ -1298,7 +1259,6 @@ class rollObj:
             for img in self.images_all:
                 if img.rawFilePath:
                     img.rawFileName = os.path.basename(img.rawFilePath)
-            unmatched_raws = set(raw_filenames)
 
 
     # Verify attributes on roll and print a summary
@@ -0,0 +1,114 @@
+# rollRegistry.py
+# Registry of a collection's processed rolls, with indexes from camera, stock, lens, year,
+# location and rating onto exposures.
+
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+# field -> value getter for an exposure
+INDEXED = {
+    'cam':      lambda img: img.cam,
+    'stk':      lambda img: img.stk,
+    'lns':      lambda img: img.lns,
+    'year':     lambda img: img.dateExposed.year if img.dateExposed else None,
+    'location': lambda img: img.location,
+    'rating':   lambda img: int(img.rating) if img.rating is not None else None,
+}
+
+
+class rollRegistry:
+    def __init__(self):
+        self.dbIdx = '[C]'
+        self.rolls = {}                                 # roll index -> rollObj
+        self.exposures = {}                             # roll index -> list of indexed exposures
+        self.keys = {}                                  # roll index -> [(exposure, ((field, value), ...)), ...] as indexed
+        self.index = {field: {} for field in INDEXED}   # field -> value -> set of exposures
+
+    def __len__(self):
+        return len(self.rolls)
+
+    def __contains__(self, roll_index):
+        return int(roll_index) in self.rolls
+
+    def get(self, roll_index):
+        return self.rolls.get(int(roll_index))
+
+    # Indexes a processed roll (replacing any roll already registered under its index)
+    def add(self, roll):
+        if roll.index in self.rolls:
+            self.remove(self.rolls[roll.index])
+        images = list(roll.images_all or [])
+        self.rolls[roll.index] = roll
+        self.exposures[roll.index] = images
+        keys = []
+        for img in images:
+            indexed = []
+            for field, getter in INDEXED.items():
+                value = getter(img)
+                if value is not None:
+                    self.index[field].setdefault(value, set()).add(img)
+                    indexed.append((field, value))
+            keys.append((img, tuple(indexed)))
+        self.keys[roll.index] = keys
+        db.d(self.dbIdx, f'Registered roll ({len(images)} exposures)', roll.name)
+
+    def remove(self, roll):
+        if self.rolls.get(roll.index) is not roll:
+            return
+        del self.rolls[roll.index]
+        self.exposures.pop(roll.index, None)
+        # Keys as they were indexed: ratings, dates or locations written since then don't strand the exposure
+        for img, indexed in self.keys.pop(roll.index, []):
+            for field, value in indexed:
+                bucket = self.index[field].get(value)
+                if bucket is not None:
+                    bucket.discard(img)
+                    if not bucket:
+                        del self.index[field][value]
+
+    # Distinct values of an indexed field, eg. values('stk') -> ['E100', 'HP5', ...]
+    def values(self, field):
+        return sorted(self.index[field].keys(), key=str)
+
+    # Exposures matching every given criterion. Each criterion is a value or a list/set/tuple of values
+    # (any of them). min_rating / max_rating select a range of rating buckets.
+    # eg. select(stk='HP5', cam='F3', min_rating=4), select(year=(2023, 2024), location='Zurich')
+    def select(self, min_rating=None, max_rating=None, **criteria):
+        sets = []
+        for field, wanted in criteria.items():
+            if field not in INDEXED:
+                raise KeyError(f'Not an indexed field: {field} (indexed: {", ".join(INDEXED)})')
+            if wanted is None:
+                continue
+            values = wanted if isinstance(wanted, (list, set, tuple, frozenset)) else (wanted,)
+            sets.append(self._union(field, values))
+
+        if min_rating is not None or max_rating is not None:
+            lo = min_rating if min_rating is not None else float('-inf')
+            hi = max_rating if max_rating is not None else float('inf')
+            sets.append(self._union('rating', [r for r in self.index['rating'] if lo <= r <= hi]))
+
+        if not sets:
+            return {img for images in self.exposures.values() for img in images}
+        sets.sort(key=len)
+        result = set(sets[0])
+        for s in sets[1:]:
+            result &= s
+            if not result:
+                break
+        return result
+
+    # Rolls with at least one exposure matching the criteria, sorted by index
+    def select_rolls(self, **criteria):
+        indices = {img.roll.index for img in self.select(**criteria)}
+        return [self.rolls[i] for i in sorted(indices)]
+
+    def _union(self, field, values):
+        buckets = [self.index[field].get(v, ()) for v in values]
+        if len(buckets) == 1:
+            return buckets[0]
+        return set().union(*buckets)
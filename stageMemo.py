@@ -0,0 +1,190 @@
+# stageMemo.py
+# Per-stage memoization of rollObj.process_roll, shared by every roll in a collection.
+
+import os
+import hashlib
+from collections import OrderedDict
+from exposureObj import exposureObj
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+MISSING = object()
+
+
+# Attributes currently set on a rollObj / exposureObj (both use __slots__)
+def attributes(obj):
+    values = {}
+    for name in obj.__slots__:
+        value = getattr(obj, name, MISSING)
+        if value is not MISSING:
+            values[name] = value
+    return values
+
+
+# Stable digest of a tuple of reprs
+def digest(*parts):
+    return hashlib.sha1(repr(parts).encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+# Fingerprint of every file in a roll folder's RollFileIndex
+def files_fingerprint(files):
+    stats = sorted((f.path, f.size, f.mtime_ns, f.inode) for f in files.by_path.values())
+    return digest(files.directory, stats)
+
+
+# Exposure reference inside a recorded change (the exposure's file path at import)
+class ref:
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+
+# Shallow copy of container values, so in-place changes (eg. copies.append) show up in the diff
+def shallow(value):
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, set):
+        return set(value)
+    return None
+
+
+def changed(old, copy, new):
+    if old is MISSING or old is not new:
+        return True
+    if copy is None:
+        return False
+    if isinstance(copy, list):
+        return len(copy) != len(new) or any(a is not b for a, b in zip(copy, new))
+    if isinstance(copy, dict):
+        return copy.keys() != new.keys() or any(copy[k] is not new[k] for k in copy)
+    return copy != new
+
+
+class stageMemo:
+    def __init__(self, max_rolls=256):
+        self.dbIdx = '[M]'
+        self.max_rolls = max_rolls
+        self.rolls = OrderedDict()      # roll directory -> {stage: (fingerprint, change)}
+        self.tables = (None, None)      # (ids of the reference tables, their digest)
+        self.hits = 0
+        self.misses = 0
+
+    # Inputs a stage reads on top of the stage before it
+    def stage_inputs(self, roll, name):
+        collection = roll.collection
+        if name == 'exif':
+            # The exif cache is keyed on each file's (size, mtime_ns, inode), which the files fingerprint covers
+            rules = collection.exif_overrides.rules
+            return repr((rules.get(None, []), rules.get(roll.index, [])))
+        if name == 'metadata':
+            return self.tables_digest(collection)
+        return None
+
+    # Digest of the stock / camera / lens lists, recomputed only when a list is rebuilt
+    def tables_digest(self, collection):
+        ids = (id(collection.stocklist), id(collection.cameralist), id(collection.lenslist))
+        if self.tables[0] != ids:
+            self.tables = (ids, digest(collection.stocklist, collection.cameralist, collection.lenslist))
+        return self.tables[1]
+
+    # Runs stages [(name, fn), ...] of a roll, replaying recorded changes where the fingerprints still match
+    def run(self, roll, stages):
+        directory = os.path.normpath(roll.directory)
+        recorded = self.rolls.get(directory) or {}
+        exposures = {img.filePath: img for img in roll.images}
+        keys = {id(img): key for key, img in exposures.items()}
+
+        entry = {}
+        replayed = []
+        fingerprint = files_fingerprint(roll.files)
+        replaying = bool(recorded)
+        for name, stage in stages:
+            previous = fingerprint
+            fingerprint = digest(previous, name, self.stage_inputs(roll, name))
+            hit = recorded.get(name) if replaying else None
+            if hit is not None and hit[0] == fingerprint:
+                self.apply(roll, exposures, hit[1])
+                entry[name] = hit
+                replayed.append(name)
+                self.hits += 1
+                continue
+
+            replaying = False
+            self.misses += 1
+            before = self.snapshot(roll, exposures)
+            stage()
+            entry[name] = (fingerprint, self.diff(roll, exposures, keys, before))
+
+        self.rolls[directory] = entry
+        self.rolls.move_to_end(directory)
+        while len(self.rolls) > self.max_rolls:
+            self.rolls.popitem(last=False)
+        if replayed:
+            db.d(roll.dbIdx, f'Replayed {len(replayed)}/{len(stages)} stages from memo', replayed)
+
+    def snapshot(self, roll, exposures):
+        def snap(obj):
+            return {k: (v, shallow(v)) for k, v in attributes(obj).items()}
+        return snap(roll), {key: snap(img) for key, img in exposures.items()}
+
+    # Attributes of the roll and its exposures that changed since before, with exposure references encoded
+    def diff(self, roll, exposures, keys, before):
+        def encode(value):
+            if isinstance(value, exposureObj):
+                key = keys.get(id(value))
+                return ref(key) if key is not None else value
+            if isinstance(value, list):
+                return [encode(v) for v in value]
+            if isinstance(value, tuple):
+                return tuple(encode(v) for v in value)
+            if isinstance(value, dict):
+                return {k: encode(v) for k, v in value.items()}
+            if isinstance(value, set):
+                return {encode(v) for v in value}
+            return value
+
+        def changes(obj, old):
+            delta = {}
+            for k, v in attributes(obj).items():
+                value, copy = old.get(k, (MISSING, None))
+                if changed(value, copy, v):
+                    delta[k] = encode(v)
+            return delta
+
+        roll_before, images_before = before
+        images = {}
+        for key, img in exposures.items():
+            delta = changes(img, images_before[key])
+            if delta:
+                images[key] = delta
+        return changes(roll, roll_before), images
+
+    # Applies a recorded change to a roll and its exposures
+    def apply(self, roll, exposures, change):
+        def decode(value):
+            if isinstance(value, ref):
+                return exposures[value.key]
+            if isinstance(value, list):
+                return [decode(v) for v in value]
+            if isinstance(value, tuple):
+                return tuple(decode(v) for v in value)
+            if isinstance(value, dict):
+                return {k: decode(v) for k, v in value.items()}
+            if isinstance(value, set):
+                return {decode(v) for v in value}
+            return value
+
+        roll_change, image_changes = change
+        for k, v in roll_change.items():
+            setattr(roll, k, decode(v))
+        for key, delta in image_changes.items():
+            img = exposures[key]
+            for k, v in delta.items():
+                setattr(img, k, decode(v))
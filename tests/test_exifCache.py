@@ -0,0 +1,47 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from exifCache import exifCache, stat_key
+
+
+class exifCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.cache = exifCache(os.path.join(self.folder, 'exif_cache.sqlite'))
+        self.path = os.path.join(self.folder, 'DSC00001.jpg')
+        self.write(b'first export')
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.folder)
+
+    def write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def test_hit_until_file_changes(self):
+        self.cache.put_many([{'SourceFile': self.path, 'IFD0': {'Make': 'NIKON'}}])
+        hits, misses = self.cache.get_many([self.path])
+        self.assertEqual(hits[self.path]['IFD0'], {'Make': 'NIKON'})
+        self.write(b'second, longer export')
+        hits, misses = self.cache.get_many([self.path])
+        self.assertEqual((hits, misses), ({}, [self.path]))
+
+    def test_reexport_during_read_stays_stale(self):
+        stats = {self.path: stat_key(self.path)}
+        self.assertEqual(self.cache.get_many([self.path], stats), ({}, [self.path]))
+        self.write(b'second, longer export')        # re-exported after the stat, before the read finished
+        self.cache.put_many([{'SourceFile': self.path, 'IFD0': {'Make': 'old'}}], stats)
+        self.assertEqual(self.cache.get_many([self.path])[1], [self.path])
+
+    def test_paths_missing_from_stats_are_skipped(self):
+        self.assertEqual(self.cache.put_many([{'SourceFile': self.path}], {}), 0)
+        self.assertIsNone(self.cache.get(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
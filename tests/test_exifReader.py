@@ -0,0 +1,181 @@
+import os
+import sys
+import shutil
+import struct
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import exifReader
+
+PREVIEW = b'\xff\xd8\xff\xdb' + b'\x00' * 60 + b'\xff\xd9'
+
+
+# Packs one TIFF value; returns (count, bytes)
+def pack_value(endian, typ, value):
+    if typ == 2:
+        data = value.encode('utf-8') + b'\x00'
+        return len(data), data
+    if typ == 3:
+        return len(value), struct.pack(endian + f'{len(value)}H', *value)
+    if typ == 4:
+        return len(value), struct.pack(endian + f'{len(value)}I', *value)
+    if typ == 5:
+        return len(value), struct.pack(endian + f'{2 * len(value)}I', *[x for pair in value for x in pair])
+    raise ValueError(typ)
+
+
+# Builds a TIFF container. ifds is a list of (entries, next index or None); an entry is (tag, type, value),
+# where value may be ('ifd', k) for the offset of ifds[k] or ('blob', k) for the offset of blobs[k].
+def build_tiff(endian, ifds, blobs=()):
+    order = b'II' if endian == '<' else b'MM'
+
+    def data_of(typ, value):
+        if isinstance(value, tuple) and value and value[0] in ('ifd', 'blob'):
+            return 1, b'\x00' * 4
+        return pack_value(endian, typ, value)
+
+    offsets = []
+    offset = 8
+    for entries, _ in ifds:
+        offsets.append(offset)
+        offset += 2 + 12 * len(entries) + 4
+        offset += sum(len(data_of(typ, value)[1]) for _, typ, value in entries if len(data_of(typ, value)[1]) > 4)
+    blob_offsets = []
+    for blob in blobs:
+        blob_offsets.append(offset)
+        offset += len(blob)
+
+    out = bytearray(order + struct.pack(endian + 'HI', 42, offsets[0]))
+    for k, (entries, next_ifd) in enumerate(ifds):
+        assert len(out) == offsets[k]
+        data_at = offsets[k] + 2 + 12 * len(entries) + 4
+        table = bytearray(struct.pack(endian + 'H', len(entries)))
+        extra = bytearray()
+        for tag, typ, value in sorted(entries):
+            if isinstance(value, tuple) and value and value[0] == 'ifd':
+                n, data = 1, struct.pack(endian + 'I', offsets[value[1]])
+            elif isinstance(value, tuple) and value and value[0] == 'blob':
+                n, data = 1, struct.pack(endian + 'I', blob_offsets[value[1]])
+            else:
+                n, data = pack_value(endian, typ, value)
+            table += struct.pack(endian + 'HHI', tag, typ, n)
+            if len(data) <= 4:
+                table += data.ljust(4, b'\x00')
+            else:
+                table += struct.pack(endian + 'I', data_at + len(extra))
+                extra += data
+        table += struct.pack(endian + 'I', offsets[next_ifd] if next_ifd is not None else 0)
+        out += table + extra
+    for blob in blobs:
+        out += blob
+    return bytes(out)
+
+
+# IFD0 (camera + ExifIFD pointer) -> ExifIFD, and IFD1 holding a JPEG preview
+def camera_tiff(endian):
+    ifd0 = [
+        (0x010F, 2, 'NIKON CORPORATION'),
+        (0x0110, 2, 'NIKON F3'),
+        (0x0100, 4, [6000]),
+        (0x0101, 4, [4000]),
+        (0x8769, 4, ('ifd', 1)),
+    ]
+    exif_ifd = [
+        (0x829A, 5, [(1, 125)]),
+        (0x829D, 5, [(28, 10)]),
+        (0x8827, 3, [400]),
+        (0x9003, 2, '2023:09:07 12:00:05'),
+        (0x920A, 5, [(50, 1)]),
+        (0xA434, 2, 'Nikkor 50mm f/1.4'),
+    ]
+    preview_ifd = [
+        (0x0103, 3, [6]),
+        (0x0201, 4, ('blob', 0)),
+        (0x0202, 4, [len(PREVIEW)]),
+    ]
+    return build_tiff(endian, [(ifd0, 2), (exif_ifd, None), (preview_ifd, None)], [PREVIEW])
+
+
+def segment(marker, payload):
+    return bytes([0xFF, marker]) + struct.pack('>H', len(payload) + 2) + payload
+
+
+# SOI, APP1 with the given Exif payload, SOF0 with the image size, SOS, EOI
+def build_jpeg(exif_payload, width=3000, height=2000):
+    sof = struct.pack('>BHHB', 8, height, width, 1) + b'\x01\x11\x00'
+    return (b'\xff\xd8' + segment(0xE1, b'Exif\x00\x00' + exif_payload) + segment(0xC0, sof)
+            + segment(0xDA, b'\x01\x01\x00\x00\x3f\x00') + b'\x12\x34' + b'\xff\xd9')
+
+
+class exifReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, name, data):
+        path = os.path.join(self.folder, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+
+class jpegTest(exifReaderTest):
+    def test_reads_exif_and_size(self):
+        exif = exifReader.read_exif(self.write('DSC00001.jpg', build_jpeg(camera_tiff('<'))))
+        self.assertEqual(exif['IFD0'], {'Make': 'NIKON CORPORATION', 'Model': 'NIKON F3'})
+        self.assertEqual(exif['ExifIFD']['ExposureTime'], '1/125')
+        self.assertEqual(exif['ExifIFD']['FNumber'], 2.8)
+        self.assertEqual(exif['ExifIFD']['ISO'], 400)
+        self.assertEqual(exif['ExifIFD']['FocalLength'], '50.0 mm')
+        self.assertEqual(exif['File'], {'ImageWidth': 3000, 'ImageHeight': 2000})
+
+    def test_app1_with_empty_ifd0(self):
+        exif = exifReader.read_exif(self.write('DSC00001.jpg', build_jpeg(build_tiff('<', [([], None)]))))
+        self.assertEqual(exif['IFD0'], {})
+        self.assertNotIn('ExifIFD', exif)
+        self.assertEqual(exif['File'], {'ImageWidth': 3000, 'ImageHeight': 2000})
+
+    def test_app1_without_ifd0_falls_back(self):
+        header_only = b'II' + struct.pack('<HI', 42, 8)
+        for payload in (b'', header_only, b'II' + struct.pack('<HI', 42, 4096)):
+            with self.subTest(payload=payload):
+                self.assertIsNone(exifReader.read_exif(self.write('DSC00001.jpg', build_jpeg(payload))))
+
+    def test_no_app1_falls_back(self):
+        data = build_jpeg(b'')
+        data = b'\xff\xd8' + data[data.index(b'\xff\xc0'):]
+        self.assertIsNone(exifReader.read_exif(self.write('DSC00001.jpg', data)))
+
+    def test_truncated_segment(self):
+        data = build_jpeg(camera_tiff('<'))
+        self.assertIsNone(exifReader.read_exif(self.write('DSC00001.jpg', data[:40])))
+
+
+class tiffTest(exifReaderTest):
+    def test_big_endian_matches_little_endian(self):
+        big = exifReader.read_exif(self.write('DSC00001.tif', camera_tiff('>')))
+        little = exifReader.read_exif(self.write('DSC00002.tif', camera_tiff('<')))
+        self.assertIsNotNone(big)
+        del big['SourceFile'], little['SourceFile']
+        self.assertEqual(big, little)
+        self.assertEqual(big['ExifIFD']['DateTimeOriginal'], '2023:09:07 12:00:05')
+        self.assertEqual(big['ExifIFD']['LensModel'], 'Nikkor 50mm f/1.4')
+        self.assertEqual(big['File'], {'ImageWidth': 6000, 'ImageHeight': 4000})
+
+    def test_big_endian_preview(self):
+        path = self.write('DSC00001.tif', camera_tiff('>'))
+        out_path = os.path.join(self.folder, 'previews', 'DSC00001.jpg')
+        self.assertEqual(exifReader.extract_preview(path, out_path), out_path)
+        with open(out_path, 'rb') as f:
+            self.assertEqual(f.read(), PREVIEW)
+
+    def test_ifd_loop(self):
+        data = build_tiff('>', [([(0x0100, 4, [10])], 1), ([(0x0101, 4, [10])], 0)])
+        self.assertEqual(len(list(exifReader.walk_ifds(data))), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import json
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from exifTool import iter_json_records
+
+# exiftool -j -g1 output, with braces, quotes and backslashes inside strings
+OUTPUT = '''[{
+  "SourceFile": "/lib/2023/072_23-09-07 F3 P400 {Flims}/DSC00001.jpg",
+  "IFD0": {
+    "Make": "NIKON \\"{F3\\" body",
+    "Model": "C:\\\\scans\\\\"
+  },
+  "XMP-iptcCore": {
+    "Scene": "Zürich }{ ZH"
+  }
+},
+{
+  "SourceFile": "/lib/2023/072_23-09-07 F3 P400 {Flims}/DSC00002.jpg",
+  "ExifIFD": {
+    "ISO": 400,
+    "FNumber": 2.8
+  }
+}]
+'''
+
+
+class iterJsonRecordsTest(unittest.TestCase):
+    def test_whole_output(self):
+        self.assertEqual(list(iter_json_records(OUTPUT.splitlines(True))), json.loads(OUTPUT))
+
+    def test_split_at_every_position(self):
+        expected = json.loads(OUTPUT)
+        for i in range(len(OUTPUT) + 1):
+            with self.subTest(split=i):
+                self.assertEqual(list(iter_json_records([OUTPUT[:i], OUTPUT[i:]])), expected)
+
+    def test_one_character_per_chunk(self):
+        self.assertEqual(list(iter_json_records(OUTPUT)), json.loads(OUTPUT))
+
+    def test_records_sharing_a_chunk(self):
+        chunks = ['[{"SourceFile": "a"}, {"Sour', 'ceFile": "b"}, {"SourceFile": "c"}]']
+        self.assertEqual([r['SourceFile'] for r in iter_json_records(chunks)], ['a', 'b', 'c'])
+
+    def test_yields_before_output_ends(self):
+        records = iter_json_records(iter(['[{"SourceFile": "a"},\n', None]))
+        self.assertEqual(next(records), {'SourceFile': 'a'})
+
+
+if __name__ == '__main__':
+    unittest.main()
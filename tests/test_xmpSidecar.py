@@ -0,0 +1,85 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from xml.dom import minidom
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import xmpSidecar
+
+# Lightroom-style packet: exif is only declared on the second rdf:Description
+MULTI_DESCRIPTION = (
+    '<?xpacket begin="﻿" id="W5M0MpCehiHzreSzNTczkc9d"?>\n'
+    '<x:xmpmeta xmlns:x="adobe:ns:meta/">\n'
+    ' <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">\n'
+    '  <rdf:Description rdf:about=""\n'
+    '    xmlns:xmp="http://ns.adobe.com/xap/1.0/"\n'
+    '   xmp:Rating="3"/>\n'
+    '  <rdf:Description rdf:about=""\n'
+    '    xmlns:exif="http://ns.adobe.com/exif/1.0/"\n'
+    '   exif:ExposureTime="1/125">\n'
+    '  </rdf:Description>\n'
+    ' </rdf:RDF>\n'
+    '</x:xmpmeta>\n'
+    '<?xpacket end="w"?>'
+)
+
+
+class setPropertyTest(unittest.TestCase):
+    def test_adds_to_description_declaring_the_namespace(self):
+        text = xmpSidecar.set_property(MULTI_DESCRIPTION, 'DateTimeOriginal', '2023-09-07T12:00:05')
+        minidom.parseString(text.encode('utf-8'))   # raises on an unbound prefix
+        self.assertEqual(text.count('xmlns:exif='), 1)
+        self.assertEqual(xmpSidecar.read_properties(text)['DateTimeOriginal'], '2023-09-07T12:00:05')
+        second = text.index('xmlns:exif=')
+        self.assertGreater(text.index('exif:DateTimeOriginal='), second)
+
+    def test_self_closing_description(self):
+        text = xmpSidecar.set_property(MULTI_DESCRIPTION, 'CreateDate', '2023-09-07T12:00:05')
+        minidom.parseString(text.encode('utf-8'))
+        self.assertIn('xmp:CreateDate="2023-09-07T12:00:05"/>', text)
+
+    def test_declares_missing_namespace(self):
+        packet = xmpSidecar.EMPTY_PACKET
+        for tag in xmpSidecar.DATE_PROPERTIES:
+            packet = xmpSidecar.set_property(packet, tag, '2023-09-07T12:00:05')
+        minidom.parseString(packet.encode('utf-8'))
+        self.assertEqual(set(xmpSidecar.read_properties(packet).values()), {'2023-09-07T12:00:05'})
+
+    def test_updates_element_in_place(self):
+        packet = MULTI_DESCRIPTION.replace(
+            '   exif:ExposureTime="1/125">\n',
+            '   exif:ExposureTime="1/125">\n   <exif:DateTimeOriginal>2020-01-01T00:00:00</exif:DateTimeOriginal>\n',
+        )
+        text = xmpSidecar.set_property(packet, 'DateTimeOriginal', '2023-09-07T12:00:05')
+        self.assertIn('<exif:DateTimeOriginal>2023-09-07T12:00:05</exif:DateTimeOriginal>', text)
+        self.assertEqual(text.replace('2023-09-07T12:00:05', '2020-01-01T00:00:00'), packet)
+
+
+class writeDatesTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'DSC00001.xmp')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_writes_well_formed_sidecar(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(MULTI_DESCRIPTION)
+        self.assertTrue(xmpSidecar.write_dates(self.path, '2023:09:07 12:00:05'))
+        minidom.parse(self.path)
+        self.assertFalse(xmpSidecar.write_dates(self.path, '2023:09:07 12:00:05'))
+
+    def test_creates_missing_sidecar(self):
+        self.assertTrue(xmpSidecar.write_dates(self.path, '2023:09:07 12:00:05'))
+        self.assertEqual(xmpSidecar.norm_date(xmpSidecar.read_dates(self.path)['ModifyDate']), '2023:09:07 12:00:05')
+
+    def test_malformed_result_is_not_written(self):
+        with self.assertRaises(ValueError):
+            xmpSidecar.check_packet('<x:xmpmeta><rdf:Description exif:DateTimeOriginal="x"/></x:xmpmeta>')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,289 @@
+# watchTool.py
+# Watch mode: keeps the imported rolls of a collection up to date while they're being edited.
+
+import os
+import sys
+import select
+import struct
+import ctypes
+import ctypes.util
+from time import time, sleep
+from rollFileIndex import JPG_EXTS, RAW_EXTS, SCANS, EXPORTS, EDITS
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+WATCHED = (SCANS, EXPORTS, EDITS)
+IGNORED_SUFFIXES = ('.tmp', '.part', '.crdownload')
+
+# inotify (see inotify(7))
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0)
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT = struct.Struct('iIII')   # wd, mask, cookie, len
+
+
+# Folders of a roll that are watched for changes
+def watch_dirs(roll):
+    dirs = [os.path.join(roll.directory, folder) for folder in WATCHED]
+    for folder in (roll.jpgDirs or []) + (roll.rawDirs or []):
+        if folder not in (-1, None):
+            dirs.append(folder)
+    return sorted({os.path.normpath(d) for d in dirs if os.path.isdir(d)})
+
+
+# True if a change to path can affect the roll it belongs to
+def is_relevant(roll, path):
+    name = os.path.basename(path)
+    if name.startswith(('.', '~')) or name.lower().endswith(IGNORED_SUFFIXES):
+        return False
+    ext = os.path.splitext(name)[1].lower()
+    if ext in JPG_EXTS or ext in RAW_EXTS:
+        return True
+    # RAW-only rolls read dates/locations from the RAW's .xmp sidecar (see exifReader.read_raw_exif)
+    return ext == '.xmp' and roll.isRawOnly
+
+
+class inotifyBackend:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.wds = {}       # wd -> folder path
+        self.paths = {}     # folder path -> wd
+
+    def add(self, path):
+        if path in self.paths:
+            return
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            db.w('[W]', 'Could not watch folder', f'{path} (errno {ctypes.get_errno()})')
+            return
+        self.wds[wd] = path
+        self.paths[path] = wd
+
+    def remove(self, path):
+        wd = self.paths.pop(path, None)
+        if wd is not None:
+            self.wds.pop(wd, None)
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    # Returns changed paths (files and folders) seen within timeout seconds; None on queue overflow
+    def read(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        overflow = False
+        offset = 0
+        while offset + EVENT.size <= len(buf):
+            wd, mask, _, length = EVENT.unpack_from(buf, offset)
+            offset += EVENT.size
+            name = buf[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            folder = self.wds.get(wd)
+            if folder is None:
+                continue
+            if mask & (IN_IGNORED | IN_DELETE_SELF):
+                self.wds.pop(wd, None)
+                self.paths.pop(folder, None)
+                changed.append(folder)
+                continue
+            changed.append(os.path.join(folder, os.fsdecode(name)) if name else folder)
+        return None if overflow else changed
+
+    def close(self):
+        if self.fd is not None and self.fd >= 0:
+            os.close(self.fd)
+        self.fd = None
+
+
+class pollingBackend:
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.snapshots = {}     # folder path -> {name: (size, mtime_ns, inode)}
+
+    def _snapshot(self, path):
+        snap = {}
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    snap[entry.name] = (st.st_size, st.st_mtime_ns, st.st_ino)
+        except OSError:
+            return None
+        return snap
+
+    def add(self, path):
+        if path not in self.snapshots:
+            self.snapshots[path] = self._snapshot(path)
+
+    def remove(self, path):
+        self.snapshots.pop(path, None)
+
+    def read(self, timeout):
+        sleep(min(self.interval, timeout) if timeout is not None else self.interval)
+        changed = []
+        for path, old in list(self.snapshots.items()):
+            new = self._snapshot(path)
+            self.snapshots[path] = new
+            if new is None or old is None:
+                if new is not old:
+                    changed.append(path)
+                continue
+            for name in old.keys() | new.keys():
+                if old.get(name) != new.get(name):
+                    changed.append(os.path.join(path, name))
+        return changed
+
+    def close(self):
+        self.snapshots = {}
+
+
+class watchTool:
+    def __init__(self, collection, on_update=None, debounce=2.0, interval=1.0, polling=False):
+        self.dbIdx = '[W]'
+        self.collection = collection
+        self.on_update = on_update          # called with each re-imported rollObj
+        self.debounce = debounce            # seconds without changes before dirty rolls are re-imported
+        self.changes = {}                   # roll directory -> set of changed paths
+        self.last_change = None
+
+        self.backend = None
+        if not polling and sys.platform.startswith('linux'):
+            try:
+                self.backend = inotifyBackend()
+            except (OSError, AttributeError) as e:
+                db.w(self.dbIdx, 'inotify unavailable, polling instead', e)
+        if self.backend is None:
+            self.backend = pollingBackend(interval)
+
+        self.rolls = {}     # watched folder -> roll directory
+        for roll in collection.rolls:
+            self.watch(roll)
+
+    # Starts watching a roll's image folders (and the roll folder itself, to pick up new 01_scans / 04_edits folders)
+    def watch(self, roll):
+        root = os.path.normpath(roll.directory)
+        for folder in [root] + watch_dirs(roll):
+            self.rolls[folder] = root
+            self.backend.add(folder)
+
+    def unwatch(self, roll):
+        root = os.path.normpath(roll.directory)
+        for folder in [f for f, r in self.rolls.items() if r == root]:
+            self.rolls.pop(folder)
+            self.backend.remove(folder)
+
+    def _roll_for(self, directory):
+        for roll in self.collection.rolls:
+            if os.path.normpath(roll.directory) == directory:
+                return roll
+        return None
+
+    # Marks the roll owning path dirty if the change can affect it
+    def mark(self, path):
+        folder = path if path in self.rolls else os.path.dirname(path)
+        root = self.rolls.get(folder)
+        if root is None:
+            return
+        roll = self._roll_for(root)
+        if roll is None:
+            return
+
+        if folder == root:
+            # Change directly in the roll folder: only image folders appearing/disappearing matter
+            if os.path.basename(path) not in WATCHED:
+                return
+            for sub in watch_dirs(roll):
+                self.rolls[sub] = root
+                self.backend.add(sub)
+        elif path != folder and not is_relevant(roll, path):
+            return
+
+        if not roll.isDirty:
+            db.d(self.dbIdx, f'Roll marked dirty', f'{roll.dbIdx} {path}')
+        roll.isDirty = True
+        self.changes.setdefault(root, set()).add(path)
+        self.last_change = time()
+
+    # Re-imports every dirty roll, returns the list of new rollObjs
+    def flush(self):
+        updated = []
+        for root, paths in sorted(self.changes.items()):
+            roll = self._roll_for(root)
+            if roll is None:
+                continue
+            db.i(self.dbIdx, f'Re-importing roll after {len(paths)} changes', roll.name)
+            self.unwatch(roll)
+            t0 = time()
+            new_roll = self.collection.reload_roll(roll)
+            if new_roll is None:
+                self.watch(roll)
+                continue
+            self.watch(new_roll)
+            db.i(self.dbIdx, f'Roll updated in {time() - t0:.2f}s', new_roll.name)
+            updated.append(new_roll)
+            if self.on_update is not None:
+                self.on_update(new_roll)
+        self.changes = {}
+        self.last_change = None
+        return updated
+
+    # Waits for changes and re-imports dirty rolls once changes have settled. Returns the rolls updated
+    # in this call (empty if nothing settled within timeout).
+    def poll(self, timeout=1.0):
+        changed = self.backend.read(timeout)
+        if changed is None:
+            # inotify queue overflow: events were lost, so treat every watched roll as changed
+            db.w(self.dbIdx, 'Change queue overflowed, re-importing all watched rolls')
+            for folder, root in list(self.rolls.items()):
+                self.mark(folder)
+            changed = []
+        for path in changed:
+            self.mark(path)
+
+        if self.changes and time() - self.last_change >= self.debounce:
+            return self.flush()
+        return []
+
+    # Runs until interrupted (Ctrl+C)
+    def run(self):
+        db.i(self.dbIdx, f'Watching {len(self.collection.rolls)} rolls for changes', type(self.backend).__name__)
+        try:
+            while True:
+                self.poll(timeout=min(1.0, self.debounce))
+        except KeyboardInterrupt:
+            db.i(self.dbIdx, 'Watch mode stopped')
+        finally:
+            self.close()
+
+    def close(self):
+        self.backend.close()
@@ -0,0 +1,192 @@
+# xmpSidecar.py
+# Reads and patches date properties in RAW .xmp sidecars directly, without exiftool.
+
+import os
+import re
+import tempfile
+from xml.etree import ElementTree
+from debuggerTool import debuggerTool
+
+DEBUG = 0
+WARNING = 1
+ERROR = 1
+db = debuggerTool(DEBUG, WARNING, ERROR)
+
+NS_XMP = "http://ns.adobe.com/xap/1.0/"
+NS_EXIF = "http://ns.adobe.com/exif/1.0/"
+
+# exiftool tag name -> (namespace, default prefix, property), matching where exiftool writes them in XMP
+DATE_PROPERTIES = {
+    "DateTimeOriginal": (NS_EXIF, "exif", "DateTimeOriginal"),
+    "CreateDate": (NS_XMP, "xmp", "CreateDate"),
+    "ModifyDate": (NS_XMP, "xmp", "ModifyDate"),
+}
+
+EMPTY_PACKET = (
+    '<x:xmpmeta xmlns:x="adobe:ns:meta/">\n'
+    ' <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">\n'
+    '  <rdf:Description rdf:about="">\n'
+    '  </rdf:Description>\n'
+    ' </rdf:RDF>\n'
+    '</x:xmpmeta>\n'
+)
+
+
+# "YYYY:MM:DD HH:MM:SS" (exif) -> "YYYY-MM-DDTHH:MM:SS" (xmp). Anything else is passed through.
+def to_xmp_date(value):
+    m = re.match(r'^(\d{4}):(\d{2}):(\d{2})[ T](\d{2}:\d{2}(?::\d{2})?)(.*)$', str(value).strip())
+    if not m:
+        return str(value).strip()
+    return f"{m.group(1)}-{m.group(2)}-{m.group(3)}T{m.group(4)}{m.group(5)}"
+
+
+# Normalizes exif or xmp dates to "YYYY:MM:DD HH:MM:SS" for comparison (time zone and sub-seconds ignored,
+# so an existing "+02:00" suffix doesn't force a rewrite)
+def norm_date(value):
+    if value in (None, ""):
+        return None
+    m = re.match(r'^(\d{4})[:-](\d{2})[:-](\d{2})[ T](\d{2}):(\d{2})(?::(\d{2}))?', str(value).strip())
+    if not m:
+        return str(value).strip()
+    return f"{m.group(1)}:{m.group(2)}:{m.group(3)} {m.group(4)}:{m.group(5)}:{m.group(6) or '00'}"
+
+
+def prefix_declaration(text, namespace):
+    return re.search(r'xmlns:([\w.-]+)\s*=\s*["\']' + re.escape(namespace) + r'["\']', text)
+
+
+# Returns the prefix the packet binds to namespace, or None
+def find_prefix(text, namespace):
+    m = prefix_declaration(text, namespace)
+    return m.group(1) if m else None
+
+
+def attr_pattern(prefix, name):
+    return re.compile(r'(\s' + re.escape(f'{prefix}:{name}') + r'\s*=\s*)(["\'])(.*?)\2', re.S)
+
+
+def elem_pattern(prefix, name):
+    tag = re.escape(f'{prefix}:{name}')
+    return re.compile(r'(<' + tag + r'(?:\s[^>]*)?>)(.*?)(</' + tag + r'>)', re.S)
+
+
+# Reads the given exiftool tag names (see DATE_PROPERTIES) from packet text, returns tag -> value (None if missing)
+def read_properties(text, tags=DATE_PROPERTIES):
+    values = {}
+    for tag in tags:
+        namespace, _, name = DATE_PROPERTIES[tag]
+        prefix = find_prefix(text, namespace)
+        value = None
+        if prefix:
+            m = attr_pattern(prefix, name).search(text)
+            if m:
+                value = m.group(3)
+            else:
+                m = elem_pattern(prefix, name).search(text)
+                if m:
+                    value = m.group(2).strip()
+        values[tag] = value
+    return values
+
+
+def escape_attr(value):
+    return (str(value).replace('&', '&amp;').replace('<', '&lt;')
+            .replace('>', '&gt;').replace('"', '&quot;'))
+
+
+# Sets one property in packet text, returns the new text
+def set_property(text, tag, value):
+    namespace, default_prefix, name = DATE_PROPERTIES[tag]
+    prefix = find_prefix(text, namespace)
+    if prefix:
+        pattern = attr_pattern(prefix, name)
+        if pattern.search(text):
+            return pattern.sub(lambda m: f'{m.group(1)}{m.group(2)}{escape_attr(value)}{m.group(2)}', text, count=1)
+        pattern = elem_pattern(prefix, name)
+        if pattern.search(text):
+            return pattern.sub(lambda m: f'{m.group(1)}{escape_attr(value)}{m.group(3)}', text, count=1)
+
+    # Not present: add as attribute on the rdf:Description that declares the namespace. If an ancestor
+    # (rdf:RDF, x:xmpmeta) declares it, or nothing does, use the first one (declaring it there if needed).
+    descriptions = list(re.finditer(r'<rdf:Description\b[^>]*?(/?)>', text, re.S))
+    if not descriptions:
+        raise ValueError('no rdf:Description in XMP packet')
+    declaration = prefix_declaration(text, namespace)
+    m = descriptions[0]
+    declared = declaration is not None and declaration.start() < m.start()
+    for d in descriptions:
+        if declaration is not None and d.start() < declaration.start() < d.end():
+            m, declared = d, True
+            break
+    insert = ''
+    if not prefix:
+        prefix = default_prefix
+    if not declared:
+        insert += f'\n    xmlns:{prefix}="{namespace}"'
+    insert += f'\n   {prefix}:{name}="{escape_attr(value)}"'
+    pos = m.end() - len(m.group(1)) - 1
+    return text[:pos] + insert + text[pos:]
+
+
+# Raises ValueError if a patched packet isn't well-formed XML (so it never replaces the user's sidecar)
+def check_packet(text):
+    try:
+        ElementTree.fromstring(text.encode('utf-8'))
+    except ElementTree.ParseError as e:
+        raise ValueError(f'patched XMP packet is not well-formed: {e}')
+
+
+# Writes text to path atomically, keeping the original file's permissions
+def atomic_write(path, text):
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.xmp-', suffix='.tmp', dir=folder)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_sidecar(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+# Returns the sidecar's current date values (tag -> value or None); all None if the sidecar doesn't exist
+def read_dates(path):
+    text = read_sidecar(path)
+    if text is None:
+        return {tag: None for tag in DATE_PROPERTIES}
+    return read_properties(text)
+
+
+# Sets DateTimeOriginal/CreateDate/ModifyDate in the sidecar at path (created if missing) to dt_str
+# ("YYYY:MM:DD HH:MM:SS"). Returns True if the file was changed, False if it already held those values.
+def write_dates(path, dt_str):
+    text = read_sidecar(path)
+    if text is None:
+        text = EMPTY_PACKET
+
+    current = read_properties(text)
+    target = norm_date(dt_str)
+    stale = [tag for tag, value in current.items() if norm_date(value) != target]
+    if not stale:
+        return False
+
+    value = to_xmp_date(dt_str)
+    for tag in stale:
+        text = set_property(text, tag, value)
+    check_packet(text)
+    atomic_write(path, text)
+    db.d('[X]', f'Updated XMP dates ({", ".join(stale)})', path)
+    return True